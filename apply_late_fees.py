@@ -0,0 +1,32 @@
+"""
+Nightly late-fee run over all unpaid violations
+Usage:
+    python apply_late_fees.py [--as-of YYYY-MM-DD]
+"""
+
+import argparse
+import os
+import sys
+from datetime import date
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from managers.late_fee_manager import LateFeeManager
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute late fees of unpaid violations")
+    parser.add_argument('--as-of', type=date.fromisoformat, help='Day to compute fees for (default: today)')
+    args = parser.parse_args(argv)
+    
+    summary = LateFeeManager().apply_late_fees(args.as_of)
+    
+    print(f"Updated {summary['updated']} of {summary['unpaid']} unpaid violations "
+          f"in {summary['seconds']}s ({summary['engine']})")
+    print(f"Outstanding late fees: {summary['total_late_fees']:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
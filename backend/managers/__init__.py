@@ -6,5 +6,16 @@ Contains business logic and CRUD operation managers
 from .user_manager import UserManager
 from .violation_manager import ViolationManager
 from .payment_manager import PaymentManager
+from .rollup_manager import RollupManager
+from .balance_manager import BalanceManager
+from .import_manager import ImportManager
+from .idempotency_manager import IdempotencyManager
+from .reconciliation_manager import ReconciliationManager
+from .late_fee_manager import LateFeeManager
+from .search_index_manager import SearchIndexManager
+from .plate_match_manager import PlateMatchManager
 
-__all__ = ['UserManager', 'ViolationManager', 'PaymentManager']
\ No newline at end of file
+__all__ = ['UserManager', 'ViolationManager', 'PaymentManager', 'RollupManager', 'BalanceManager', 'ImportManager',
+           'IdempotencyManager', 'ReconciliationManager',
+           'LateFeeManager', 'SearchIndexManager',
+           'PlateMatchManager']
\ No newline at end of file
@@ -0,0 +1,326 @@
+"""
+Balance Manager
+Maintains running fine balances per citizen and for the whole system
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import sys
+sys.path.append('..')
+
+from database.db_connection import get_db
+
+
+class BalanceManager:
+    """
+    Manager class for the user_balances and violation_totals tables
+    One row per citizen, and the single violation_totals row for all
+    violations, hold violation counts and fine amounts, overall and per
+    status. Rows are adjusted by deltas inside the transaction of every
+    violation write, so a dashboard reads one row by primary key instead of
+    aggregating the citizen's (or the whole table's) history.
+    """
+    
+    TOTALS_ID = 1
+    
+    STATUSES = ('paid', 'unpaid', 'disputed')
+    
+    COLUMNS = (
+        'violation_count', 'total_amount',
+        'paid_count', 'paid_amount',
+        'unpaid_count', 'unpaid_amount',
+        'disputed_count', 'disputed_amount'
+    )
+    
+    # Per-user aggregate the table must always equal (rebuild and verify)
+    AGGREGATE_QUERY = """
+        SELECT
+            user_id,
+            COUNT(*) AS violation_count,
+            SUM(fine_amount) AS total_amount,
+            SUM(CASE WHEN status = 'paid' THEN 1 ELSE 0 END) AS paid_count,
+            SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END) AS paid_amount,
+            SUM(CASE WHEN status = 'unpaid' THEN 1 ELSE 0 END) AS unpaid_count,
+            SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END) AS unpaid_amount,
+            SUM(CASE WHEN status = 'disputed' THEN 1 ELSE 0 END) AS disputed_count,
+            SUM(CASE WHEN status = 'disputed' THEN fine_amount ELSE 0 END) AS disputed_amount
+        FROM violations
+        WHERE {condition}
+        GROUP BY user_id
+    """
+    
+    TOTALS_QUERY = """
+        SELECT
+            COUNT(*) AS violation_count,
+            COALESCE(SUM(fine_amount), 0) AS total_amount,
+            COALESCE(SUM(CASE WHEN status = 'paid' THEN 1 ELSE 0 END), 0) AS paid_count,
+            COALESCE(SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END), 0) AS paid_amount,
+            COALESCE(SUM(CASE WHEN status = 'unpaid' THEN 1 ELSE 0 END), 0) AS unpaid_count,
+            COALESCE(SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END), 0) AS unpaid_amount,
+            COALESCE(SUM(CASE WHEN status = 'disputed' THEN 1 ELSE 0 END), 0) AS disputed_count,
+            COALESCE(SUM(CASE WHEN status = 'disputed' THEN fine_amount ELSE 0 END), 0) AS disputed_amount
+        FROM violations
+    """
+    
+    def __init__(self):
+        """Initialize balance manager with database connection"""
+        self.db = get_db()
+    
+    @classmethod
+    def _normalize(cls, row: Optional[Dict]) -> Dict:
+        """Get COLUMNS from a row as int counts and amounts rounded to cents"""
+        row = row or {}
+        return {
+            column: (int(row.get(column) or 0) if column.endswith('_count')
+                     else round(float(row.get(column) or 0), 2))
+            for column in cls.COLUMNS
+        }
+    
+    @classmethod
+    def _delta(cls, status: str, amount: float, sign: int = 1,
+               overall: bool = True) -> Tuple:
+        """Column deltas for adding (sign 1) or removing (sign -1) one violation"""
+        delta = [0] * len(cls.COLUMNS)
+        if overall:
+            delta[0], delta[1] = sign, sign * amount
+        if status in cls.STATUSES:
+            index = cls.COLUMNS.index(f"{status}_count")
+            delta[index], delta[index + 1] = sign, sign * amount
+        return tuple(delta)
+    
+    def record_violations(self, violations: Iterable[Dict]) -> bool:
+        """
+        Add newly created violations to the totals and their citizens' balances
+        
+        Args:
+            violations: Dictionaries with user_id, status and fine_amount
+        Returns:
+            True if successful, False otherwise
+        """
+        deltas, totals = {}, {}
+        for violation in violations:
+            delta = self._delta(violation['status'], float(violation['fine_amount']))
+            self._add(totals, self.TOTALS_ID, delta)
+            if violation.get('user_id'):
+                self._add(deltas, int(violation['user_id']), delta)
+        return self._apply(deltas) and self._apply_totals(totals)
+    
+    def record_status_changes(self, violations: Iterable[Dict], new_status: str) -> bool:
+        """
+        Move violations between status totals, overall and in their citizens' balances
+        
+        Args:
+            violations: Dictionaries with each violation's user_id, status and
+                        fine_amount before the change
+            new_status: Status the violations now have
+        Returns:
+            True if successful, False otherwise
+        """
+        deltas, totals = {}, {}
+        for violation in violations:
+            if violation['status'] == new_status:
+                continue
+            amount = float(violation['fine_amount'])
+            for delta in (self._delta(violation['status'], amount, -1, overall=False),
+                          self._delta(new_status, amount, overall=False)):
+                self._add(totals, self.TOTALS_ID, delta)
+                if violation.get('user_id'):
+                    self._add(deltas, int(violation['user_id']), delta)
+        return self._apply(deltas) and self._apply_totals(totals)
+    
+    @staticmethod
+    def _add(deltas: Dict[int, Tuple], user_id: int, delta: Tuple):
+        """Accumulate a delta for a user (or the totals row)"""
+        current = deltas.get(user_id)
+        deltas[user_id] = delta if current is None else tuple(a + b for a, b in zip(current, delta))
+    
+    def _apply(self, deltas: Dict[int, Tuple]) -> bool:
+        """
+        Add column deltas to balance rows, creating missing rows
+        
+        Args:
+            deltas: Mapping of user_id to deltas in COLUMNS order
+        Returns:
+            True if successful, False otherwise
+        """
+        if not deltas:
+            return True
+        
+        columns = ', '.join(self.COLUMNS)
+        placeholders = ', '.join(['%s'] * (len(self.COLUMNS) + 1))
+        if self.db.db_type == 'mysql':
+            updates = ',\n                    '.join(
+                f"{column} = {column} + VALUES({column})" for column in self.COLUMNS)
+            query = f"""
+                INSERT INTO user_balances (user_id, {columns})
+                VALUES ({placeholders})
+                ON DUPLICATE KEY UPDATE
+                    {updates}
+            """
+        else:
+            updates = ',\n                    '.join(
+                f"{column} = {column} + excluded.{column}" for column in self.COLUMNS)
+            query = f"""
+                INSERT INTO user_balances (user_id, {columns})
+                VALUES ({placeholders})
+                ON CONFLICT (user_id) DO UPDATE SET
+                    {updates}
+            """
+        
+        params_list = [(user_id,) + tuple(round(value, 2) for value in delta)
+                       for user_id, delta in sorted(deltas.items())]
+        return self.db.execute_many(query, params_list)
+    
+    def _apply_totals(self, totals: Dict[int, Tuple]) -> bool:
+        """
+        Add column deltas to the violation_totals row
+        The row is updated in place (never inserted), so concurrent writers
+        serialize on its row lock until their transactions commit
+        
+        Args:
+            totals: {TOTALS_ID: deltas in COLUMNS order}, or empty for no change
+        Returns:
+            True if successful, False otherwise
+        """
+        delta = totals.get(self.TOTALS_ID)
+        if not delta or not any(delta):
+            return True
+        
+        query = f"""
+            UPDATE violation_totals
+            SET {', '.join(f"{column} = {column} + %s" for column in self.COLUMNS)}
+            WHERE totals_id = %s
+        """
+        params = tuple(round(value, 2) for value in delta) + (self.TOTALS_ID,)
+        return self.db.execute_update(query, params) == 1
+    
+    def get_totals(self) -> Dict:
+        """
+        Get counts and fine amounts over all violations (one primary-key read)
+        
+        Returns:
+            Dictionary with every column in COLUMNS
+        """
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM violation_totals WHERE totals_id = %s"
+        return self._normalize(self.db.fetch_one(query, (self.TOTALS_ID,)))
+    
+    def get_balance(self, user_id: int) -> Dict:
+        """
+        Get a citizen's balance (one primary-key read)
+        
+        Args:
+            user_id: User ID
+        Returns:
+            Dictionary with every column in COLUMNS (zeros if the citizen has no violations)
+        """
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM user_balances WHERE user_id = %s"
+        return self._normalize(self.db.fetch_one(query, (user_id,)))
+    
+    def delete_balance(self, user_id: int) -> bool:
+        """
+        Remove a user's balance row (their violations no longer point to them)
+        
+        Args:
+            user_id: User ID
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.db.execute_query("DELETE FROM user_balances WHERE user_id = %s", (user_id,))
+    
+    def rebuild(self, user_ids: Optional[Iterable[int]] = None) -> bool:
+        """
+        Recompute balance rows from the violations table
+        
+        Args:
+            user_ids: Users to recompute (None recomputes every row)
+        Returns:
+            True if successful, False otherwise
+        """
+        if user_ids is None:
+            delete_query = "DELETE FROM user_balances"
+            condition, params = "user_id IS NOT NULL", ()
+        else:
+            params = tuple(sorted({int(user_id) for user_id in user_ids if user_id}))
+            if not params:
+                return True
+            placeholders = ', '.join(['%s'] * len(params))
+            delete_query = f"DELETE FROM user_balances WHERE user_id IN ({placeholders})"
+            condition = f"user_id IN ({placeholders})"
+        
+        insert_query = f"""
+            INSERT INTO user_balances (user_id, {', '.join(self.COLUMNS)})
+            {self.AGGREGATE_QUERY.format(condition=condition)}
+        """
+        
+        try:
+            with self.db.transaction():
+                if not (self.db.execute_query(delete_query, params)
+                        and self.db.execute_query(insert_query, params)):
+                    raise RuntimeError("Failed to rebuild user balances")
+            return True
+        except Exception as e:
+            print(f"Error rebuilding user balances: {e}")
+            return False
+    
+    def rebuild_totals(self) -> bool:
+        """
+        Recompute the violation_totals row from the violations table
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        query = f"""
+            UPDATE violation_totals
+            SET {', '.join(f"{column} = %s" for column in self.COLUMNS)}
+            WHERE totals_id = %s
+        """
+        
+        try:
+            with self.db.transaction():
+                actual = self._normalize(self.db.fetch_one(self.TOTALS_QUERY))
+                params = tuple(actual[column] for column in self.COLUMNS) + (self.TOTALS_ID,)
+                if self.db.execute_update(query, params) != 1:
+                    raise RuntimeError("violation_totals row is missing")
+            return True
+        except Exception as e:
+            print(f"Error rebuilding violation totals: {e}")
+            return False
+    
+    def verify_totals(self) -> Optional[Dict]:
+        """
+        Compare the violation_totals row with a fresh aggregate of the violations table
+        Both are read in one transaction so concurrent writes can't show as drift
+        
+        Returns:
+            Dictionary with stored and actual (dictionaries of COLUMNS) if they
+            differ, None when the row is consistent
+        """
+        with self.db.transaction():
+            actual = self._normalize(self.db.fetch_one(self.TOTALS_QUERY))
+            stored = self.get_totals()
+        return {'stored': stored, 'actual': actual} if stored != actual else None
+    
+    def verify(self) -> List[Dict]:
+        """
+        Compare every balance row with a fresh aggregate of the violations table
+        Both are read on the transaction's connection, so concurrent writes
+        can't show as drift
+        
+        Returns:
+            List of drifted users, each with user_id, stored and actual
+            (dictionaries of COLUMNS); empty when the table is consistent
+        """
+        with self.db.transaction():
+            actual = {
+                row['user_id']: self._normalize(row)
+                for row in self.db.fetch_all(self.AGGREGATE_QUERY.format(condition="user_id IS NOT NULL"))
+            }
+            query = f"SELECT user_id, {', '.join(self.COLUMNS)} FROM user_balances"
+            stored = {row['user_id']: self._normalize(row) for row in self.db.fetch_all(query)}
+        
+        zero = self._normalize(None)
+        drift = []
+        for user_id in sorted(set(actual) | set(stored)):
+            expected, found = actual.get(user_id, zero), stored.get(user_id, zero)
+            if expected != found:
+                drift.append({'user_id': user_id, 'stored': found, 'actual': expected})
+        return drift
@@ -0,0 +1,172 @@
+"""
+Idempotency Manager
+Records responses to requests sent with an Idempotency-Key so retries replay them
+"""
+
+from typing import Dict, Optional
+from datetime import datetime, timedelta
+import sys
+import uuid
+sys.path.append('..')
+
+from database.db_connection import get_db
+from config import IDEMPOTENCY_CONFIG
+
+
+class IdempotencyManager:
+    """
+    Manager class for the idempotency_keys table
+    A key is claimed with an insert that skips existing rows, so of several
+    concurrent requests with the same key exactly one runs; the others see
+    it in progress or replay its stored response. A claim that has not
+    completed within the lease (its worker died) can be taken over. Each
+    claim carries a random token, so only the current holder can store a
+    response for the key or release it.
+    """
+    
+    def __init__(self):
+        """Initialize idempotency manager with database connection"""
+        self.db = get_db()
+        self._last_purge = None
+    
+    def begin(self, scope: str, key: str, request_hash: str) -> Dict:
+        """
+        Claim a key for a request, or report what happened to it before
+        
+        Args:
+            scope: Who and what the key applies to (e.g. '<user_id>:<endpoint>')
+            key: Client-supplied Idempotency-Key
+            request_hash: Hash of the request body
+        Returns:
+            Dictionary with 'state': 'new' (caller should run the request and
+            pass 'claim' to complete() or abandon(); also when it takes over
+            a claim whose lease ran out), 'replay' (with response_status and
+            response_body), 'in_progress' or 'mismatch' (key reused for a
+            different request)
+        """
+        now = datetime.now()
+        if self._last_purge is None or (now - self._last_purge).total_seconds() >= IDEMPOTENCY_CONFIG['purge_interval']:
+            self._last_purge = now
+            self.purge_expired()
+        
+        claim = uuid.uuid4().hex
+        claim_query = f"""
+            {self.db.dialect.insert_ignore()} INTO idempotency_keys
+            (scope, idempotency_key, request_hash, created_at, expires_at, claimed_at, claim_token)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        params = (
+            scope, key, request_hash,
+            now.strftime('%Y-%m-%d %H:%M:%S'),
+            (now + timedelta(seconds=IDEMPOTENCY_CONFIG['ttl'])).strftime('%Y-%m-%d %H:%M:%S'),
+            now.strftime('%Y-%m-%d %H:%M:%S'),
+            claim
+        )
+        
+        for _ in range(2):
+            if self.db.execute_update(claim_query, params):
+                return {'state': 'new', 'claim': claim}
+            
+            existing = self.db.fetch_one("""
+                SELECT request_hash, response_status, response_body, expires_at
+                FROM idempotency_keys
+                WHERE scope = %s AND idempotency_key = %s
+            """, (scope, key))
+            
+            if not existing:
+                continue
+            if str(existing['expires_at']) < params[3]:
+                # Expired: drop it (unless another request already replaced it) and claim again
+                self.db.execute_update("""
+                    DELETE FROM idempotency_keys
+                    WHERE scope = %s AND idempotency_key = %s AND expires_at < %s
+                """, (scope, key, params[3]))
+                continue
+            if existing['request_hash'] != request_hash:
+                return {'state': 'mismatch'}
+            if existing['response_status'] is None:
+                if self._reclaim(scope, key, claim, now):
+                    return {'state': 'new', 'claim': claim}
+                return {'state': 'in_progress'}
+            return {
+                'state': 'replay',
+                'response_status': existing['response_status'],
+                'response_body': existing['response_body']
+            }
+        
+        return {'state': 'in_progress'}
+    
+    def _reclaim(self, scope: str, key: str, claim: str, now: datetime) -> bool:
+        """
+        Take over an unfinished claim whose lease has run out
+        The conditional update succeeds for at most one of several requests
+        racing for the same stale key
+        
+        Args:
+            scope: Scope passed to begin()
+            key: Idempotency-Key
+            claim: Token of the new claim
+            now: Time of the new claim
+        Returns:
+            True if this request now holds the key, False otherwise
+        """
+        query = """
+            UPDATE idempotency_keys
+            SET claimed_at = %s, claim_token = %s
+            WHERE scope = %s AND idempotency_key = %s
+            AND response_status IS NULL
+            AND (claimed_at IS NULL OR claimed_at < %s)
+        """
+        cutoff = now - timedelta(seconds=IDEMPOTENCY_CONFIG['lease'])
+        params = (now.strftime('%Y-%m-%d %H:%M:%S'), claim, scope, key, cutoff.strftime('%Y-%m-%d %H:%M:%S'))
+        return self.db.execute_update(query, params) == 1
+    
+    def complete(self, scope: str, key: str, claim: str, response_status: int, response_body: str) -> bool:
+        """
+        Store the response of a request that claimed a key
+        
+        Args:
+            scope: Scope passed to begin()
+            key: Idempotency-Key
+            claim: Claim token returned by begin()
+            response_status: HTTP status code
+            response_body: Response body text
+        Returns:
+            True if stored, False if the claim was lost (taken over after its
+            lease ran out) or the update failed
+        """
+        query = """
+            UPDATE idempotency_keys
+            SET response_status = %s, response_body = %s
+            WHERE scope = %s AND idempotency_key = %s
+            AND claim_token = %s AND response_status IS NULL
+        """
+        return self.db.execute_update(query, (response_status, response_body, scope, key, claim)) == 1
+    
+    def abandon(self, scope: str, key: str, claim: str) -> bool:
+        """
+        Release a key so the request can be retried (used when it failed)
+        
+        Args:
+            scope: Scope passed to begin()
+            key: Idempotency-Key
+            claim: Claim token returned by begin()
+        Returns:
+            True if released, False if the claim was lost or the delete failed
+        """
+        query = """
+            DELETE FROM idempotency_keys
+            WHERE scope = %s AND idempotency_key = %s
+            AND claim_token = %s AND response_status IS NULL
+        """
+        return self.db.execute_update(query, (scope, key, claim)) == 1
+    
+    def purge_expired(self) -> Optional[int]:
+        """
+        Delete expired keys
+        
+        Returns:
+            Number of keys deleted, or None on failure
+        """
+        query = "DELETE FROM idempotency_keys WHERE expires_at < %s"
+        return self.db.execute_update(query, (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),))
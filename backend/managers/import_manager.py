@@ -0,0 +1,370 @@
+"""
+Import Manager
+Offline bulk import of historical violations and payments from CSV files
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
+import csv
+import time
+import sys
+sys.path.append('..')
+
+from database.db_connection import get_db
+from managers.violation_manager import ViolationManager
+from managers.payment_manager import PaymentManager
+from utils.validators import validate_datetime, validate_id, validate_payment_input, validate_violation_status
+from config import BULK_CONFIG
+
+
+class ImportManager:
+    """
+    Manager class for CSV imports
+    Files are streamed in chunks; each chunk is validated, resolved and written
+    with one multi-row insert per transaction. Rejected rows go to a reject
+    file with their line number and errors.
+    """
+    
+    DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d')
+    
+    def __init__(self, chunk_size: Optional[int] = None):
+        """
+        Initialize import manager
+        
+        Args:
+            chunk_size: Rows per transaction (defaults to BULK_CONFIG['import_chunk_size'])
+        """
+        self.db = get_db()
+        self.violations = ViolationManager()
+        self.payments = PaymentManager()
+        self.chunk_size = chunk_size or BULK_CONFIG['import_chunk_size']
+    
+    def _read_chunks(self, csv_path: str) -> Iterator[Tuple[List[str], List[Tuple[int, Dict]]]]:
+        """
+        Stream a CSV file in chunks
+        
+        Args:
+            csv_path: Path of the CSV file (header row required)
+        Returns:
+            Iterator of (header, [(line_number, row), ...])
+        """
+        with open(csv_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            header = reader.fieldnames or []
+            chunk = []
+            for row in reader:
+                chunk.append((reader.line_num, {
+                    key.strip(): (value or '').strip() for key, value in row.items() if key
+                }))
+                if len(chunk) >= self.chunk_size:
+                    yield header, chunk
+                    chunk = []
+            if chunk:
+                yield header, chunk
+    
+    def _parse_datetime(self, value: str) -> Optional[str]:
+        """
+        Normalize a date or datetime string to 'YYYY-MM-DD HH:MM:SS'
+        
+        Returns:
+            Normalized string, or None if no accepted format matches
+        """
+        for date_format in self.DATETIME_FORMATS:
+            if validate_datetime(value, date_format)[0]:
+                return datetime.strptime(value, date_format).strftime('%Y-%m-%d %H:%M:%S')
+        return None
+    
+    def _reference_maps(self) -> Dict:
+        """
+        Preload violation type and area lookups keyed by lowercase name
+        Area names that exist in several cities map to None unless the city is given
+        
+        Returns:
+            Dictionary with types, areas and areas_by_city lookups
+        """
+        types = {row['type_name'].lower(): row for row in self.violations.get_violation_types()}
+        areas = {}
+        areas_by_city = {}
+        for row in self.violations.get_areas():
+            name = row['area_name'].lower()
+            areas[name] = None if name in areas else row['area_id']
+            areas_by_city[(name, row['city'].lower())] = row['area_id']
+        
+        return {'types': types, 'areas': areas, 'areas_by_city': areas_by_city}
+    
+    def _resolve_violation(self, row: Dict, maps: Dict, officer_id: Optional[int]) -> Tuple[Dict, Dict]:
+        """
+        Turn a violation CSV row into a create_violations_bulk record
+        
+        Args:
+            row: CSV row (vehicle_number, violation_type or type_id, area or
+                 area_id, optional city, officer_id, violation_date,
+                 fine_amount, status, user_id, notes)
+            maps: Lookups from _reference_maps
+            officer_id: Officer used when the row has none
+        Returns:
+            Tuple of (record, errors)
+        """
+        errors = {}
+        record = {
+            'vehicle_number': row.get('vehicle_number', ''),
+            'officer_id': row.get('officer_id') or officer_id,
+            'user_id': None,
+            'notes': row.get('notes', '')
+        }
+        
+        # Only a blank user_id means "no owner"; anything else must be a valid ID
+        user_id = (row.get('user_id') or '').strip()
+        if user_id:
+            is_valid, error = validate_id(user_id, "User ID")
+            if is_valid:
+                record['user_id'] = int(user_id)
+            else:
+                errors['user_id'] = error
+        
+        violation_type = None
+        if row.get('type_id'):
+            record['type_id'] = row['type_id']
+        elif row.get('violation_type'):
+            violation_type = maps['types'].get(row['violation_type'].lower())
+            if violation_type:
+                record['type_id'] = violation_type['type_id']
+            else:
+                errors['violation_type'] = f"Unknown violation type: {row['violation_type']}"
+        
+        if row.get('area_id'):
+            record['area_id'] = row['area_id']
+        elif row.get('area'):
+            name = row['area'].lower()
+            if row.get('city'):
+                area_id = maps['areas_by_city'].get((name, row['city'].lower()))
+            else:
+                area_id = maps['areas'].get(name)
+            if area_id:
+                record['area_id'] = area_id
+            elif name in maps['areas'] and not row.get('city'):
+                errors['area'] = f"Area exists in several cities, add a city column: {row['area']}"
+            else:
+                errors['area'] = f"Unknown area: {row['area']}"
+        
+        # Fine defaults to the type's base fine
+        if row.get('fine_amount'):
+            record['fine_amount'] = row['fine_amount']
+        elif violation_type:
+            record['fine_amount'] = violation_type['base_fine']
+        
+        violation_date = self._parse_datetime(row.get('violation_date', ''))
+        if violation_date:
+            record['violation_date'] = violation_date
+        else:
+            errors['violation_date'] = "Invalid or missing violation date"
+        
+        if row.get('status'):
+            is_valid, error = validate_violation_status(row['status'])
+            if is_valid:
+                record['status'] = row['status'].lower()
+            else:
+                errors['status'] = error
+        
+        return record, errors
+    
+    def import_violations(self, csv_path: str, reject_path: Optional[str] = None,
+                          officer_id: Optional[int] = None) -> Dict:
+        """
+        Import violations from a CSV file
+        
+        Args:
+            csv_path: Path of the CSV file
+            reject_path: Where rejected rows are written (defaults to <csv_path>.rejects.csv)
+            officer_id: Officer for rows without an officer_id column value
+        Returns:
+            Dictionary with total, imported, rejected, seconds and rows_per_minute
+        """
+        maps = self._reference_maps()
+        
+        def process(chunk):
+            records, record_errors, errors_by_index = [], [], []
+            for _, row in chunk:
+                record, errors = self._resolve_violation(row, maps, officer_id)
+                errors_by_index.append(errors)
+                if not errors:
+                    records.append(record)
+                    record_errors.append(errors)
+            
+            if records:
+                results = self.violations.create_violations_bulk(records, chunk_size=len(records))
+                for result, errors in zip(results, record_errors):
+                    errors.update(result.get('errors') or {})
+            return errors_by_index
+        
+        return self._run(csv_path, reject_path, process)
+    
+    def import_payments(self, csv_path: str, reject_path: Optional[str] = None) -> Dict:
+        """
+        Import payments from a CSV file and mark their violations as paid
+        Each chunk's payments and status changes are written in one
+        transaction. Rows for unknown or already paid violations, a second
+        payment for one violation and known or repeated transaction IDs are
+        rejected up front so they can't fail the rest of the chunk.
+        
+        Args:
+            csv_path: Path of the CSV file (violation_id, payment_date,
+                      amount_paid, payment_method, optional transaction_id)
+            reject_path: Where rejected rows are written (defaults to <csv_path>.rejects.csv)
+        Returns:
+            Dictionary with total, imported, rejected, seconds and rows_per_minute
+        """
+        query = """
+            INSERT INTO payments
+            (violation_id, payment_date, amount_paid, payment_method, transaction_id)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+        
+        def process(chunk):
+            errors_by_index = []
+            candidates = []
+            for _, row in chunk:
+                is_valid, errors = validate_payment_input(row)
+                payment_date = self._parse_datetime(row.get('payment_date', ''))
+                if not payment_date:
+                    errors['payment_date'] = "Invalid or missing payment date"
+                errors_by_index.append(errors)
+                if not errors:
+                    candidates.append((errors, (
+                        int(row['violation_id']),
+                        payment_date,
+                        float(row['amount_paid']),
+                        row['payment_method'].lower(),
+                        row.get('transaction_id') or None
+                    )))
+            
+            known_transactions = self.payments.get_payments_by_transaction_ids(
+                [params[4] for _, params in candidates if params[4]]
+            )
+            
+            try:
+                with self.db.transaction(immediate=True):
+                    statuses = self._violation_statuses([params[0] for _, params in candidates], lock=True)
+                    
+                    accepted = []
+                    seen_violations, seen_transactions = set(), set()
+                    for errors, params in candidates:
+                        violation_id, transaction_id = params[0], params[4]
+                        if violation_id not in statuses:
+                            errors['violation_id'] = "Violation not found"
+                        elif statuses[violation_id] == 'paid':
+                            errors['violation_id'] = "Violation already paid"
+                        elif violation_id in seen_violations:
+                            errors['violation_id'] = "Violation paid earlier in this file"
+                        elif transaction_id and (transaction_id in known_transactions
+                                                 or transaction_id in seen_transactions):
+                            errors['transaction_id'] = "Duplicate transaction ID"
+                        else:
+                            seen_violations.add(violation_id)
+                            if transaction_id:
+                                seen_transactions.add(transaction_id)
+                            accepted.append((errors, params))
+                    
+                    if accepted:
+                        params_list = [params for _, params in accepted]
+                        if not self.db.execute_many(query, params_list):
+                            raise RuntimeError("Failed to insert payments")
+                        changed = self.violations.update_status_bulk(
+                            [params[0] for params in params_list], 'paid'
+                        )
+                        if changed != len(params_list):
+                            raise RuntimeError(f"Marked {changed} of {len(params_list)} violations paid")
+            except Exception as e:
+                print(f"Error importing payments: {e}")
+                for errors, _ in candidates:
+                    if not errors:
+                        errors['database'] = "Chunk rolled back, import it again"
+            return errors_by_index
+        
+        return self._run(csv_path, reject_path, process)
+    
+    def _violation_statuses(self, violation_ids: List[int], lock: bool = False,
+                            batch_size: int = 500) -> Dict[int, str]:
+        """
+        Get the status of each of the given violations that exists
+        
+        Args:
+            violation_ids: IDs to check
+            lock: Lock the rows until the current transaction ends (MySQL)
+            batch_size: IDs per query
+        Returns:
+            Dictionary of violation ID to status
+        """
+        violation_ids = sorted(set(violation_ids))
+        statuses = {}
+        for start in range(0, len(violation_ids), batch_size):
+            batch = violation_ids[start:start + batch_size]
+            query = f"""
+                SELECT violation_id, status FROM violations
+                WHERE violation_id IN ({', '.join(['%s'] * len(batch))})
+                {self.db.dialect.for_update() if lock else ''}
+            """
+            statuses.update((row['violation_id'], row['status'])
+                            for row in self.db.fetch_all(query, tuple(batch)))
+        return statuses
+    
+    @staticmethod
+    def _reject_columns(header: List[str]) -> Tuple[str, str]:
+        """
+        Pick names for the reject file's line and errors columns
+        The original columns are written unchanged, so the added ones get
+        names the CSV doesn't already use
+        
+        Args:
+            header: Columns of the imported CSV
+        Returns:
+            Tuple of (line column, errors column)
+        """
+        names = []
+        for name in ('reject_line', 'reject_errors'):
+            while name in header:
+                name = f"_{name}"
+            names.append(name)
+        return names[0], names[1]
+    
+    def _run(self, csv_path: str, reject_path: Optional[str], process) -> Dict:
+        """
+        Stream a CSV file through process() chunk by chunk and write rejects
+        
+        Args:
+            csv_path: Path of the CSV file
+            reject_path: Path of the reject file
+            process: Callable taking a chunk and returning one errors dict per row
+        Returns:
+            Dictionary with total, imported, rejected, seconds and rows_per_minute
+        """
+        reject_path = reject_path or f"{csv_path}.rejects.csv"
+        started = time.monotonic()
+        total = rejected = 0
+        
+        with open(reject_path, 'w', newline='', encoding='utf-8') as reject_file:
+            writer = None
+            for header, chunk in self._read_chunks(csv_path):
+                if writer is None:
+                    line_column, errors_column = self._reject_columns(header)
+                    writer = csv.DictWriter(reject_file, fieldnames=[line_column] + header + [errors_column],
+                                            extrasaction='ignore')
+                    writer.writeheader()
+                
+                for (line, row), errors in zip(chunk, process(chunk)):
+                    if errors:
+                        rejected += 1
+                        writer.writerow({**row, line_column: line, errors_column: '; '.join(
+                            f"{field}: {message}" for field, message in errors.items()
+                        )})
+                total += len(chunk)
+        
+        seconds = time.monotonic() - started
+        return {
+            'total': total,
+            'imported': total - rejected,
+            'rejected': rejected,
+            'reject_file': reject_path,
+            'seconds': round(seconds, 2),
+            'rows_per_minute': int(total / seconds * 60) if seconds else total
+        }
@@ -0,0 +1,154 @@
+"""
+Late Fee Manager
+Nightly late-fee computation over all unpaid violations
+"""
+
+from typing import Dict, List, Optional, Tuple
+from array import array
+from datetime import date, datetime
+import time
+import sys
+sys.path.append('..')
+
+from database.db_connection import get_db
+from config import FINE_RULES
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the plain Python path gives the same results
+    np = None
+
+
+class LateFeeManager:
+    """
+    Manager class for late fees
+    Unpaid violations are loaded as columns (IDs, violation day, fine and
+    current fee in cents) and the fees for the whole set are computed in one
+    pass, vectorized with NumPy when it is installed:
+    
+        overdue days = min(max(days since violation - grace period, 0), cap)
+        late fee     = fine * late_fee_percentage * overdue days
+    
+    Only changed fees are written, grouped by value so each UPDATE sets one
+    fee on up to late_fee_batch_size violations.
+    """
+    
+    def __init__(self):
+        """Initialize late fee manager with database connection"""
+        self.db = get_db()
+        self.grace_days = FINE_RULES['grace_period_days']
+        self.max_days = FINE_RULES['max_late_fee_days']
+        # Percentage in basis points so fees are exact integer cents
+        self.rate_bp = int(round(FINE_RULES['late_fee_percentage'] * 10000))
+        self.batch_size = FINE_RULES['late_fee_batch_size']
+    
+    @staticmethod
+    def _day_number(value) -> int:
+        """Get the proleptic ordinal of a DATETIME value (datetime or 'YYYY-MM-DD ...' string)"""
+        if isinstance(value, (datetime, date)):
+            return value.toordinal()
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    
+    def _load_unpaid(self) -> Tuple[array, array, array, array]:
+        """
+        Stream unpaid violations into columns
+        
+        Returns:
+            Tuple of arrays (violation_ids, day_numbers, fine_cents, late_fee_cents)
+        """
+        ids, days, fines, fees = array('q'), array('q'), array('q'), array('q')
+        query = """
+            SELECT violation_id, violation_date, fine_amount, late_fee
+            FROM violations
+            WHERE status = 'unpaid'
+        """
+        for row in self.db.fetch_iter(query):
+            ids.append(row['violation_id'])
+            days.append(self._day_number(row['violation_date']))
+            fines.append(int(round(float(row['fine_amount']) * 100)))
+            fees.append(int(round(float(row['late_fee'] or 0) * 100)))
+        return ids, days, fines, fees
+    
+    def _compute_numpy(self, today: int, days: array, fines: array):
+        """Late fees in cents for all violations, vectorized"""
+        overdue = np.clip(today - np.frombuffer(days, dtype=np.int64) - self.grace_days,
+                          0, self.max_days)
+        # Round half up: (x + 5000) // 10000
+        return (np.frombuffer(fines, dtype=np.int64) * overdue * self.rate_bp + 5000) // 10000
+    
+    def _compute_python(self, today: int, days: array, fines: array) -> array:
+        """Late fees in cents for all violations, plain Python"""
+        grace, cap, rate = self.grace_days, self.max_days, self.rate_bp
+        return array('q', (
+            (fine * min(max(today - day - grace, 0), cap) * rate + 5000) // 10000
+            for day, fine in zip(days, fines)
+        ))
+    
+    def _changes_by_fee(self, ids: array, new_fees, old_fees: array) -> Dict[int, List[int]]:
+        """
+        Group the violations whose fee changed by their new fee
+        
+        Returns:
+            Dictionary of new fee in cents to violation IDs
+        """
+        groups = {}
+        if np is not None:
+            id_column = np.frombuffer(ids, dtype=np.int64)
+            changed = new_fees != np.frombuffer(old_fees, dtype=np.int64)
+            changed_ids, changed_fees = id_column[changed], new_fees[changed]
+            order = np.argsort(changed_fees, kind='stable')
+            values, starts = np.unique(changed_fees[order], return_index=True)
+            for value, group in zip(values.tolist(), np.split(changed_ids[order], starts[1:])):
+                groups[value] = group.tolist()
+            return groups
+        
+        for violation_id, new_fee, old_fee in zip(ids, new_fees, old_fees):
+            if new_fee != old_fee:
+                groups.setdefault(new_fee, []).append(violation_id)
+        return groups
+    
+    def apply_late_fees(self, as_of: Optional[date] = None) -> Dict:
+        """
+        Recompute and store the late fee of every unpaid violation
+        
+        Args:
+            as_of: Day the fees are computed for (defaults to today)
+        Returns:
+            Dictionary with unpaid, updated, total_late_fees, engine and seconds
+        """
+        started = time.monotonic()
+        today = (as_of or date.today()).toordinal()
+        
+        ids, days, fines, old_fees = self._load_unpaid()
+        if np is not None:
+            new_fees = self._compute_numpy(today, days, fines)
+            total_cents = int(new_fees.sum())
+        else:
+            new_fees = self._compute_python(today, days, fines)
+            total_cents = sum(new_fees)
+        
+        groups = self._changes_by_fee(ids, new_fees, old_fees)
+        
+        updated = 0
+        with self.db.transaction():
+            for fee_cents, violation_ids in groups.items():
+                for start in range(0, len(violation_ids), self.batch_size):
+                    batch = violation_ids[start:start + self.batch_size]
+                    # Skip violations paid since they were loaded
+                    query = f"""
+                        UPDATE violations SET late_fee = %s
+                        WHERE status = 'unpaid'
+                        AND violation_id IN ({', '.join(['%s'] * len(batch))})
+                    """
+                    rowcount = self.db.execute_update(query, (fee_cents / 100, *batch))
+                    if rowcount is None:
+                        raise RuntimeError("Failed to update late fees")
+                    updated += rowcount
+        
+        return {
+            'unpaid': len(ids),
+            'updated': updated,
+            'total_late_fees': total_cents / 100,
+            'engine': 'numpy' if np is not None else 'python',
+            'seconds': round(time.monotonic() - started, 2)
+        }
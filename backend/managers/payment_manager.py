@@ -3,13 +3,16 @@ Payment Manager
 Handles all payment-related business logic and database operations
 """
 
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterator, Tuple
 from datetime import datetime
 import sys
 sys.path.append('..')
 
 from models.payment import Payment
 from database.db_connection import get_db
+from managers.violation_manager import ViolationManager
+from models.analytics import invalidate_analytics_cache
+from utils.transaction_ids import new_transaction_id
 
 
 class PaymentManager:
@@ -21,19 +24,38 @@ class PaymentManager:
     def __init__(self):
         """Initialize payment manager with database connection"""
         self.db = get_db()
+        self.violations = ViolationManager()
     
     def create_payment(self, payment: Payment) -> Optional[int]:
         """
-        Record a new payment
+        Record a new payment and mark its violation paid in one transaction
+        The violation row is locked first, so concurrent payments for the
+        same violation are serialized and only the first one succeeds
         
         Args:
             payment: Payment object to create
         Returns:
             Payment ID if successful, None otherwise
         """
-        # Start transaction
+        return self._record_payment(payment)[0]
+    
+    def _record_payment(self, payment: Payment) -> Tuple[Optional[int], str]:
+        """
+        Record a payment (see create_payment) and say why it was refused
+        
+        Args:
+            payment: Payment object to create
+        Returns:
+            Tuple of (payment ID or None, outcome): 'created', 'not_found',
+            'already_paid' or 'error'
+        """
         try:
-            # Insert payment record
+            lock_query = f"""
+                SELECT violation_id, status
+                FROM violations
+                WHERE violation_id = %s{self.db.dialect.for_update()}
+            """
+            
             query = """
                 INSERT INTO payments 
                 (violation_id, payment_date, amount_paid, payment_method, transaction_id)
@@ -45,27 +67,31 @@ class PaymentManager:
                 payment.payment_date.strftime('%Y-%m-%d %H:%M:%S'),
                 payment.amount_paid,
                 payment.payment_method,
-                payment.transaction_id
+                payment.transaction_id or None  # Blank IDs would collide on the unique index
             )
             
-            if self.db.execute_query(query, params):
-                payment_id = self.db.get_last_insert_id()
+            with self.db.transaction(immediate=True):
+                violation = self.db.fetch_one(lock_query, (payment.violation_id,))
+                if not violation:
+                    print("Violation not found")
+                    return None, 'not_found'
+                if violation['status'] == 'paid':
+                    print("Violation already paid")
+                    return None, 'already_paid'
                 
-                # Update violation status to paid
-                update_query = """
-                    UPDATE violations 
-                    SET status = 'paid'
-                    WHERE violation_id = %s
-                """
+                payment_id = self.db.insert_returning_id(query, params)
                 
-                if self.db.execute_query(update_query, (payment.violation_id,)):
-                    return payment_id
+                # Update violation status to paid (keeps analytics rollups in step)
+                if not payment_id or not self.violations.update_violation_status(payment.violation_id, 'paid'):
+                    raise RuntimeError("Failed to record payment")
+                
+                self.db.on_commit(invalidate_analytics_cache)
             
-            return None
+            return payment_id, 'created'
             
         except Exception as e:
             print(f"Error creating payment: {e}")
-            return None
+            return None, 'error'
     
     def get_payment_by_id(self, payment_id: int) -> Optional[Payment]:
         """
@@ -83,7 +109,7 @@ class PaymentManager:
         result = self.db.fetch_one(query, (payment_id,))
         
         if result:
-            return Payment.from_dict(result)
+            return Payment.from_row(result)
         return None
     
     def get_payment_by_violation(self, violation_id: int) -> Optional[Payment]:
@@ -105,7 +131,7 @@ class PaymentManager:
         result = self.db.fetch_one(query, (violation_id,))
         
         if result:
-            return Payment.from_dict(result)
+            return Payment.from_row(result)
         return None
     
     def get_all_payments(self, limit: int = 100) -> List[Dict]:
@@ -138,6 +164,49 @@ class PaymentManager:
         
         return self.db.fetch_all(query, (limit,))
     
+    def iter_payments(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                      after_id: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Stream payments with violation details in payment ID order
+        
+        Args:
+            date_from: Earliest payment date ('YYYY-MM-DD HH:MM:SS')
+            date_to: Exclusive upper bound on payment date
+            after_id: Only return payments with a higher ID (resume point)
+        Returns:
+            Iterator of payment dictionaries with joined data
+        """
+        conditions = []
+        params = []
+        for condition, value in (("p.payment_date >= %s", date_from),
+                                 ("p.payment_date < %s", date_to),
+                                 ("p.payment_id > %s", after_id)):
+            if value:
+                conditions.append(condition)
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        query = f"""
+            SELECT 
+                p.payment_id,
+                p.violation_id,
+                v.vehicle_number,
+                u.full_name AS owner_name,
+                p.payment_date,
+                p.amount_paid,
+                p.payment_method,
+                p.transaction_id,
+                vt.type_name
+            FROM payments p
+            JOIN violations v ON p.violation_id = v.violation_id
+            LEFT JOIN users u ON v.user_id = u.user_id
+            JOIN violation_types vt ON v.type_id = vt.type_id
+            {where}
+            ORDER BY p.payment_id
+        """
+        
+        return self.db.fetch_iter(query, tuple(params))
+    
     def get_payments_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Dict]:
         """
         Get payments within a date range
@@ -203,19 +272,20 @@ class PaymentManager:
         Returns:
             List of daily collection amounts
         """
-        query = """
+        day = self.db.dialect.bucket('payment_date', 'day')
+        query = f"""
             SELECT 
-                DATE(payment_date) as date,
+                {day} as date,
                 COUNT(*) as payment_count,
                 SUM(amount_paid) as total_collected,
                 ROUND(AVG(amount_paid), 2) as avg_amount
             FROM payments
-            WHERE payment_date >= date('now', '-' || %s || ' days')
-            GROUP BY DATE(payment_date)
+            WHERE payment_date >= %s
+            GROUP BY {day}
             ORDER BY date DESC
         """
         
-        return self.db.fetch_all(query, (days,))
+        return self.db.fetch_all(query, (self.db.dialect.days_ago(days),))
     
     def get_payment_method_distribution(self) -> List[Dict]:
         """
@@ -303,43 +373,47 @@ class PaymentManager:
         Returns:
             Payment ID if successful, None otherwise
         """
-        # Verify violation exists and get fine amount
-        check_query = """
-            SELECT violation_id, fine_amount, status 
-            FROM violations 
-            WHERE violation_id = %s
+        return self.process_payment_with_outcome(violation_id, amount, payment_method)[0]
+    
+    def process_payment_with_outcome(self, violation_id: int, amount: float,
+                                     payment_method: str = 'cash') -> Tuple[Optional[int], str]:
         """
+        Process a payment for a violation and say why it was refused
         
-        violation = self.db.fetch_one(check_query, (violation_id,))
-        
-        if not violation:
-            print("Violation not found")
-            return None
-        
-        if violation['status'] == 'paid':
-            print("Violation already paid")
-            return None
-        
-        # Create payment object
-        payment = Payment(
-            violation_id=violation_id,
-            payment_date=datetime.now(),
-            amount_paid=amount,
-            payment_method=payment_method,
-            transaction_id=self._generate_transaction_id()
-        )
+        Args:
+            violation_id: Violation ID to pay
+            amount: Amount being paid
+            payment_method: Method of payment
+        Returns:
+            Tuple of (payment ID or None, outcome): 'created', 'not_found',
+            'already_paid' or 'error'
+        """
+        # create_payment checks the violation's status under a row lock
+        for _ in range(3):
+            payment = Payment(
+                violation_id=violation_id,
+                payment_date=datetime.now(),
+                amount_paid=amount,
+                payment_method=payment_method,
+                transaction_id=self._generate_transaction_id()
+            )
+            
+            payment_id, outcome = self._record_payment(payment)
+            if outcome != 'error' or not self.get_payments_by_transaction_ids([payment.transaction_id]):
+                return payment_id, outcome
+            # Another worker issued the same ID (TRANSACTION_NODE_ID not set per worker)
+            print(f"Transaction ID {payment.transaction_id} already used; retrying with a new one")
         
-        return self.create_payment(payment)
+        return None, 'error'
     
     def _generate_transaction_id(self) -> str:
         """
         Generate a unique transaction ID
         
         Returns:
-            Transaction ID string
+            Transaction ID string (see utils.transaction_ids)
         """
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        return f"TXN{timestamp}"
+        return new_transaction_id()
     
     def get_recent_payments(self, limit: int = 10) -> List[Dict]:
         """
@@ -390,6 +464,31 @@ class PaymentManager:
         
         return self.db.fetch_one(query, (transaction_id,))
     
+    def get_payments_by_transaction_ids(self, transaction_ids: List[str],
+                                        batch_size: int = 900) -> Dict[str, Dict]:
+        """
+        Look up many transactions at once (bulk verify_transaction)
+        
+        Args:
+            transaction_ids: Transaction IDs to look up
+            batch_size: IDs per query
+        Returns:
+            Dictionary of transaction ID to payment row; unknown IDs are absent
+        """
+        transaction_ids = list(set(transaction_ids))
+        payments = {}
+        for start in range(0, len(transaction_ids), batch_size):
+            batch = transaction_ids[start:start + batch_size]
+            query = f"""
+                SELECT payment_id, violation_id, payment_date, amount_paid,
+                       payment_method, transaction_id
+                FROM payments
+                WHERE transaction_id IN ({', '.join(['%s'] * len(batch))})
+            """
+            for row in self.db.fetch_all(query, tuple(batch)):
+                payments[row['transaction_id']] = row
+        return payments
+    
     def get_payment_history_for_user(self, user_id: int) -> List[Dict]:
         """
         Get payment history for a specific user
@@ -427,19 +526,20 @@ class PaymentManager:
         Returns:
             List of monthly collection amounts
         """
-        query = """
+        month = self.db.dialect.bucket('payment_date', 'month')
+        query = f"""
             SELECT 
-                strftime('%Y-%m', payment_date) as month,
+                {month} as month,
                 COUNT(*) as payment_count,
                 SUM(amount_paid) as total_collected,
                 ROUND(AVG(amount_paid), 2) as avg_amount
             FROM payments
-            WHERE payment_date >= date('now', '-' || %s || ' months')
-            GROUP BY strftime('%Y-%m', payment_date)
+            WHERE payment_date >= %s
+            GROUP BY {month}
             ORDER BY month DESC
         """
         
-        return self.db.fetch_all(query, (months,))
+        return self.db.fetch_all(query, (self.db.dialect.months_ago(months),))
     
     def refund_payment(self, payment_id: int) -> bool:
         """
@@ -451,25 +551,33 @@ class PaymentManager:
             True if successful, False otherwise
         """
         try:
-            # Get payment details
-            payment = self.get_payment_by_id(payment_id)
-            
-            if not payment:
-                return False
-            
-            # Delete payment record
-            delete_query = "DELETE FROM payments WHERE payment_id = %s"
-            if not self.db.execute_query(delete_query, (payment_id,)):
-                return False
-            
-            # Update violation status back to unpaid
-            update_query = """
-                UPDATE violations 
-                SET status = 'unpaid'
-                WHERE violation_id = %s
-            """
+            with self.db.transaction(immediate=True):
+                # Get payment details
+                payment = self.get_payment_by_id(payment_id)
+                
+                if not payment:
+                    return False
+                
+                # Lock the violation in the same order as create_payment
+                lock_query = f"""
+                    SELECT violation_id
+                    FROM violations
+                    WHERE violation_id = %s{self.db.dialect.for_update()}
+                """
+                self.db.fetch_one(lock_query, (payment.violation_id,))
+                
+                # Delete payment record (0 rows means a concurrent refund won)
+                delete_query = "DELETE FROM payments WHERE payment_id = %s"
+                if not self.db.execute_update(delete_query, (payment_id,)):
+                    raise RuntimeError("Payment already refunded")
+                
+                # Update violation status back to unpaid
+                if not self.violations.update_violation_status(payment.violation_id, 'unpaid'):
+                    raise RuntimeError("Failed to update violation status")
+                
+                self.db.on_commit(invalidate_analytics_cache)
             
-            return self.db.execute_query(update_query, (payment.violation_id,))
+            return True
             
         except Exception as e:
             print(f"Error refunding payment: {e}")
@@ -0,0 +1,188 @@
+"""
+Plate Match Manager
+Fuzzy vehicle number lookup for camera (OCR) input
+"""
+
+from typing import Dict, Iterable, List, Optional
+import sys
+sys.path.append('..')
+
+from database.db_connection import get_db
+from utils.plates import edit_distance, ocr_fold, plate_key
+from config import PLATE_MATCH_CONFIG
+
+
+def plate_variants(key: str) -> set:
+    """
+    Get the OCR-folded plate key and every one-character deletion of it
+    
+    Args:
+        key: Plate key
+    Returns:
+        Set of variants
+    """
+    folded = ocr_fold(key)
+    return {folded} | {folded[:i] + folded[i + 1:] for i in range(len(folded))}
+
+
+class PlateMatchManager:
+    """
+    Manager class for fuzzy plate matching
+    plate_variants holds, for every plate key, its OCR-folded form (0/O,
+    1/I, 8/B, ... made equal) and that form's one-character deletions. Two
+    folded keys within one edit (substitution, insertion or deletion) always
+    share a variant, so the candidates for a misread plate are found with
+    one primary-key lookup instead of a scan, then checked for distance.
+    """
+    
+    def __init__(self):
+        """Initialize plate match manager with database connection"""
+        self.db = get_db()
+    
+    def index_plates(self, keys: Iterable[str]) -> bool:
+        """
+        Add plate keys to the variant index (known keys are skipped)
+        
+        Args:
+            keys: Plate keys
+        Returns:
+            True if successful, False otherwise
+        """
+        rows = sorted({(variant, key) for key in keys if key for variant in plate_variants(key)})
+        if not rows:
+            return True
+        query = f"""
+            {self.db.dialect.insert_ignore()} INTO plate_variants (variant, plate_key)
+            VALUES (%s, %s)
+        """
+        return self.db.execute_many(query, rows)
+    
+    def refresh_plate_keys(self, batch_size: int = 5000) -> int:
+        """
+        Recompute violations.plate_key with utils.plates.plate_key where it differs
+        Migration 006 leaves the column blank (SQL can't strip every
+        separator the way plate_key does on both backends), so this fills it
+        
+        Args:
+            batch_size: Violations read per batch
+        Returns:
+            Number of violations whose key changed
+        Raises:
+            RuntimeError: If the keys could not be written
+        """
+        select_query = """
+            SELECT violation_id, vehicle_number, plate_key FROM violations
+            WHERE violation_id > %s
+            ORDER BY violation_id
+            LIMIT %s
+        """
+        update_query = "UPDATE violations SET plate_key = %s WHERE violation_id = %s"
+        
+        changed = 0
+        last_id = 0
+        with self.db.transaction():
+            while True:
+                rows = self.db.fetch_all(select_query, (last_id, batch_size))
+                if not rows:
+                    break
+                updates = [(plate_key(row['vehicle_number']), row['violation_id']) for row in rows
+                           if plate_key(row['vehicle_number']) != row['plate_key']]
+                if not self.db.execute_many(update_query, updates):
+                    raise RuntimeError("Failed to update plate keys")
+                changed += len(updates)
+                last_id = rows[-1]['violation_id']
+        return changed
+    
+    def rebuild(self, batch_size: int = 5000) -> int:
+        """
+        Rebuild the variant index from the violations table
+        Keys are read in keyset batches on the transaction's connection and
+        a failed write rolls the rebuild back
+        
+        Args:
+            batch_size: Plate keys read and indexed per batch
+        Returns:
+            Number of plate keys indexed
+        Raises:
+            RuntimeError: If the index could not be written
+        """
+        query = """
+            SELECT DISTINCT plate_key FROM violations
+            WHERE plate_key > %s
+            ORDER BY plate_key
+            LIMIT %s
+        """
+        
+        count = 0
+        with self.db.transaction():
+            if not self.db.execute_query("DELETE FROM plate_variants"):
+                raise RuntimeError("Failed to clear the plate variant index")
+            last_key = ''
+            while True:
+                keys = [row['plate_key'] for row in self.db.fetch_all(query, (last_key, batch_size))]
+                if not keys:
+                    break
+                if not self.index_plates(keys):
+                    raise RuntimeError("Failed to index plate keys")
+                count += len(keys)
+                last_key = keys[-1]
+        return count
+    
+    def match_plate(self, vehicle_number: str, max_distance: Optional[int] = None,
+                    limit: Optional[int] = None) -> List[Dict]:
+        """
+        Find known vehicles matching a possibly misread plate
+        
+        Args:
+            vehicle_number: Plate as read by a camera or typed
+            max_distance: Edits allowed besides OCR confusions, 0 or 1 (defaults to config)
+            limit: Maximum candidates (defaults to config)
+        Returns:
+            List of candidates nearest first, each with plate_key, vehicle_number,
+            distance, exact, violation_count and unpaid_amount
+        """
+        key = plate_key(vehicle_number)
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = PLATE_MATCH_CONFIG['max_distance']
+        max_distance = min(max(max_distance, 0), 1)
+        limit = limit or PLATE_MATCH_CONFIG['max_results']
+        
+        variants = plate_variants(key) if max_distance else {ocr_fold(key)}
+        query = f"""
+            SELECT DISTINCT plate_key FROM plate_variants
+            WHERE variant IN ({', '.join(['%s'] * len(variants))})
+        """
+        folded = ocr_fold(key)
+        hits = []
+        for row in self.db.fetch_all(query, tuple(sorted(variants))):
+            distance = edit_distance(folded, ocr_fold(row['plate_key']))
+            if distance <= max_distance:
+                # Among equals, the fewest raw differences (exact read first)
+                hits.append((distance, edit_distance(key, row['plate_key']), row['plate_key']))
+        hits = sorted(hits)[:limit]
+        if not hits:
+            return []
+        
+        query = f"""
+            SELECT
+                plate_key,
+                MIN(vehicle_number) AS vehicle_number,
+                COUNT(*) AS violation_count,
+                SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END) AS unpaid_amount
+            FROM violations
+            WHERE plate_key IN ({', '.join(['%s'] * len(hits))})
+            GROUP BY plate_key
+        """
+        totals = {row['plate_key']: row
+                  for row in self.db.fetch_all(query, tuple(candidate for _, _, candidate in hits))}
+        
+        return [{
+            'plate_key': candidate,
+            'vehicle_number': totals[candidate]['vehicle_number'],
+            'distance': distance,
+            'exact': raw_distance == 0,
+            'violation_count': totals[candidate]['violation_count'],
+            'unpaid_amount': float(totals[candidate]['unpaid_amount'] or 0)
+        } for distance, raw_distance, candidate in hits if candidate in totals]
@@ -0,0 +1,197 @@
+"""
+Reconciliation Manager
+Reconciles bank / card settlement files against recorded payments
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+import csv
+import os
+import time
+import sys
+sys.path.append('..')
+
+from managers.payment_manager import PaymentManager
+from config import RECONCILIATION_CONFIG
+
+
+class ReconciliationManager:
+    """
+    Manager class for settlement reconciliation
+    The settlement file is streamed in chunks and each chunk's transaction IDs
+    are looked up with a few IN (...) queries instead of one verify_transaction
+    call per line. Every line ends up in exactly one output set:
+    matched, mismatched (amount or date differ, or duplicate line),
+    missing (no such transaction) or invalid (unreadable line).
+    """
+    
+    RESULTS = ('matched', 'mismatched', 'missing', 'invalid')
+    
+    # Accepted header names for each settlement column
+    COLUMNS = {
+        'transaction_id': ('transaction_id', 'txn_id', 'reference'),
+        'amount': ('amount', 'amount_paid', 'settled_amount'),
+        'settlement_date': ('settlement_date', 'date', 'payment_date')
+    }
+    
+    DATE_FORMATS = ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%d/%m/%Y')
+    
+    OUTPUT_FIELDS = ['line', 'transaction_id', 'amount', 'settlement_date', 'payment_id',
+                     'violation_id', 'amount_paid', 'payment_date', 'reason']
+    
+    def __init__(self, chunk_size: Optional[int] = None):
+        """
+        Initialize reconciliation manager
+        
+        Args:
+            chunk_size: Settlement lines per chunk (defaults to RECONCILIATION_CONFIG['chunk_size'])
+        """
+        self.payments = PaymentManager()
+        self.chunk_size = chunk_size or RECONCILIATION_CONFIG['chunk_size']
+        self.amount_tolerance = Decimal(str(RECONCILIATION_CONFIG['amount_tolerance']))
+        self.date_tolerance = timedelta(days=RECONCILIATION_CONFIG['date_tolerance_days'])
+    
+    def _read_chunks(self, settlement_path: str) -> Iterator[List[Tuple[int, Dict]]]:
+        """
+        Stream a settlement CSV file in chunks of normalized lines
+        
+        Args:
+            settlement_path: Path of the CSV file (header row required)
+        Returns:
+            Iterator of [(line_number, {'transaction_id', 'amount', 'settlement_date'}), ...]
+        """
+        with open(settlement_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            header = {name.strip().lower(): name for name in reader.fieldnames or [] if name}
+            columns = {}
+            for column, aliases in self.COLUMNS.items():
+                found = next((header[alias] for alias in aliases if alias in header), None)
+                if found is None:
+                    raise ValueError(f"Settlement file has no {column} column (accepted: {', '.join(aliases)})")
+                columns[column] = found
+            
+            chunk = []
+            for row in reader:
+                chunk.append((reader.line_num, {
+                    column: (row.get(name) or '').strip() for column, name in columns.items()
+                }))
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+    
+    def _parse_date(self, value) -> Optional[date]:
+        """
+        Get the calendar date of a settlement or payment date
+        
+        Returns:
+            date, or None if no accepted format matches
+        """
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        for date_format in self.DATE_FORMATS:
+            try:
+                return datetime.strptime(str(value), date_format).date()
+            except ValueError:
+                continue
+        return None
+    
+    def _classify(self, line: Dict, payment: Optional[Dict], seen: set) -> Tuple[str, str]:
+        """
+        Match one settlement line against its payment
+        
+        Args:
+            line: Normalized settlement line
+            payment: Payment row with the line's transaction ID, or None
+            seen: Transaction IDs of earlier lines
+        Returns:
+            Tuple of (result, reason)
+        """
+        transaction_id = line['transaction_id']
+        try:
+            amount = Decimal(line['amount'])
+        except InvalidOperation:
+            amount = None
+        settlement_date = self._parse_date(line['settlement_date'])
+        
+        if not transaction_id:
+            return 'invalid', "Missing transaction ID"
+        if amount is None or not amount.is_finite():
+            return 'invalid', f"Invalid amount: {line['amount']}"
+        if settlement_date is None:
+            return 'invalid', f"Invalid settlement date: {line['settlement_date']}"
+        if payment is None:
+            return 'missing', "No payment with this transaction ID"
+        if transaction_id in seen:
+            return 'mismatched', "Transaction settled more than once"
+        
+        reasons = []
+        if abs(amount - Decimal(str(payment['amount_paid']))) > self.amount_tolerance:
+            reasons.append(f"Amount {amount} differs from paid {payment['amount_paid']}")
+        
+        payment_date = self._parse_date(str(payment['payment_date'])[:10])
+        if payment_date and not payment_date <= settlement_date <= payment_date + self.date_tolerance:
+            reasons.append(f"Settled {settlement_date} but paid {payment_date}")
+        
+        if reasons:
+            return 'mismatched', '; '.join(reasons)
+        return 'matched', ''
+    
+    def reconcile(self, settlement_path: str, output_dir: Optional[str] = None) -> Dict:
+        """
+        Reconcile a settlement file against the payments table
+        
+        Args:
+            settlement_path: Path of the settlement CSV (transaction_id, amount, settlement_date)
+            output_dir: Directory for matched.csv, mismatched.csv, missing.csv and
+                        invalid.csv (defaults to <settlement_path>.reconciliation)
+        Returns:
+            Dictionary with total, a count per result, output_dir, seconds and rows_per_minute
+        """
+        output_dir = output_dir or f"{settlement_path}.reconciliation"
+        os.makedirs(output_dir, exist_ok=True)
+        
+        started = time.monotonic()
+        counts = dict.fromkeys(self.RESULTS, 0)
+        seen = set()
+        files = {}
+        try:
+            writers = {}
+            for result in self.RESULTS:
+                files[result] = open(os.path.join(output_dir, f"{result}.csv"), 'w',
+                                     newline='', encoding='utf-8')
+                writers[result] = csv.DictWriter(files[result], fieldnames=self.OUTPUT_FIELDS,
+                                                 extrasaction='ignore')
+                writers[result].writeheader()
+            
+            for chunk in self._read_chunks(settlement_path):
+                payments = self.payments.get_payments_by_transaction_ids(
+                    [line['transaction_id'] for _, line in chunk if line['transaction_id']],
+                    batch_size=RECONCILIATION_CONFIG['lookup_batch_size']
+                )
+                
+                for line_number, line in chunk:
+                    payment = payments.get(line['transaction_id'])
+                    result, reason = self._classify(line, payment, seen)
+                    if payment:
+                        seen.add(line['transaction_id'])
+                    
+                    counts[result] += 1
+                    writers[result].writerow(dict(payment or {}, **line, line=line_number, reason=reason))
+        finally:
+            for f in files.values():
+                f.close()
+        
+        seconds = time.monotonic() - started
+        total = sum(counts.values())
+        return dict(
+            counts,
+            total=total,
+            output_dir=output_dir,
+            seconds=round(seconds, 2),
+            rows_per_minute=int(total / seconds * 60) if seconds else total
+        )
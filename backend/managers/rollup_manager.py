@@ -0,0 +1,161 @@
+"""
+Rollup Manager
+Maintains per-day violation rollups used by the analytics engine
+"""
+
+from typing import Dict, Iterable, Tuple
+import sys
+sys.path.append('..')
+
+from database.db_connection import get_db
+
+
+class RollupManager:
+    """
+    Manager class for the violation_daily_rollups table
+    One row per (day, area, type, officer, status) holds the violation count
+    and fine total, updated incrementally on every violation write
+    """
+    
+    def __init__(self):
+        """Initialize rollup manager with database connection"""
+        self.db = get_db()
+    
+    @staticmethod
+    def rollup_key(violation: Dict, status: str = None) -> Tuple:
+        """
+        Get the rollup row key for a violation
+        
+        Args:
+            violation: Dictionary with violation_date, area_id, type_id,
+                       officer_id and status
+            status: Status to use instead of the violation's own
+        Returns:
+            Tuple of (rollup_date, area_id, type_id, officer_id, status)
+        """
+        return (
+            str(violation['violation_date'])[:10],
+            int(violation['area_id']),
+            int(violation['type_id']),
+            int(violation['officer_id']),
+            status or violation['status']
+        )
+    
+    def record_violations(self, violations: Iterable[Dict]) -> bool:
+        """
+        Add newly created violations to the rollups
+        
+        Args:
+            violations: Dictionaries with violation_date, area_id, type_id,
+                        officer_id, status and fine_amount
+        Returns:
+            True if successful, False otherwise
+        """
+        deltas = {}
+        for violation in violations:
+            key = self.rollup_key(violation)
+            count, amount = deltas.get(key, (0, 0.0))
+            deltas[key] = (count + 1, amount + float(violation['fine_amount']))
+        
+        return self._apply(deltas)
+    
+    def record_status_change(self, violation: Dict, new_status: str) -> bool:
+        """
+        Move a violation between status buckets
+        
+        Args:
+            violation: Dictionary with the violation's fields before the change
+            new_status: Status the violation now has
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.record_status_changes([violation], new_status)
+    
+    def record_status_changes(self, violations: Iterable[Dict], new_status: str) -> bool:
+        """
+        Move many violations to one status bucket in a single batch
+        
+        Args:
+            violations: Dictionaries with each violation's fields before the change
+            new_status: Status the violations now have
+        Returns:
+            True if successful, False otherwise
+        """
+        deltas = {}
+        for violation in violations:
+            if violation['status'] == new_status:
+                continue
+            amount = float(violation['fine_amount'])
+            for key, sign in ((self.rollup_key(violation), -1),
+                              (self.rollup_key(violation, new_status), 1)):
+                count, total = deltas.get(key, (0, 0.0))
+                deltas[key] = (count + sign, total + sign * amount)
+        
+        return self._apply(deltas)
+    
+    def rebuild(self) -> bool:
+        """
+        Recompute every rollup row from the violations table
+        Runs in one transaction so readers never see an empty table
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        query = """
+            INSERT INTO violation_daily_rollups
+            (rollup_date, area_id, type_id, officer_id, status, violation_count, total_fines)
+            SELECT
+                DATE(violation_date),
+                area_id,
+                type_id,
+                officer_id,
+                status,
+                COUNT(*),
+                SUM(fine_amount)
+            FROM violations
+            GROUP BY DATE(violation_date), area_id, type_id, officer_id, status
+        """
+        
+        try:
+            with self.db.transaction():
+                if not (self.db.execute_query("DELETE FROM violation_daily_rollups")
+                        and self.db.execute_query(query)):
+                    raise RuntimeError("Failed to rebuild rollups")
+            return True
+        except Exception as e:
+            print(f"Error rebuilding rollups: {e}")
+            return False
+    
+    def _apply(self, deltas: Dict[Tuple, Tuple[int, float]]) -> bool:
+        """
+        Add count and amount deltas to rollup rows, creating missing rows
+        
+        Args:
+            deltas: Mapping of rollup key to (count_delta, amount_delta)
+        Returns:
+            True if successful, False otherwise
+        """
+        if not deltas:
+            return True
+        
+        if self.db.db_type == 'mysql':
+            query = """
+                INSERT INTO violation_daily_rollups
+                (rollup_date, area_id, type_id, officer_id, status, violation_count, total_fines)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    violation_count = violation_count + VALUES(violation_count),
+                    total_fines = total_fines + VALUES(total_fines)
+            """
+        else:
+            query = """
+                INSERT INTO violation_daily_rollups
+                (rollup_date, area_id, type_id, officer_id, status, violation_count, total_fines)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (rollup_date, area_id, type_id, officer_id, status) DO UPDATE SET
+                    violation_count = violation_count + excluded.violation_count,
+                    total_fines = total_fines + excluded.total_fines
+            """
+        
+        params_list = [key + (count, round(amount, 2)) for key, (count, amount) in deltas.items()]
+        return self.db.execute_many(query, params_list)
@@ -0,0 +1,346 @@
+"""
+Search Index Manager
+Trigram index for substring search on vehicle numbers and user names
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import sys
+sys.path.append('..')
+
+from database.db_connection import get_db
+from utils.plates import plate_key
+from config import SEARCH_CONFIG
+
+
+def trigrams(text: str) -> set:
+    """
+    Get the three-character substrings of a text
+    
+    Args:
+        text: Normalized text
+    Returns:
+        Set of trigrams (empty for texts shorter than three characters)
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def rank_key(text: str, term: str) -> Tuple[int, str]:
+    """Sort key ranking exact matches first, then prefix, then substring matches"""
+    if text == term:
+        return 0, text
+    if text.startswith(term):
+        return 1, text
+    return 2, text
+
+
+class SearchIndexManager:
+    """
+    Manager class for the trigram search index
+    plate_trigrams maps every trigram of a vehicle number to that number and
+    user_trigrams maps trigrams of full name, username and email to the user.
+    A term matches the entries holding all of its trigrams (intersected in
+    SQL starting from the rarest one); candidates are then checked for the
+    actual substring, so LIKE '%term%' never has to scan violations or
+    users. Terms shorter than three characters fall back to prefix matching.
+    """
+    
+    def __init__(self):
+        """Initialize search index manager with database connection"""
+        self.db = get_db()
+        self.max_candidates = SEARCH_CONFIG['max_candidates']
+        self.count_cap = SEARCH_CONFIG['count_cap']
+        self.max_joined_trigrams = SEARCH_CONFIG['max_joined_trigrams']
+    
+    @staticmethod
+    def normalize_plate(text: str) -> str:
+        """Normalize a vehicle number or plate search term (see utils.plates.plate_key)"""
+        return plate_key(text)
+    
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize a name, username or email (or a search term for them)"""
+        return ' '.join((text or '').lower().split())
+    
+    def _insert_trigrams(self, table: str, column: str, rows: List[Tuple]) -> bool:
+        """Insert (trigram, value) rows, skipping ones already indexed"""
+        if not rows:
+            return True
+        query = f"""
+            {self.db.dialect.insert_ignore()} INTO {table} (trigram, {column})
+            VALUES (%s, %s)
+        """
+        return self.db.execute_many(query, rows)
+    
+    # ---------- Index maintenance ----------
+    
+    def index_plates(self, vehicle_numbers: Iterable[str]) -> bool:
+        """
+        Add vehicle numbers to the index (already indexed ones are skipped)
+        
+        Args:
+            vehicle_numbers: Vehicle numbers as stored on violations
+        Returns:
+            True if successful, False otherwise
+        """
+        rows = set()
+        for vehicle_number in vehicle_numbers:
+            for trigram in trigrams(self.normalize_plate(vehicle_number)):
+                rows.add((trigram, vehicle_number))
+        return self._insert_trigrams('plate_trigrams', 'vehicle_number', sorted(rows))
+    
+    def index_user(self, user_id: int, full_name: str, username: str = '', email: str = '') -> bool:
+        """
+        Index (or re-index) a user's full name, username and email
+        
+        Args:
+            user_id: User ID
+            full_name: Full name
+            username: Login username
+            email: Email address
+        Returns:
+            True if successful, False otherwise
+        """
+        grams = set()
+        for text in (full_name, username, email):
+            grams |= trigrams(self.normalize_text(text))
+        
+        with self.db.transaction():
+            self.remove_user(user_id)
+            return self._insert_trigrams('user_trigrams', 'user_id',
+                                         [(trigram, user_id) for trigram in sorted(grams)])
+    
+    def remove_user(self, user_id: int) -> bool:
+        """
+        Remove a user from the index
+        
+        Args:
+            user_id: User ID
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.db.execute_query("DELETE FROM user_trigrams WHERE user_id = %s", (user_id,))
+    
+    def rebuild(self, batch_size: int = 5000) -> Dict:
+        """
+        Rebuild both indexes from the violations and users tables
+        Source rows are read in keyset batches on the transaction's
+        connection, and any failed write rolls the whole rebuild back, so
+        the old index stays in place rather than a partly refilled one
+        
+        Args:
+            batch_size: Rows read and indexed per batch
+        Returns:
+            Dictionary with the number of plates and users indexed
+        Raises:
+            RuntimeError: If the index could not be written
+        """
+        plate_query = """
+            SELECT DISTINCT vehicle_number FROM violations
+            WHERE vehicle_number > %s
+            ORDER BY vehicle_number
+            LIMIT %s
+        """
+        user_query = """
+            SELECT user_id, full_name, username, email FROM users
+            WHERE user_id > %s
+            ORDER BY user_id
+            LIMIT %s
+        """
+        
+        counts = {'plates': 0, 'users': 0}
+        with self.db.transaction():
+            if not (self.db.execute_query("DELETE FROM plate_trigrams")
+                    and self.db.execute_query("DELETE FROM user_trigrams")):
+                raise RuntimeError("Failed to clear the search index")
+            
+            last_plate = ''
+            while True:
+                plates = [row['vehicle_number'] for row in self.db.fetch_all(plate_query, (last_plate, batch_size))]
+                if not plates:
+                    break
+                if not self.index_plates(plates):
+                    raise RuntimeError("Failed to index vehicle numbers")
+                counts['plates'] += len(plates)
+                last_plate = plates[-1]
+            
+            last_user_id = 0
+            while True:
+                users = self.db.fetch_all(user_query, (last_user_id, batch_size))
+                if not users:
+                    break
+                rows = []
+                for user in users:
+                    grams = set()
+                    for text in (user['full_name'], user['username'], user['email']):
+                        grams |= trigrams(self.normalize_text(text))
+                    rows.extend((trigram, user['user_id']) for trigram in grams)
+                if not self._insert_trigrams('user_trigrams', 'user_id', rows):
+                    raise RuntimeError("Failed to index users")
+                counts['users'] += len(users)
+                last_user_id = users[-1]['user_id']
+        
+        return counts
+    
+    # ---------- Lookups ----------
+    
+    def _rarest_first(self, table: str, grams: set) -> List[str]:
+        """
+        Order trigrams by how many index entries hold them, rarest first
+        Each trigram's postings are counted only up to count_cap, so a common
+        trigram costs no more than a rare one
+        
+        Args:
+            table: plate_trigrams or user_trigrams
+            grams: Trigrams of the search term
+        Returns:
+            List of trigrams
+        """
+        grams = sorted(grams)
+        query = ' UNION ALL '.join(
+            f"SELECT %s AS trigram, COUNT(*) AS postings "
+            f"FROM (SELECT 1 FROM {table} WHERE trigram = %s LIMIT %s) p{index}"
+            for index in range(len(grams))
+        )
+        params = tuple(value for gram in grams for value in (gram, gram, self.count_cap))
+        postings = {row['trigram']: row['postings'] for row in self.db.fetch_all(query, params)}
+        return sorted(grams, key=lambda gram: (postings.get(gram, 0), gram))
+    
+    def candidate_query(self, table: str, column: str, grams: set) -> Tuple[str, tuple]:
+        """
+        Build a query for the indexed values holding the given trigrams
+        The rarest trigram drives the query and the next rarest ones are
+        joined on the primary key, so the work is bounded by the rarest
+        trigram's postings. Only max_joined_trigrams are intersected: the
+        result can hold false positives, which callers filter by substring.
+        
+        Args:
+            table: plate_trigrams or user_trigrams
+            column: vehicle_number or user_id
+            grams: Trigrams of the search term (at least one)
+        Returns:
+            Tuple of (query selecting {column}, params)
+        """
+        ordered = self._rarest_first(table, grams)[:self.max_joined_trigrams]
+        joins = ''.join(
+            f"\n                JOIN {table} t{index} ON t{index}.trigram = %s AND t{index}.{column} = t0.{column}"
+            for index in range(1, len(ordered))
+        )
+        query = f"""
+                SELECT t0.{column} FROM {table} t0{joins}
+                WHERE t0.trigram = %s
+        """
+        return query, tuple(ordered[1:]) + (ordered[0],)
+    
+    def _candidates(self, table: str, column: str, grams: set) -> Tuple[List, bool]:
+        """
+        Get up to max_candidates indexed values holding the given trigrams
+        
+        Returns:
+            Tuple of (values, truncated): truncated is True when more matched
+        """
+        query, params = self.candidate_query(table, column, grams)
+        rows = self.db.fetch_all(f"{query} LIMIT %s", params + (self.max_candidates + 1,))
+        values = [row[column] for row in rows]
+        return values[:self.max_candidates], len(values) > self.max_candidates
+    
+    def rank_plates(self, term: str) -> Tuple[List[str], bool]:
+        """
+        Find vehicle numbers containing a term, ranked exact, prefix, then substring
+        
+        Args:
+            term: Full or partial vehicle number
+        Returns:
+            Tuple of (vehicle numbers, truncated): truncated is True when the
+            term matched more than max_candidates index entries, of which only
+            the first max_candidates were ranked
+        """
+        term = self.normalize_plate(term)
+        if not term:
+            return [], False
+        
+        grams = trigrams(term)
+        if grams:
+            plates, truncated = self._candidates('plate_trigrams', 'vehicle_number', grams)
+            plates = [plate for plate in plates if term in self.normalize_plate(plate)]
+        else:
+            # Too short for trigrams: prefix match on the plate key index
+            query = """
+                SELECT DISTINCT vehicle_number FROM violations
+                WHERE plate_key LIKE %s
+                ORDER BY vehicle_number
+                LIMIT %s
+            """
+            plates = [row['vehicle_number']
+                      for row in self.db.fetch_all(query, (f"{term}%", self.max_candidates + 1))]
+            truncated = len(plates) > self.max_candidates
+            plates = plates[:self.max_candidates]
+        
+        plates.sort(key=lambda plate: rank_key(self.normalize_plate(plate), term))
+        return plates, truncated
+    
+    def search_plates(self, term: str, limit: Optional[int] = None, offset: int = 0) -> List[str]:
+        """
+        Get a page of rank_plates matches
+        
+        Args:
+            term: Full or partial vehicle number
+            limit: Page size (None for all, up to max_candidates)
+            offset: Matches to skip
+        Returns:
+            List of vehicle numbers
+        """
+        plates = self.rank_plates(term)[0]
+        return plates[offset:offset + limit] if limit is not None else plates[offset:]
+    
+    def search_users(self, term: str, fields: Tuple[str, ...] = ('full_name', 'username', 'email'),
+                     limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """
+        Find users with a field containing a term, ranked by their best match
+        (exact, then prefix, then substring) and then by full name
+        
+        Args:
+            term: Search term
+            fields: Fields that may contain the term
+            limit: Page size (None for all, up to max_candidates)
+            offset: Matches to skip
+        Returns:
+            List of user rows (user_id, username, full_name, role, email, phone, created_at)
+        """
+        term = self.normalize_text(term)
+        if not term:
+            return []
+        
+        grams = trigrams(term)
+        if grams:
+            user_ids, truncated = self._candidates('user_trigrams', 'user_id', grams)
+            if truncated:
+                print(f"User search for '{term}' matched more than {self.max_candidates} users; ranking the first ones")
+            users = []
+            for start in range(0, len(user_ids), 500):
+                batch = user_ids[start:start + 500]
+                query = f"""
+                    SELECT user_id, username, full_name, role, email, phone, created_at
+                    FROM users
+                    WHERE user_id IN ({', '.join(['%s'] * len(batch))})
+                """
+                users.extend(self.db.fetch_all(query, tuple(batch)))
+        else:
+            # Too short for trigrams: prefix match
+            query = f"""
+                SELECT user_id, username, full_name, role, email, phone, created_at
+                FROM users
+                WHERE {' OR '.join(f"{field} LIKE %s" for field in fields)}
+                LIMIT %s
+            """
+            users = self.db.fetch_all(query, (f"{term}%",) * len(fields) + (self.max_candidates,))
+        
+        ranked = []
+        for user in users:
+            ranks = [rank_key(self.normalize_text(user.get(field)), term)[0]
+                     for field in fields if term in self.normalize_text(user.get(field))]
+            if ranks:
+                ranked.append(((min(ranks), self.normalize_text(user.get('full_name'))), user))
+        ranked.sort(key=lambda item: item[0])
+        
+        users = [user for _, user in ranked]
+        return users[offset:offset + limit] if limit is not None else users[offset:]
@@ -10,6 +10,8 @@ sys.path.append('..')
 
 from models.user import User
 from database.db_connection import get_db
+from managers.search_index_manager import SearchIndexManager
+from managers.balance_manager import BalanceManager
 
 
 class UserManager:
@@ -21,6 +23,8 @@ class UserManager:
     def __init__(self):
         """Initialize user manager with database connection"""
         self.db = get_db()
+        self.search_index = SearchIndexManager()
+        self.balances = BalanceManager()
     
     def create_user(self, user: User) -> Optional[int]:
         """
@@ -46,10 +50,10 @@ class UserManager:
             user.phone
         )
         
-        if self.db.execute_query(query, params):
-            user_id = self.db.get_last_insert_id()
-            return user_id
-        return None
+        user_id = self.db.insert_returning_id(query, params)
+        if user_id:
+            self.search_index.index_user(user_id, user.full_name, user.username, user.email)
+        return user_id
     
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         """
@@ -67,7 +71,7 @@ class UserManager:
         result = self.db.fetch_one(query, (user_id,))
         
         if result:
-            return User.from_dict(result)
+            return User.from_row(result)
         return None
     
     def get_user_by_username(self, username: str) -> Optional[User]:
@@ -86,7 +90,7 @@ class UserManager:
         result = self.db.fetch_one(query, (username,))
         
         if result:
-            return User.from_dict(result)
+            return User.from_row(result)
         return None
     
     def get_user_by_email(self, email: str) -> Optional[User]:
@@ -105,7 +109,7 @@ class UserManager:
         result = self.db.fetch_one(query, (email,))
         
         if result:
-            return User.from_dict(result)
+            return User.from_row(result)
         return None
     
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
@@ -197,7 +201,15 @@ class UserManager:
             WHERE user_id = %s
         """
         
-        return self.db.execute_query(query, tuple(params))
+        if not self.db.execute_query(query, tuple(params)):
+            return False
+        
+        # Keep the search index in step with searchable fields
+        if 'full_name' in updates or 'email' in updates:
+            user = self.get_user_by_id(user_id)
+            if user:
+                self.search_index.index_user(user_id, user.full_name, user.username, user.email)
+        return True
     
     def update_password(self, user_id: int, new_password: str) -> bool:
         """
@@ -231,7 +243,11 @@ class UserManager:
             DELETE FROM users WHERE user_id = %s
         """
         
-        return self.db.execute_query(query, (user_id,))
+        if not self.db.execute_query(query, (user_id,)):
+            return False
+        self.search_index.remove_user(user_id)
+        self.balances.delete_balance(user_id)
+        return True
     
     def username_exists(self, username: str) -> bool:
         """
@@ -268,64 +284,37 @@ class UserManager:
     def get_user_statistics(self, user_id: int) -> Dict:
         """
         Get statistics for a specific user (for citizens)
+        Read from the user's user_balances row
         
         Args:
             user_id: User ID
         Returns:
             Dictionary with user statistics
         """
-        query = """
-            SELECT 
-                COUNT(*) as total_violations,
-                SUM(fine_amount) as total_fines,
-                SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END) as paid_amount,
-                SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END) as unpaid_amount,
-                COUNT(CASE WHEN status = 'paid' THEN 1 END) as paid_count,
-                COUNT(CASE WHEN status = 'unpaid' THEN 1 END) as unpaid_count
-            FROM violations
-            WHERE user_id = %s
-        """
-        
-        result = self.db.fetch_one(query, (user_id,))
-        
-        if result:
-            return {
-                'total_violations': result.get('total_violations', 0),
-                'total_fines': float(result.get('total_fines', 0) or 0),
-                'paid_amount': float(result.get('paid_amount', 0) or 0),
-                'unpaid_amount': float(result.get('unpaid_amount', 0) or 0),
-                'paid_count': result.get('paid_count', 0),
-                'unpaid_count': result.get('unpaid_count', 0)
-            }
+        balance = self.balances.get_balance(user_id)
         return {
-            'total_violations': 0,
-            'total_fines': 0.0,
-            'paid_amount': 0.0,
-            'unpaid_amount': 0.0,
-            'paid_count': 0,
-            'unpaid_count': 0
+            'total_violations': balance['violation_count'],
+            'total_fines': balance['total_amount'],
+            'paid_amount': balance['paid_amount'],
+            'unpaid_amount': balance['unpaid_amount'],
+            'paid_count': balance['paid_count'],
+            'unpaid_count': balance['unpaid_count']
         }
     
-    def search_users(self, search_term: str) -> List[Dict]:
+    def search_users(self, search_term: str, limit: Optional[int] = None,
+                     offset: int = 0) -> List[Dict]:
         """
         Search users by name, username, or email
+        Exact matches rank first, then prefix matches, then substring matches
         
         Args:
             search_term: Search term
+            limit: Optional page size
+            offset: Matches to skip
         Returns:
             List of matching users
         """
-        query = """
-            SELECT user_id, username, full_name, role, email, phone, created_at
-            FROM users
-            WHERE username LIKE %s 
-               OR full_name LIKE %s 
-               OR email LIKE %s
-            ORDER BY full_name
-        """
-        
-        search_pattern = f"%{search_term}%"
-        return self.db.fetch_all(query, (search_pattern, search_pattern, search_pattern))
+        return self.search_index.search_users(search_term, limit=limit, offset=offset)
     
     def get_user_count_by_role(self) -> Dict:
         """
@@ -3,13 +3,33 @@ Violation Manager
 Handles all violation-related business logic and database operations
 """
 
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterable, Iterator, Tuple
 from datetime import datetime
+import hashlib
+import json
 import sys
 sys.path.append('..')
 
 from models.violation import Violation
 from database.db_connection import get_db
+from managers.rollup_manager import RollupManager
+from managers.balance_manager import BalanceManager
+from managers.search_index_manager import SearchIndexManager, trigrams
+from managers.plate_match_manager import PlateMatchManager
+from models.analytics import invalidate_analytics_cache
+from utils.validators import validate_violation_input, validate_id, ValidationError
+from utils.pagination import decode_cursor, encode_cursor
+from utils.plates import plate_key
+from utils.cache import TTLCache
+from config import BULK_CONFIG, EXPORT_CONFIG, REFERENCE_CACHE_CONFIG, VEHICLE_HISTORY_CONFIG
+
+
+# Violation types and areas rarely change; share one cache across managers
+_reference_cache = TTLCache(ttl=REFERENCE_CACHE_CONFIG['ttl'])
+
+# Per-plate history, kept current by the write hooks instead of being evicted
+_vehicle_history_cache = TTLCache(ttl=VEHICLE_HISTORY_CONFIG['ttl'],
+                                  max_size=VEHICLE_HISTORY_CONFIG['max_entries'])
 
 
 class ViolationManager:
@@ -18,9 +38,109 @@ class ViolationManager:
     Handles CRUD operations and business logic for violations
     """
     
+    # Sort option -> (column, direction, result key used in cursors)
+    SORT_OPTIONS = {
+        'date_desc': ('v.violation_date', 'DESC', 'violation_date'),
+        'date_asc': ('v.violation_date', 'ASC', 'violation_date'),
+        'fine_desc': ('v.fine_amount', 'DESC', 'fine_amount'),
+        'fine_asc': ('v.fine_amount', 'ASC', 'fine_amount'),
+        'id_asc': ('v.violation_id', 'ASC', 'violation_id'),
+        'id_desc': ('v.violation_id', 'DESC', 'violation_id')
+    }
+    
+    # Columns every write hook can rely on
+    HOOK_COLUMNS = """
+        violation_id, vehicle_number, plate_key, user_id, type_id, area_id, officer_id,
+        violation_date, fine_amount, status
+    """
+    
     def __init__(self):
         """Initialize violation manager with database connection"""
         self.db = get_db()
+        self.rollups = RollupManager()
+        self.balances = BalanceManager()
+        self.search_index = SearchIndexManager()
+        self.plates = PlateMatchManager()
+    
+    def _after_create(self, violations: List[Dict]):
+        """
+        Update derived data after violations are inserted
+        Call inside the insert's transaction: a failed rollup or balance
+        update raises so the insert rolls back with it
+        
+        Args:
+            violations: Dictionaries of the inserted rows (see HOOK_COLUMNS)
+        """
+        if not self.rollups.record_violations(violations):
+            raise RuntimeError("Failed to update rollups")
+        if not self.balances.record_violations(violations):
+            raise RuntimeError("Failed to update user balances")
+        self.search_index.index_plates({violation['vehicle_number'] for violation in violations})
+        self.plates.index_plates({violation['plate_key'] for violation in violations})
+        self.db.on_commit(invalidate_analytics_cache)
+        self.db.on_commit(lambda: self.refresh_vehicle_history(violations))
+    
+    def _after_status_change(self, violation: Dict, new_status: str):
+        """
+        Update derived data after a violation changes status
+        
+        Args:
+            violation: Dictionary of the row before the change (see HOOK_COLUMNS)
+            new_status: Status the violation now has
+        """
+        self._after_status_changes([violation], new_status)
+    
+    def _after_status_changes(self, violations: List[Dict], new_status: str):
+        """
+        Update derived data after several violations move to one status
+        Call inside the update's transaction (see _after_create)
+        
+        Args:
+            violations: Dictionaries of the rows before the change (see HOOK_COLUMNS)
+            new_status: Status the violations now have
+        """
+        if not self.rollups.record_status_changes(violations, new_status):
+            raise RuntimeError("Failed to update rollups")
+        if not self.balances.record_status_changes(violations, new_status):
+            raise RuntimeError("Failed to update user balances")
+        self.db.on_commit(invalidate_analytics_cache)
+        self.db.on_commit(lambda: self.refresh_vehicle_history(violations))
+    
+    @staticmethod
+    def _normalize_record(data: Dict, officer_id: int, status: str = 'unpaid') -> Dict:
+        """
+        Build the stored form of a violation record, as every insert path writes it
+        
+        Args:
+            data: Validated record (vehicle_number, user_id, type_id, area_id,
+                  violation_date, fine_amount)
+            officer_id: Reporting officer's user ID
+            status: Initial status (anything but a valid status becomes 'unpaid')
+        Returns:
+            Dictionary with the HOOK_COLUMNS fields except violation_id
+        Raises:
+            ValueError: If violation_date is not 'YYYY-MM-DD HH:MM:SS'
+        """
+        # Re-format parsed dates so '2025-1-5 9:00:00' is stored (and keyed
+        # by day in the rollup, balance and history hooks) as 2025-01-05
+        violation_date = data.get('violation_date') or datetime.now()
+        if not isinstance(violation_date, datetime):
+            violation_date = datetime.strptime(str(violation_date).strip(), '%Y-%m-%d %H:%M:%S')
+        violation_date = violation_date.strftime('%Y-%m-%d %H:%M:%S')
+        
+        user_id = data.get('user_id')
+        vehicle_number = data['vehicle_number'].strip().upper()
+        return {
+            'vehicle_number': vehicle_number,
+            'plate_key': plate_key(vehicle_number),
+            'user_id': int(user_id) if user_id not in (None, '') else None,
+            'type_id': int(data['type_id']),
+            'area_id': int(data['area_id']),
+            'officer_id': int(officer_id),
+            'violation_date': violation_date,
+            'fine_amount': float(data['fine_amount']),
+            'status': status if status in Violation.VALID_STATUSES else 'unpaid'
+        }
     
     def create_violation(self, violation: Violation) -> Optional[int]:
         """
@@ -33,13 +153,15 @@ class ViolationManager:
         """
         query = """
             INSERT INTO violations 
-            (vehicle_number, user_id, type_id, area_id, officer_id, 
+            (vehicle_number, plate_key, user_id, type_id, area_id, officer_id, 
              violation_date, fine_amount, status, notes)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         
+        vehicle_number = violation.vehicle_number.strip()
         params = (
-            violation.vehicle_number,
+            vehicle_number,
+            plate_key(vehicle_number),
             violation.user_id,
             violation.type_id,
             violation.area_id,
@@ -50,10 +172,173 @@ class ViolationManager:
             violation.notes
         )
         
-        if self.db.execute_query(query, params):
-            violation_id = self.db.get_last_insert_id()
+        try:
+            with self.db.transaction():
+                violation_id = self.db.insert_returning_id(query, params)
+                if violation_id:
+                    self._after_create([{
+                        'violation_id': violation_id,
+                        'vehicle_number': vehicle_number,
+                        'plate_key': params[1],
+                        'user_id': violation.user_id,
+                        'type_id': violation.type_id,
+                        'area_id': violation.area_id,
+                        'officer_id': violation.officer_id,
+                        'violation_date': params[6],
+                        'fine_amount': violation.fine_amount,
+                        'status': violation.status
+                    }])
             return violation_id
-        return None
+        except Exception as e:
+            print(f"Error creating violation: {e}")
+            return None
+    
+    def register_violation(self, data: Dict, officer_id: int) -> Optional[int]:
+        """
+        Register a violation submitted from the registration form
+        
+        Args:
+            data: Form data (vehicle_number, owner_name, user_id, type_id,
+                  area_id, violation_date, fine_amount, notes)
+            officer_id: Reporting officer's user ID
+        Returns:
+            Violation ID if successful, None otherwise
+        """
+        query = """
+            INSERT INTO violations
+            (vehicle_number, plate_key, owner_name, user_id, type_id, area_id, officer_id, 
+            violation_date, fine_amount, status, notes)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        
+        violation = self._normalize_record(data, officer_id)
+        
+        params = (
+            violation['vehicle_number'],
+            violation['plate_key'],
+            data.get('owner_name', ''),
+            violation['user_id'],
+            violation['type_id'],
+            violation['area_id'],
+            officer_id,
+            violation['violation_date'],
+            violation['fine_amount'],
+            violation['status'],
+            data.get('notes', '')
+        )
+        
+        try:
+            with self.db.transaction():
+                violation_id = self.db.insert_returning_id(query, params)
+                if violation_id:
+                    violation['violation_id'] = violation_id
+                    self._after_create([violation])
+            return violation_id
+        except Exception as e:
+            print(f"Error registering violation: {e}")
+            return None
+    
+    def create_violations_bulk(self, records: Iterable[Dict], officer_id: Optional[int] = None,
+                               chunk_size: Optional[int] = None) -> List[Dict]:
+        """
+        Create many violation records at once
+        Rows are validated and normalized individually (as in register_violation)
+        and valid rows are written with executemany, one transaction per chunk.
+        If a chunk fails, its rows are retried one by one so only the rows the
+        database rejects are reported as failed.
+        
+        Args:
+            records: Iterable of violation dictionaries
+            officer_id: Reporting officer for every record (falls back to each record's officer_id)
+            chunk_size: Rows per transaction (defaults to BULK_CONFIG['chunk_size'])
+        Returns:
+            List of per-row results in input order, each with
+            'index', 'success' and (on failure) 'errors'
+        """
+        chunk_size = chunk_size or BULK_CONFIG['chunk_size']
+        
+        query = """
+            INSERT INTO violations 
+            (vehicle_number, plate_key, user_id, type_id, area_id, officer_id, 
+             violation_date, fine_amount, status, notes)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        
+        results = []
+        chunk_rows = []
+        chunk_params = []
+        chunk_results = []
+        
+        def insert_one(row: Dict, params: tuple, result: Dict):
+            try:
+                with self.db.transaction():
+                    violation_id = self.db.insert_returning_id(query, params)
+                    if not violation_id:
+                        raise RuntimeError("Insert rejected")
+                    self._after_create([dict(row, violation_id=violation_id)])
+            except Exception as e:
+                print(f"Error creating violation {result['index']}: {e}")
+                result['success'] = False
+                result['errors'] = {
+                    'database': "Rejected by the database (check that the user, type, area and officer exist)"
+                }
+        
+        def flush():
+            if chunk_params:
+                try:
+                    with self.db.transaction():
+                        if not self.db.execute_many(query, chunk_params):
+                            raise RuntimeError("Failed to insert batch")
+                        self._after_create(chunk_rows)
+                except Exception as e:
+                    print(f"Error creating violations, retrying rows one by one: {e}")
+                    for row, params, result in zip(chunk_rows, chunk_params, chunk_results):
+                        insert_one(row, params, result)
+            chunk_rows.clear()
+            chunk_params.clear()
+            chunk_results.clear()
+        
+        for index, data in enumerate(records):
+            is_valid, errors = validate_violation_input(data)
+            row_officer_id = officer_id or data.get('officer_id')
+            if not row_officer_id:
+                is_valid = False
+                errors['officer_id'] = "Officer is required"
+            for field, value, label in (('officer_id', row_officer_id, "Officer"),
+                                        ('user_id', data.get('user_id'), "User")):
+                if value not in (None, '') and field not in errors:
+                    valid_id, error = validate_id(value, label)
+                    if not valid_id:
+                        is_valid = False
+                        errors[field] = error
+            
+            if not is_valid:
+                results.append({'index': index, 'success': False, 'errors': errors})
+                continue
+            
+            row = self._normalize_record(data, row_officer_id, data.get('status', 'unpaid'))
+            chunk_rows.append(row)
+            chunk_params.append((
+                row['vehicle_number'],
+                row['plate_key'],
+                row['user_id'],
+                row['type_id'],
+                row['area_id'],
+                row['officer_id'],
+                row['violation_date'],
+                row['fine_amount'],
+                row['status'],
+                data.get('notes', '')
+            ))
+            result = {'index': index, 'success': True}
+            chunk_results.append(result)
+            results.append(result)
+            
+            if len(chunk_params) >= chunk_size:
+                flush()
+        
+        flush()
+        return results
     
     def get_violation_by_id(self, violation_id: int) -> Optional[Violation]:
         """
@@ -71,26 +356,153 @@ class ViolationManager:
         result = self.db.fetch_one(query, (violation_id,))
         
         if result:
-            return Violation.from_dict(result)
+            return Violation.from_row(result)
         return None
     
-    def get_all_violations(self, limit: int = 100) -> List[Dict]:
+    def _keyset_page(self, after: Optional[str], limit: Optional[int],
+                     sort: str = 'date_desc') -> Tuple[str, str, tuple, tuple]:
         """
-        Get all violations with detailed information
+        Build the keyset pagination parts of a violation listing query
+        Pages are ordered on (sort column, violation_id), newest first by default
         
         Args:
-            limit: Maximum number of records to return
+            after: Cursor of the last row on the previous page
+            limit: Page size (None for no limit)
+            sort: Key of SORT_OPTIONS
         Returns:
-            List of violation dictionaries with joined data
+            Tuple of (where_condition, order_and_limit, where_params, limit_params)
         """
-        query = """
+        column, direction, _ = self.SORT_OPTIONS[sort]
+        comparison = '<' if direction == 'DESC' else '>'
+        
+        condition = ''
+        where_params = ()
+        if after:
+            last_value, last_id = decode_cursor(after)
+            condition = (
+                f"({column} {comparison} %s OR "
+                f"({column} = %s AND v.violation_id {comparison} %s))"
+            )
+            where_params = (last_value, last_value, last_id)
+        
+        order_and_limit = f"ORDER BY {column} {direction}, v.violation_id {direction}"
+        limit_params = ()
+        if limit:
+            order_and_limit += " LIMIT %s"
+            limit_params = (limit,)
+        
+        return condition, order_and_limit, where_params, limit_params
+    
+    def _filter_conditions(self, filters: Optional[Dict]) -> Tuple[List[str], tuple]:
+        """
+        Translate listing filters into SQL conditions
+        
+        Args:
+            filters: Optional dictionary with any of status, type_id, area_id,
+                     officer_id, user_id, date_from, date_to (exclusive upper
+                     bound, 'YYYY-MM-DD HH:MM:SS'), after_id (only IDs above it)
+                     and q (vehicle/owner search)
+        Returns:
+            Tuple of (list of conditions, parameters)
+        """
+        conditions = []
+        params = []
+        filters = filters or {}
+        
+        for field in ('status', 'type_id', 'area_id', 'officer_id', 'user_id'):
+            if filters.get(field) is not None:
+                conditions.append(f"v.{field} = %s")
+                params.append(filters[field])
+        
+        if filters.get('date_from'):
+            conditions.append("v.violation_date >= %s")
+            params.append(filters['date_from'])
+        
+        if filters.get('date_to'):
+            conditions.append("v.violation_date < %s")
+            params.append(filters['date_to'])
+        
+        if filters.get('after_id'):
+            conditions.append("v.violation_id > %s")
+            params.append(filters['after_id'])
+        
+        if filters.get('q'):
+            condition, search_params = self._search_condition(filters['q'])
+            conditions.append(condition)
+            params.extend(search_params)
+        
+        return conditions, tuple(params)
+    
+    def _search_condition(self, search_term: str) -> Tuple[str, tuple]:
+        """
+        Build the condition matching violations by vehicle number or owner name
+        Candidates come from subqueries on the trigram search index (see
+        SearchIndexManager.candidate_query), so every match is found without
+        LIKE '%term%' scanning violations or users
+        
+        Args:
+            search_term: Search term
+        Returns:
+            Tuple of (condition, params)
+        """
+        plate_term = self.search_index.normalize_plate(search_term)
+        name_term = self.search_index.normalize_text(search_term)
+        parts = []
+        params = ()
+        
+        if plate_term:
+            grams = trigrams(plate_term)
+            if grams:
+                query, query_params = self.search_index.candidate_query('plate_trigrams', 'vehicle_number', grams)
+                parts.append(f"(v.vehicle_number IN ({query}) AND v.plate_key LIKE %s)")
+                params += query_params + (f"%{plate_term}%",)
+            else:
+                parts.append("v.plate_key LIKE %s")
+                params += (f"{plate_term}%",)
+        
+        if name_term:
+            grams = trigrams(name_term)
+            if grams:
+                query, query_params = self.search_index.candidate_query('user_trigrams', 'user_id', grams)
+                parts.append(f"""v.user_id IN (
+                    SELECT su.user_id FROM users su
+                    WHERE su.user_id IN ({query}) AND su.full_name LIKE %s
+                )""")
+                params += query_params + (f"%{name_term}%",)
+            else:
+                parts.append("v.user_id IN (SELECT su.user_id FROM users su WHERE su.full_name LIKE %s)")
+                params += (f"{name_term}%",)
+        
+        if not parts:
+            return "1 = 0", ()
+        return f"({' OR '.join(parts)})", params
+    
+    def _listing_query(self, filters: Optional[Dict], sort: str, after: Optional[str],
+                       limit: Optional[int]) -> Tuple[str, tuple]:
+        """
+        Build the violation listing query shared by paged and streamed reads
+        
+        Args:
+            filters: Optional filters (see _filter_conditions)
+            sort: Key of SORT_OPTIONS
+            after: Cursor of the last row already returned
+            limit: Maximum number of rows (None for no limit)
+        Returns:
+            Tuple of (query, params)
+        """
+        conditions, filter_params = self._filter_conditions(filters)
+        condition, order_and_limit, where_params, limit_params = self._keyset_page(after, limit, sort)
+        if condition:
+            conditions.append(condition)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        query = f"""
             SELECT 
                 v.violation_id,
                 v.vehicle_number,
                 u.full_name AS owner_name,
-                vt.type_name,
-                a.area_name,
-                a.city,
+                v.type_id,
+                v.area_id,
                 o.full_name AS officer_name,
                 v.violation_date,
                 v.fine_amount,
@@ -98,97 +510,272 @@ class ViolationManager:
                 v.notes
             FROM violations v
             LEFT JOIN users u ON v.user_id = u.user_id
-            JOIN violation_types vt ON v.type_id = vt.type_id
-            JOIN areas a ON v.area_id = a.area_id
             JOIN users o ON v.officer_id = o.user_id
-            ORDER BY v.violation_date DESC
-            LIMIT %s
+            {where}
+            {order_and_limit}
         """
         
-        return self.db.fetch_all(query, (limit,))
+        return query, filter_params + where_params + limit_params
     
-    def get_violations_by_vehicle(self, vehicle_number: str) -> List[Dict]:
+    def get_all_violations(self, limit: int = 100, after: Optional[str] = None,
+                           filters: Optional[Dict] = None, sort: str = 'date_desc') -> List[Dict]:
         """
-        Get all violations for a specific vehicle
+        Get all violations with detailed information
         
         Args:
-            vehicle_number: Vehicle registration number
+            limit: Maximum number of records to return
+            after: Cursor of the last row on the previous page
+            filters: Optional filters (see _filter_conditions)
+            sort: Key of SORT_OPTIONS
         Returns:
-            List of violations for the vehicle
+            List of violation dictionaries with joined data
         """
-        query = """
+        query, params = self._listing_query(filters, sort, after, limit)
+        violations = self.db.fetch_all(query, params)
+        return self._attach_reference_names(violations)
+    
+    def iter_violations(self, filters: Optional[Dict] = None, sort: str = 'date_desc',
+                        after: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream every violation matching the filters, in listing order
+        
+        Args:
+            filters: Optional filters (see _filter_conditions)
+            sort: Key of SORT_OPTIONS
+            after: Cursor of the last row already returned
+        Returns:
+            Iterator of violation dictionaries with joined data
+        """
+        query, params = self._listing_query(filters, sort, after, None)
+        batch = []
+        for row in self.db.fetch_iter(query, params):
+            batch.append(row)
+            if len(batch) >= EXPORT_CONFIG['batch_size']:
+                yield from self._attach_reference_names(batch)
+                batch = []
+        yield from self._attach_reference_names(batch)
+    
+    def summarize_violations(self, filters: Optional[Dict] = None) -> Dict:
+        """
+        Calculate counts and fine totals for a filtered set of violations
+        
+        Args:
+            filters: Optional filters (see _filter_conditions)
+        Returns:
+            Dictionary with counts and amounts by status
+        """
+        conditions, params = self._filter_conditions(filters)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        query = f"""
+            SELECT 
+                COUNT(*) as total_count,
+                COUNT(CASE WHEN v.status = 'unpaid' THEN 1 END) as unpaid_count,
+                COUNT(CASE WHEN v.status = 'paid' THEN 1 END) as paid_count,
+                COUNT(CASE WHEN v.status = 'disputed' THEN 1 END) as disputed_count,
+                SUM(v.fine_amount) as total_amount
+            FROM violations v
+            {where}
+        """
+        
+        result = self.db.fetch_one(query, params) or {}
+        return {
+            'total_count': result.get('total_count', 0) or 0,
+            'unpaid_count': result.get('unpaid_count', 0) or 0,
+            'paid_count': result.get('paid_count', 0) or 0,
+            'disputed_count': result.get('disputed_count', 0) or 0,
+            'total_amount': float(result.get('total_amount', 0) or 0)
+        }
+    
+    def _vehicle_history_rows(self, condition: str, params: tuple) -> List[Dict]:
+        """Get violations with their payment details, newest first, for a WHERE condition"""
+        query = f"""
             SELECT 
                 v.violation_id,
                 v.vehicle_number,
-                vt.type_name,
-                a.area_name,
+                v.plate_key,
+                v.type_id,
+                v.area_id,
                 v.violation_date,
                 v.fine_amount,
                 v.status,
                 p.payment_date,
                 p.payment_method
             FROM violations v
-            JOIN violation_types vt ON v.type_id = vt.type_id
-            JOIN areas a ON v.area_id = a.area_id
             LEFT JOIN payments p ON v.violation_id = p.violation_id
-            WHERE v.vehicle_number = %s
+            WHERE {condition}
             ORDER BY v.violation_date DESC
         """
+        return self._attach_reference_names(self.db.fetch_all(query, params))
+    
+    @staticmethod
+    def _history_entry(key: str, violations: List[Dict]) -> Dict:
+        """Build a vehicle history cache entry from its violation rows"""
+        return {
+            'plate_key': key,
+            'violations': violations,
+            'violation_count': len(violations),
+            'unpaid_total': round(sum([float(row['fine_amount'] or 0)
+                                       for row in violations if row['status'] == 'unpaid'], 0.0), 2)
+        }
+    
+    def get_vehicle_history(self, vehicle_number: str) -> Dict:
+        """
+        Get a vehicle's violations and unpaid total, served from the history cache
+        Entries are shared between callers; treat them as read-only.
+        
+        Args:
+            vehicle_number: Vehicle registration number (any formatting)
+        Returns:
+            Dictionary with plate_key, violations (newest first), violation_count
+            and unpaid_total
+        """
+        key = plate_key(vehicle_number)
+        if not key:
+            return self._history_entry(key, [])
+        return _vehicle_history_cache.get(
+            key, lambda: self._history_entry(key, self._vehicle_history_rows("v.plate_key = %s", (key,)))
+        )
+    
+    def refresh_vehicle_history(self, violations: List[Dict]):
+        """
+        Apply written violations to the cached histories of their plates
+        Only plates already cached are touched: their rows are re-read by ID
+        and merged into the entry, so the entry stays warm instead of being
+        dropped. Runs after commit (see the write hooks).
+        
+        Args:
+            violations: Dictionaries with plate_key and violation_id (bulk
+                        inserts have no IDs; their plates are dropped instead)
+        """
+        by_plate = {}
+        unknown = set()
+        for violation in violations:
+            if violation.get('violation_id'):
+                by_plate.setdefault(violation['plate_key'], set()).add(violation['violation_id'])
+            else:
+                unknown.add(violation['plate_key'])
         
-        return self.db.fetch_all(query, (vehicle_number.upper(),))
+        for key in unknown:
+            by_plate.pop(key, None)
+            _vehicle_history_cache.invalidate(key)
+        
+        cached = []
+        for key in by_plate:
+            if _vehicle_history_cache.peek(key) is not None:
+                cached.append(key)
+            else:
+                # Keeps a load that read the database before this write from being stored
+                _vehicle_history_cache.invalidate(key)
+        if not cached:
+            return
+        
+        ids = sorted({violation_id for key in cached for violation_id in by_plate[key]})
+        fresh = {}
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            condition = f"v.violation_id IN ({', '.join(['%s'] * len(batch))})"
+            for row in self._vehicle_history_rows(condition, tuple(batch)):
+                fresh.setdefault(row['plate_key'], {})[row['violation_id']] = row
+        
+        def merge(key: str, rows: Dict[int, Dict]):
+            def updater(entry: Dict) -> Dict:
+                merged = [row for row in entry['violations'] if row['violation_id'] not in rows]
+                merged.extend(rows.values())
+                merged.sort(key=lambda row: str(row['violation_date']), reverse=True)
+                return self._history_entry(key, merged)
+            return updater
+        
+        for key in cached:
+            if key in fresh:
+                _vehicle_history_cache.update(key, merge(key, fresh[key]))
+    
+    def vehicle_history_stats(self) -> Dict:
+        """
+        Get vehicle history cache metrics
+        
+        Returns:
+            Dictionary with hits, misses, coalesced, updates, size and hit_rate
+        """
+        return _vehicle_history_cache.stats()
+    
+    def get_violations_by_vehicle(self, vehicle_number: str) -> List[Dict]:
+        """
+        Get all violations for a specific vehicle
+        Matched on the plate key, so 'KA-01-AB-1234' finds 'KA01AB1234'
+        
+        Args:
+            vehicle_number: Vehicle registration number
+        Returns:
+            List of violations for the vehicle
+        """
+        return self.get_vehicle_history(vehicle_number)['violations']
     
-    def get_violations_by_user(self, user_id: int) -> List[Dict]:
+    def get_violations_by_user(self, user_id: int, limit: Optional[int] = None,
+                               after: Optional[str] = None) -> List[Dict]:
         """
         Get all violations for a specific user
         
         Args:
             user_id: User ID
+            limit: Optional page size
+            after: Cursor of the last row on the previous page
         Returns:
             List of user's violations
         """
-        query = """
+        condition, order_and_limit, where_params, limit_params = self._keyset_page(after, limit)
+        if condition:
+            condition = f"AND {condition}"
+        
+        query = f"""
             SELECT 
                 v.violation_id,
                 v.vehicle_number,
-                vt.type_name,
-                a.area_name,
+                v.type_id,
+                v.area_id,
                 v.violation_date,
                 v.fine_amount,
                 v.status
             FROM violations v
-            JOIN violation_types vt ON v.type_id = vt.type_id
-            JOIN areas a ON v.area_id = a.area_id
-            WHERE v.user_id = %s
-            ORDER BY v.violation_date DESC
+            WHERE v.user_id = %s {condition}
+            {order_and_limit}
         """
         
-        return self.db.fetch_all(query, (user_id,))
+        violations = self.db.fetch_all(query, (user_id,) + where_params + limit_params)
+        return self._attach_reference_names(violations)
     
-    def get_unpaid_violations(self) -> List[Dict]:
+    def get_unpaid_violations(self, limit: Optional[int] = None,
+                              after: Optional[str] = None) -> List[Dict]:
         """
         Get all unpaid violations
         
+        Args:
+            limit: Optional page size
+            after: Cursor of the last row on the previous page
         Returns:
             List of unpaid violations
         """
-        query = """
+        condition, order_and_limit, where_params, limit_params = self._keyset_page(after, limit)
+        if condition:
+            condition = f"AND {condition}"
+        
+        query = f"""
             SELECT 
                 v.violation_id,
                 v.vehicle_number,
                 u.full_name AS owner_name,
-                vt.type_name,
-                a.area_name,
+                v.type_id,
+                v.area_id,
                 v.violation_date,
                 v.fine_amount
             FROM violations v
             LEFT JOIN users u ON v.user_id = u.user_id
-            JOIN violation_types vt ON v.type_id = vt.type_id
-            JOIN areas a ON v.area_id = a.area_id
-            WHERE v.status = 'unpaid'
-            ORDER BY v.violation_date DESC
+            WHERE v.status = 'unpaid' {condition}
+            {order_and_limit}
         """
         
-        return self.db.fetch_all(query)
+        violations = self.db.fetch_all(query, where_params + limit_params)
+        return self._attach_reference_names(violations)
     
     def update_violation_status(self, violation_id: int, status: str) -> bool:
         """
@@ -203,115 +790,387 @@ class ViolationManager:
         if status not in Violation.VALID_STATUSES:
             return False
         
-        query = """
+        select_query = f"""
+            SELECT {self.HOOK_COLUMNS}
+            FROM violations
+            WHERE violation_id = %s
+        """
+        
+        # Only move from the status we read, so derived data sees each change once
+        update_query = """
             UPDATE violations 
             SET status = %s
-            WHERE violation_id = %s
+            WHERE violation_id = %s AND status = %s
+        """
+        
+        for _ in range(3):
+            current = self.db.fetch_one(select_query, (violation_id,))
+            if not current:
+                return False
+            if current['status'] == status:
+                return True
+            
+            try:
+                with self.db.transaction():
+                    changed = self.db.execute_update(update_query, (status, violation_id, current['status']))
+                    if changed:
+                        self._after_status_change(current, status)
+            except Exception as e:
+                print(f"Error updating violation status: {e}")
+                return False
+            if changed is None:
+                return False
+            if changed:
+                return True
+        
+        return False
+    
+    def update_status_bulk(self, violation_ids: Iterable[int], status: str,
+                           batch_size: int = 500) -> int:
+        """
+        Move many violations to one status with a few set-based statements
+        
+        Args:
+            violation_ids: Violation IDs to update
+            status: New status (paid/unpaid/disputed)
+            batch_size: IDs per statement
+        Returns:
+            Number of violations whose status changed
+        """
+        if status not in Violation.VALID_STATUSES:
+            return 0
+        
+        violation_ids = list(dict.fromkeys(violation_ids))
+        changed_total = 0
+        
+        for start in range(0, len(violation_ids), batch_size):
+            batch = violation_ids[start:start + batch_size]
+            placeholders = ', '.join(['%s'] * len(batch))
+            select_query = f"""
+                SELECT {self.HOOK_COLUMNS}
+                FROM violations
+                WHERE violation_id IN ({placeholders}) AND status != %s
+            """
+            
+            by_status = {}
+            for row in self.db.fetch_all(select_query, tuple(batch) + (status,)):
+                by_status.setdefault(row['status'], []).append(row)
+            
+            # Same compare-and-set as update_violation_status, one statement per old status
+            for old_status, rows in by_status.items():
+                ids = [row['violation_id'] for row in rows]
+                update_query = f"""
+                    UPDATE violations
+                    SET status = %s
+                    WHERE violation_id IN ({', '.join(['%s'] * len(ids))}) AND status = %s
+                """
+                try:
+                    with self.db.transaction():
+                        changed = self.db.execute_update(update_query, (status,) + tuple(ids) + (old_status,))
+                        if not changed:
+                            continue
+                        
+                        if changed == len(rows):
+                            self._after_status_changes(rows, status)
+                        else:
+                            # Some rows changed concurrently; recompute rather than guess
+                            print("Concurrent status changes during bulk update; rebuilding rollups")
+                            if not self.rollups.rebuild():
+                                raise RuntimeError("Failed to rebuild rollups")
+                            if not (self.balances.rebuild(row['user_id'] for row in rows)
+                                    and self.balances.rebuild_totals()):
+                                raise RuntimeError("Failed to rebuild balances")
+                            self.db.on_commit(invalidate_analytics_cache)
+                            self.db.on_commit(lambda rows=rows: self.refresh_vehicle_history(rows))
+                except Exception as e:
+                    print(f"Error updating violation statuses: {e}")
+                    continue
+                changed_total += changed
+        
+        return changed_total
+    
+    def _load_reference_data(self, name: str) -> Dict:
+        """
+        Load one reference table into a cache entry
+        
+        Args:
+            name: 'violation_types' or 'areas'
+        Returns:
+            Dictionary with rows, rows keyed by ID and an ETag of the rows
+        """
+        if name == 'violation_types':
+            query = """
+                SELECT type_id, type_name, base_fine, description
+                FROM violation_types
+                ORDER BY type_name
+            """
+            id_field = 'type_id'
+        else:
+            query = """
+                SELECT area_id, area_name, city
+                FROM areas
+                ORDER BY city, area_name
+            """
+            id_field = 'area_id'
+        
+        rows = self.db.fetch_all(query)
+        digest = hashlib.sha1(json.dumps(rows, sort_keys=True, default=str).encode('utf-8'))
+        
+        return {
+            'rows': rows,
+            'by_id': {row[id_field]: row for row in rows},
+            'etag': digest.hexdigest()
+        }
+    
+    def _reference_data(self, name: str) -> Dict:
+        """Get a reference table from the shared cache"""
+        return _reference_cache.get(name, lambda: self._load_reference_data(name))
+    
+    def get_reference_etag(self, name: str) -> str:
+        """
+        Get the ETag of a cached reference table
+        
+        Args:
+            name: 'violation_types' or 'areas'
+        Returns:
+            ETag string that changes whenever the table contents change
+        """
+        return self._reference_data(name)['etag']
+    
+    def invalidate_reference_data(self, name: Optional[str] = None):
+        """
+        Drop cached reference data after a type or area is written
+        
+        Args:
+            name: 'violation_types' or 'areas' (None drops both)
         """
+        _reference_cache.invalidate(name)
+    
+    def _attach_reference_names(self, rows: List[Dict]) -> List[Dict]:
+        """
+        Add type_name, area_name and city to violation rows from cached
+        reference data instead of joining violation_types and areas
+        
+        Args:
+            rows: Violation rows containing type_id and area_id
+        Returns:
+            The same rows with names attached
+        """
+        if not rows:
+            return rows
+        
+        types = self._reference_data('violation_types')['by_id']
+        areas = self._reference_data('areas')['by_id']
         
-        return self.db.execute_query(query, (status, violation_id))
+        # A type or area written by another process may not be cached yet
+        if any(row['type_id'] not in types for row in rows):
+            self.invalidate_reference_data('violation_types')
+            types = self._reference_data('violation_types')['by_id']
+        if any(row['area_id'] not in areas for row in rows):
+            self.invalidate_reference_data('areas')
+            areas = self._reference_data('areas')['by_id']
+        
+        for row in rows:
+            violation_type = types.get(row['type_id'], {})
+            area = areas.get(row['area_id'], {})
+            row['type_name'] = violation_type.get('type_name')
+            row['area_name'] = area.get('area_name')
+            row['city'] = area.get('city')
+        
+        return rows
     
     def get_violation_types(self) -> List[Dict]:
         """
-        Get all violation types
+        Get all violation types (served from the reference data cache)
         
         Returns:
             List of violation types with base fines
         """
+        return [dict(row) for row in self._reference_data('violation_types')['rows']]
+    
+    def get_areas(self) -> List[Dict]:
+        """
+        Get all areas/locations (served from the reference data cache)
+        
+        Returns:
+            List of areas
+        """
+        return [dict(row) for row in self._reference_data('areas')['rows']]
+    
+    def create_violation_type(self, type_name: str, base_fine: float, description: str = '') -> Optional[int]:
+        """
+        Create a new violation type
+        
+        Args:
+            type_name: Unique name of the violation type
+            base_fine: Default fine amount
+            description: Optional description
+        Returns:
+            Type ID if successful, None otherwise
+        """
         query = """
-            SELECT type_id, type_name, base_fine, description
-            FROM violation_types
-            ORDER BY type_name
+            INSERT INTO violation_types (type_name, base_fine, description)
+            VALUES (%s, %s, %s)
         """
         
-        return self.db.fetch_all(query)
+        type_id = self.db.insert_returning_id(query, (type_name, base_fine, description))
+        self.invalidate_reference_data('violation_types')
+        return type_id
     
-    def get_areas(self) -> List[Dict]:
+    def update_violation_type(self, type_id: int, base_fine: float, description: Optional[str] = None) -> bool:
         """
-        Get all areas/locations
+        Update the base fine (and optionally description) of a violation type
         
+        Args:
+            type_id: Violation type ID
+            base_fine: New default fine amount
+            description: New description (None keeps the current one)
         Returns:
-            List of areas
+            True if successful, False otherwise
+        """
+        if description is None:
+            query = "UPDATE violation_types SET base_fine = %s WHERE type_id = %s"
+            params = (base_fine, type_id)
+        else:
+            query = "UPDATE violation_types SET base_fine = %s, description = %s WHERE type_id = %s"
+            params = (base_fine, description, type_id)
+        
+        success = self.db.execute_query(query, params)
+        self.invalidate_reference_data('violation_types')
+        return success
+    
+    def create_area(self, area_name: str, city: str) -> Optional[int]:
+        """
+        Create a new area
+        
+        Args:
+            area_name: Area name
+            city: City the area belongs to
+        Returns:
+            Area ID if successful, None otherwise
         """
         query = """
-            SELECT area_id, area_name, city
-            FROM areas
-            ORDER BY city, area_name
+            INSERT INTO areas (area_name, city)
+            VALUES (%s, %s)
         """
         
-        return self.db.fetch_all(query)
+        area_id = self.db.insert_returning_id(query, (area_name, city))
+        self.invalidate_reference_data('areas')
+        return area_id
     
     def calculate_total_fines(self, user_id: Optional[int] = None) -> Dict:
         """
         Calculate total, paid, and unpaid fines
+        Read from the user's user_balances row, or the violation_totals row
+        when no user is given
         
         Args:
             user_id: Optional user ID to filter by
         Returns:
-            Dictionary with total, paid, and unpaid amounts
+            Dictionary with total, paid, unpaid and disputed counts and amounts
         """
-        if user_id:
-            query = """
-                SELECT 
-                    COUNT(*) as total_count,
-                    SUM(fine_amount) as total_amount,
-                    SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END) as paid_amount,
-                    SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END) as unpaid_amount
-                FROM violations
-                WHERE user_id = %s
-            """
-            result = self.db.fetch_one(query, (user_id,))
-        else:
-            query = """
-                SELECT 
-                    COUNT(*) as total_count,
-                    SUM(fine_amount) as total_amount,
-                    SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END) as paid_amount,
-                    SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END) as unpaid_amount
-                FROM violations
-            """
-            result = self.db.fetch_one(query)
-        
-        if result:
-            return {
-                'total_count': result.get('total_count', 0),
-                'total_amount': float(result.get('total_amount', 0) or 0),
-                'paid_amount': float(result.get('paid_amount', 0) or 0),
-                'unpaid_amount': float(result.get('unpaid_amount', 0) or 0)
-            }
+        balance = self.balances.get_balance(user_id) if user_id else self.balances.get_totals()
         return {
-            'total_count': 0,
-            'total_amount': 0.0,
-            'paid_amount': 0.0,
-            'unpaid_amount': 0.0
+            'total_count': balance['violation_count'],
+            'paid_count': balance['paid_count'],
+            'unpaid_count': balance['unpaid_count'],
+            'disputed_count': balance['disputed_count'],
+            'total_amount': balance['total_amount'],
+            'paid_amount': balance['paid_amount'],
+            'unpaid_amount': balance['unpaid_amount'],
+            'disputed_amount': balance['disputed_amount']
         }
     
-    def search_violations(self, search_term: str) -> List[Dict]:
+    def search_violations(self, search_term: str, limit: Optional[int] = None,
+                          after: Optional[str] = None) -> List[Dict]:
         """
         Search violations by vehicle number or owner name
+        Results are ranked like the plate and user searches: exact matches
+        first (search_rank 0), then prefix (1), then substring (2) matches,
+        newest first within each rank
         
         Args:
             search_term: Search term
+            limit: Optional page size
+            after: Cursor of the last row on the previous page (see search_cursor)
         Returns:
             List of matching violations
+        Raises:
+            ValidationError: If the cursor is malformed
         """
-        query = """
-            SELECT 
-                v.violation_id,
-                v.vehicle_number,
-                u.full_name AS owner_name,
-                vt.type_name,
-                a.area_name,
-                v.violation_date,
-                v.fine_amount,
-                v.status
-            FROM violations v
-            LEFT JOIN users u ON v.user_id = u.user_id
-            JOIN violation_types vt ON v.type_id = vt.type_id
-            JOIN areas a ON v.area_id = a.area_id
-            WHERE v.vehicle_number LIKE %s OR u.full_name LIKE %s
-            ORDER BY v.violation_date DESC
+        search_condition, search_params = self._search_condition(search_term)
+        plate_term = self.search_index.normalize_plate(search_term) or None
+        name_term = self.search_index.normalize_text(search_term) or None
+        rank_params = (
+            plate_term, name_term,
+            plate_term and f"{plate_term}%", name_term and f"{name_term}%"
+        )
+        
+        condition = ''
+        where_params = ()
+        if after:
+            last_value, last_id = decode_cursor(after)
+            try:
+                last_rank, last_date = last_value.split('|', 1)
+                last_rank = int(last_rank)
+            except ValueError:
+                raise ValidationError("Invalid pagination cursor")
+            condition = """
+                WHERE search_rank > %s OR (search_rank = %s AND (
+                    violation_date < %s OR (violation_date = %s AND violation_id < %s)))
+            """
+            where_params = (last_rank, last_rank, last_date, last_date, last_id)
+        
+        limit_clause = ''
+        limit_params = ()
+        if limit:
+            limit_clause = "LIMIT %s"
+            limit_params = (limit,)
+        
+        query = f"""
+            SELECT * FROM (
+                SELECT 
+                    v.violation_id,
+                    v.vehicle_number,
+                    u.full_name AS owner_name,
+                    v.type_id,
+                    v.area_id,
+                    v.violation_date,
+                    v.fine_amount,
+                    v.status,
+                    CASE
+                        WHEN v.plate_key = %s OR u.full_name LIKE %s THEN 0
+                        WHEN v.plate_key LIKE %s OR u.full_name LIKE %s THEN 1
+                        ELSE 2
+                    END AS search_rank
+                FROM violations v
+                LEFT JOIN users u ON v.user_id = u.user_id
+                WHERE {search_condition}
+            ) ranked
+            {condition}
+            ORDER BY search_rank, violation_date DESC, violation_id DESC
+            {limit_clause}
+        """
+        
+        violations = self.db.fetch_all(query, rank_params + search_params + where_params + limit_params)
+        return self._attach_reference_names(violations)
+    
+    @staticmethod
+    def search_cursor(violations: List[Dict], page_size: int) -> Optional[str]:
+        """
+        Build the cursor for the page after a search_violations page
+        
+        Args:
+            violations: Rows of the current page
+            page_size: Page size that was requested
+        Returns:
+            Cursor string, or None if this was the last page
         """
+        if len(violations) < page_size:
+            return None
         
-        search_pattern = f"%{search_term}%"
-        return self.db.fetch_all(query, (search_pattern, search_pattern))
\ No newline at end of file
+        last = violations[-1]
+        violation_date = last['violation_date']
+        if isinstance(violation_date, datetime):
+            violation_date = violation_date.strftime('%Y-%m-%d %H:%M:%S')
+        return encode_cursor(f"{last['search_rank']}|{violation_date}", last['violation_id'])
\ No newline at end of file
@@ -3,69 +3,121 @@ Analytics Module
 Provides data analytics and insights for traffic violations
 """
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from functools import wraps
 import sys
 sys.path.append('..')
 
 from database.db_connection import get_db
+from utils.cache import TTLCache
+from config import ANALYTICS_CONFIG
+
+
+# Results shared by every AnalyticsEngine; dropped whenever violations or payments change
+_analytics_cache = TTLCache(
+    ttl=ANALYTICS_CONFIG['cache_ttl'],
+    max_size=ANALYTICS_CONFIG['cache_max_entries']
+)
+
+
+def invalidate_analytics_cache():
+    """Drop all cached analytics results (called after violation and payment writes)"""
+    _analytics_cache.invalidate()
+
+
+def cached(method):
+    """Cache an AnalyticsEngine method's result by method name and arguments"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        return _analytics_cache.get(key, lambda: method(self, *args, **kwargs))
+    return wrapper
 
 
 class AnalyticsEngine:
     """
     Analytics engine for generating insights and reports
+    Aggregates by day, area, type, officer and status are read from
+    violation_daily_rollups (see RollupManager) instead of scanning violations
     """
     
+    # Export dataset name -> method returning its rows
+    EXPORT_DATASETS = {
+        'by_area': 'get_violations_by_area',
+        'by_type': 'get_violations_by_type',
+        'payment_status': 'get_payment_status_summary',
+        'monthly_trends': 'get_monthly_trends',
+        'officer_performance': 'get_officer_performance',
+        'top_violators': 'get_top_violators',
+        'daily_violations': 'get_daily_violations',
+        'collection_efficiency': 'get_collection_efficiency',
+        'peak_hours': 'get_peak_violation_hours'
+    }
+    
     def __init__(self):
         """Initialize analytics engine with database connection"""
         self.db = get_db()
     
-    def get_violations_by_area(self) -> List[Dict]:
+    @cached
+    def get_violations_by_area(self, limit: Optional[int] = None) -> List[Dict]:
         """
         Get violation count and total fines by area
         
+        Args:
+            limit: Optional number of top areas to return
         Returns:
             List of areas with violation statistics
         """
-        query = """
+        limit_clause = "LIMIT %s" if limit else ""
+        
+        query = f"""
             SELECT 
                 a.area_name,
                 a.city,
-                COUNT(v.violation_id) AS violation_count,
-                SUM(v.fine_amount) AS total_fines,
-                SUM(CASE WHEN v.status = 'paid' THEN v.fine_amount ELSE 0 END) AS collected_fines
+                SUM(r.violation_count) AS violation_count,
+                SUM(r.total_fines) AS total_fines,
+                SUM(CASE WHEN r.status = 'paid' THEN r.total_fines ELSE 0 END) AS collected_fines
             FROM areas a
-            LEFT JOIN violations v ON a.area_id = v.area_id
+            JOIN violation_daily_rollups r ON a.area_id = r.area_id
             GROUP BY a.area_id, a.area_name, a.city
             HAVING violation_count > 0
             ORDER BY violation_count DESC
+            {limit_clause}
         """
         
-        return self.db.fetch_all(query)
+        return self.db.fetch_all(query, (limit,) if limit else None)
     
-    def get_violations_by_type(self) -> List[Dict]:
+    @cached
+    def get_violations_by_type(self, limit: Optional[int] = None) -> List[Dict]:
         """
         Get violation count and statistics by violation type
         
+        Args:
+            limit: Optional number of top types to return
         Returns:
             List of violation types with occurrence statistics
         """
-        query = """
+        limit_clause = "LIMIT %s" if limit else ""
+        
+        query = f"""
             SELECT 
                 vt.type_name,
                 vt.base_fine,
-                COUNT(v.violation_id) AS occurrence_count,
-                SUM(v.fine_amount) AS total_fines_collected,
-                ROUND(AVG(v.fine_amount), 2) AS avg_fine
+                SUM(r.violation_count) AS occurrence_count,
+                SUM(r.total_fines) AS total_fines_collected,
+                ROUND(SUM(r.total_fines) / NULLIF(SUM(r.violation_count), 0), 2) AS avg_fine
             FROM violation_types vt
-            LEFT JOIN violations v ON vt.type_id = v.type_id
+            JOIN violation_daily_rollups r ON vt.type_id = r.type_id
             GROUP BY vt.type_id, vt.type_name, vt.base_fine
             HAVING occurrence_count > 0
             ORDER BY occurrence_count DESC
+            {limit_clause}
         """
         
-        return self.db.fetch_all(query)
+        return self.db.fetch_all(query, (limit,) if limit else None)
     
+    @cached
     def get_payment_status_summary(self) -> List[Dict]:
         """
         Get summary of violations by payment status
@@ -76,16 +128,18 @@ class AnalyticsEngine:
         query = """
             SELECT 
                 status,
-                COUNT(*) AS count,
-                SUM(fine_amount) AS total_amount,
-                ROUND(AVG(fine_amount), 2) AS avg_amount
-            FROM violations
+                SUM(violation_count) AS count,
+                SUM(total_fines) AS total_amount,
+                ROUND(SUM(total_fines) / NULLIF(SUM(violation_count), 0), 2) AS avg_amount
+            FROM violation_daily_rollups
             GROUP BY status
+            HAVING count > 0
             ORDER BY count DESC
         """
         
         return self.db.fetch_all(query)
     
+    @cached
     def get_monthly_trends(self, months: int = 12) -> List[Dict]:
         """
         Get monthly violation trends
@@ -95,22 +149,25 @@ class AnalyticsEngine:
         Returns:
             List of monthly statistics
         """
-        query = """
+        month = self.db.dialect.bucket('rollup_date', 'month')
+        query = f"""
             SELECT 
-                strftime('%Y-%m', violation_date) AS month,
-                COUNT(*) AS total_violations,
-                SUM(fine_amount) AS total_fines,
-                SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END) AS collected_amount,
-                COUNT(CASE WHEN status = 'paid' THEN 1 END) AS paid_count,
-                COUNT(CASE WHEN status = 'unpaid' THEN 1 END) AS unpaid_count
-            FROM violations
-            WHERE violation_date >= date('now', '-' || %s || ' months')
-            GROUP BY strftime('%Y-%m', violation_date)
+                {month} AS month,
+                SUM(violation_count) AS total_violations,
+                SUM(total_fines) AS total_fines,
+                SUM(CASE WHEN status = 'paid' THEN total_fines ELSE 0 END) AS collected_amount,
+                SUM(CASE WHEN status = 'paid' THEN violation_count ELSE 0 END) AS paid_count,
+                SUM(CASE WHEN status = 'unpaid' THEN violation_count ELSE 0 END) AS unpaid_count
+            FROM violation_daily_rollups
+            WHERE rollup_date >= %s
+            GROUP BY {month}
+            HAVING total_violations > 0
             ORDER BY month DESC
         """
         
-        return self.db.fetch_all(query, (months,))
+        return self.db.fetch_all(query, (self.db.dialect.months_ago(months),))
     
+    @cached
     def get_officer_performance(self) -> List[Dict]:
         """
         Get performance statistics for each officer
@@ -122,16 +179,16 @@ class AnalyticsEngine:
             SELECT 
                 u.full_name AS officer_name,
                 u.email,
-                COUNT(v.violation_id) AS violations_registered,
-                SUM(v.fine_amount) AS total_fines_imposed,
-                SUM(CASE WHEN v.status = 'paid' THEN 1 ELSE 0 END) AS paid_count,
-                SUM(CASE WHEN v.status = 'unpaid' THEN 1 ELSE 0 END) AS unpaid_count,
+                SUM(r.violation_count) AS violations_registered,
+                SUM(r.total_fines) AS total_fines_imposed,
+                SUM(CASE WHEN r.status = 'paid' THEN r.violation_count ELSE 0 END) AS paid_count,
+                SUM(CASE WHEN r.status = 'unpaid' THEN r.violation_count ELSE 0 END) AS unpaid_count,
                 ROUND(
-                    (CAST(SUM(CASE WHEN v.status = 'paid' THEN 1 ELSE 0 END) AS FLOAT) / 
-                     NULLIF(COUNT(v.violation_id), 0)) * 100, 2
+                    (CAST(SUM(CASE WHEN r.status = 'paid' THEN r.violation_count ELSE 0 END) AS FLOAT) / 
+                     NULLIF(SUM(r.violation_count), 0)) * 100, 2
                 ) AS collection_rate
             FROM users u
-            LEFT JOIN violations v ON u.user_id = v.officer_id
+            JOIN violation_daily_rollups r ON u.user_id = r.officer_id
             WHERE u.role = 'officer'
             GROUP BY u.user_id, u.full_name, u.email
             HAVING violations_registered > 0
@@ -140,6 +197,7 @@ class AnalyticsEngine:
         
         return self.db.fetch_all(query)
     
+    @cached
     def get_top_violators(self, limit: int = 10) -> List[Dict]:
         """
         Get top violators by number of violations
@@ -151,7 +209,7 @@ class AnalyticsEngine:
         """
         query = """
             SELECT 
-                v.vehicle_number,
+                v.plate_key AS vehicle_number,
                 u.full_name AS owner_name,
                 COUNT(v.violation_id) AS violation_count,
                 SUM(v.fine_amount) AS total_fines,
@@ -159,7 +217,7 @@ class AnalyticsEngine:
                 SUM(CASE WHEN v.status = 'unpaid' THEN v.fine_amount ELSE 0 END) AS unpaid_amount
             FROM violations v
             LEFT JOIN users u ON v.user_id = u.user_id
-            GROUP BY v.vehicle_number, u.full_name
+            GROUP BY v.plate_key, u.full_name
             HAVING violation_count > 1
             ORDER BY violation_count DESC, total_fines DESC
             LIMIT %s
@@ -167,6 +225,7 @@ class AnalyticsEngine:
         
         return self.db.fetch_all(query, (limit,))
     
+    @cached
     def get_daily_violations(self, days: int = 30) -> List[Dict]:
         """
         Get daily violation counts for the last N days
@@ -178,17 +237,19 @@ class AnalyticsEngine:
         """
         query = """
             SELECT 
-                DATE(violation_date) AS date,
-                COUNT(*) AS violation_count,
-                SUM(fine_amount) AS total_fines
-            FROM violations
-            WHERE violation_date >= date('now', '-' || %s || ' days')
-            GROUP BY DATE(violation_date)
+                rollup_date AS date,
+                SUM(violation_count) AS violation_count,
+                SUM(total_fines) AS total_fines
+            FROM violation_daily_rollups
+            WHERE rollup_date >= %s
+            GROUP BY rollup_date
+            HAVING violation_count > 0
             ORDER BY date DESC
         """
         
-        return self.db.fetch_all(query, (days,))
+        return self.db.fetch_all(query, (self.db.dialect.days_ago(days),))
     
+    @cached
     def get_collection_efficiency(self) -> Dict:
         """
         Calculate overall collection efficiency metrics
@@ -198,26 +259,26 @@ class AnalyticsEngine:
         """
         query = """
             SELECT 
-                COUNT(*) AS total_violations,
-                COUNT(CASE WHEN status = 'paid' THEN 1 END) AS paid_violations,
-                COUNT(CASE WHEN status = 'unpaid' THEN 1 END) AS unpaid_violations,
-                SUM(fine_amount) AS total_fines,
-                SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END) AS collected_amount,
-                SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END) AS pending_amount,
+                SUM(violation_count) AS total_violations,
+                SUM(CASE WHEN status = 'paid' THEN violation_count ELSE 0 END) AS paid_violations,
+                SUM(CASE WHEN status = 'unpaid' THEN violation_count ELSE 0 END) AS unpaid_violations,
+                SUM(total_fines) AS total_fines,
+                SUM(CASE WHEN status = 'paid' THEN total_fines ELSE 0 END) AS collected_amount,
+                SUM(CASE WHEN status = 'unpaid' THEN total_fines ELSE 0 END) AS pending_amount,
                 ROUND(
-                    (CAST(SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END) AS FLOAT) / 
-                     NULLIF(SUM(fine_amount), 0)) * 100, 2
+                    (CAST(SUM(CASE WHEN status = 'paid' THEN total_fines ELSE 0 END) AS FLOAT) / 
+                     NULLIF(SUM(total_fines), 0)) * 100, 2
                 ) AS collection_percentage
-            FROM violations
+            FROM violation_daily_rollups
         """
         
         result = self.db.fetch_one(query)
         
         if result:
             return {
-                'total_violations': result.get('total_violations', 0),
-                'paid_violations': result.get('paid_violations', 0),
-                'unpaid_violations': result.get('unpaid_violations', 0),
+                'total_violations': int(result.get('total_violations', 0) or 0),
+                'paid_violations': int(result.get('paid_violations', 0) or 0),
+                'unpaid_violations': int(result.get('unpaid_violations', 0) or 0),
                 'total_fines': float(result.get('total_fines', 0) or 0),
                 'collected_amount': float(result.get('collected_amount', 0) or 0),
                 'pending_amount': float(result.get('pending_amount', 0) or 0),
@@ -225,6 +286,7 @@ class AnalyticsEngine:
             }
         return {}
     
+    @cached
     def get_peak_violation_hours(self) -> List[Dict]:
         """
         Get violation distribution by hour of day
@@ -232,32 +294,134 @@ class AnalyticsEngine:
         Returns:
             List of hours with violation counts
         """
-        query = """
+        hour = self.db.dialect.bucket('violation_date', 'hour')
+        query = f"""
             SELECT 
-                CAST(strftime('%H', violation_date) AS INTEGER) AS hour,
+                {hour} AS hour,
                 COUNT(*) AS violation_count
             FROM violations
-            GROUP BY CAST(strftime('%H', violation_date) AS INTEGER)
+            GROUP BY {hour}
             ORDER BY hour
         """
         
         return self.db.fetch_all(query)
     
-    def generate_summary_report(self) -> Dict:
+    @cached
+    def generate_summary_report(self, top_count: int = 5, trend_months: int = 3) -> Dict:
         """
         Generate a comprehensive summary report
+        All five sections are folded from one read of the rollups, grouped by
+        area, type, status and month (a few rows per combination, not per
+        violation); each section has the same shape as its own method
         
+        Args:
+            top_count: Number of top areas and violation types
+            trend_months: Number of months in the recent trends section
         Returns:
             Dictionary containing summary statistics
         """
+        month = self.db.dialect.bucket('r.rollup_date', 'month')
+        query = f"""
+            SELECT 
+                a.area_name,
+                a.city,
+                vt.type_name,
+                vt.base_fine,
+                r.status,
+                {month} AS month,
+                CASE WHEN r.rollup_date >= %s THEN 1 ELSE 0 END AS recent,
+                SUM(r.violation_count) AS violation_count,
+                SUM(r.total_fines) AS total_fines
+            FROM violation_daily_rollups r
+            JOIN areas a ON a.area_id = r.area_id
+            JOIN violation_types vt ON vt.type_id = r.type_id
+            GROUP BY a.area_id, a.area_name, a.city, vt.type_id, vt.type_name, vt.base_fine,
+                     r.status, {month}, CASE WHEN r.rollup_date >= %s THEN 1 ELSE 0 END
+        """
+        since = self.db.dialect.months_ago(trend_months)
+        
+        statuses, areas, types, trends = {}, {}, {}, {}
+        for row in self.db.fetch_all(query, (since, since)):
+            count = int(row['violation_count'] or 0)
+            fines = float(row['total_fines'] or 0)
+            paid = row['status'] == 'paid'
+            
+            status = statuses.setdefault(row['status'], {'status': row['status'], 'count': 0, 'total_amount': 0.0})
+            status['count'] += count
+            status['total_amount'] += fines
+            
+            area = areas.setdefault((row['area_name'], row['city']), {
+                'area_name': row['area_name'], 'city': row['city'],
+                'violation_count': 0, 'total_fines': 0.0, 'collected_fines': 0.0
+            })
+            area['violation_count'] += count
+            area['total_fines'] += fines
+            area['collected_fines'] += fines if paid else 0.0
+            
+            violation_type = types.setdefault((row['type_name'], row['base_fine']), {
+                'type_name': row['type_name'], 'base_fine': row['base_fine'],
+                'occurrence_count': 0, 'total_fines_collected': 0.0
+            })
+            violation_type['occurrence_count'] += count
+            violation_type['total_fines_collected'] += fines
+            
+            if row['recent']:
+                trend = trends.setdefault(row['month'], {
+                    'month': row['month'], 'total_violations': 0, 'total_fines': 0.0,
+                    'collected_amount': 0.0, 'paid_count': 0, 'unpaid_count': 0
+                })
+                trend['total_violations'] += count
+                trend['total_fines'] += fines
+                trend['collected_amount'] += fines if paid else 0.0
+                trend['paid_count'] += count if paid else 0
+                trend['unpaid_count'] += count if row['status'] == 'unpaid' else 0
+        
+        for status in statuses.values():
+            status['total_amount'] = round(status['total_amount'], 2)
+            status['avg_amount'] = round(status['total_amount'] / status['count'], 2) if status['count'] else None
+        for violation_type in types.values():
+            violation_type['total_fines_collected'] = round(violation_type['total_fines_collected'], 2)
+            violation_type['avg_fine'] = (round(violation_type['total_fines_collected'] / violation_type['occurrence_count'], 2)
+                                          if violation_type['occurrence_count'] else None)
+        for section in (areas, trends):
+            for entry in section.values():
+                for column in ('total_fines', 'collected_fines', 'collected_amount'):
+                    if column in entry:
+                        entry[column] = round(entry[column], 2)
+        
+        total = {status: entry['count'] for status, entry in statuses.items()}
+        amount = {status: entry['total_amount'] for status, entry in statuses.items()}
+        total_fines = round(sum(amount.values()), 2)
+        
         return {
-            'collection_efficiency': self.get_collection_efficiency(),
-            'payment_status': self.get_payment_status_summary(),
-            'top_areas': self.get_violations_by_area()[:5],
-            'top_violation_types': self.get_violations_by_type()[:5],
-            'recent_trends': self.get_monthly_trends(3)
+            'collection_efficiency': {
+                'total_violations': sum(total.values()),
+                'paid_violations': total.get('paid', 0),
+                'unpaid_violations': total.get('unpaid', 0),
+                'total_fines': total_fines,
+                'collected_amount': amount.get('paid', 0.0),
+                'pending_amount': amount.get('unpaid', 0.0),
+                'collection_percentage': round(amount.get('paid', 0.0) / total_fines * 100, 2) if total_fines else 0.0
+            },
+            'payment_status': sorted((entry for entry in statuses.values() if entry['count'] > 0),
+                                     key=lambda entry: (-entry['count'], entry['status'])),
+            'top_areas': sorted((entry for entry in areas.values() if entry['violation_count'] > 0),
+                                key=lambda entry: (-entry['violation_count'], entry['area_name']))[:top_count],
+            'top_violation_types': sorted((entry for entry in types.values() if entry['occurrence_count'] > 0),
+                                          key=lambda entry: (-entry['occurrence_count'], entry['type_name']))[:top_count],
+            'recent_trends': sorted((entry for entry in trends.values() if entry['total_violations'] > 0),
+                                    key=lambda entry: entry['month'], reverse=True)
         }
     
+    def cache_stats(self) -> Dict:
+        """
+        Get analytics cache counters
+        
+        Returns:
+            Dictionary with hits, misses, coalesced loads, size and hit rate
+        """
+        return _analytics_cache.stats()
+    
     def export_analytics_data(self, analytics_type: str) -> List[Dict]:
         """
         Export analytics data based on type
@@ -267,14 +431,9 @@ class AnalyticsEngine:
         Returns:
             List of data records
         """
-        analytics_map = {
-            'by_area': self.get_violations_by_area,
-            'by_type': self.get_violations_by_type,
-            'monthly_trends': self.get_monthly_trends,
-            'officer_performance': self.get_officer_performance,
-            'top_violators': self.get_top_violators
-        }
+        method_name = self.EXPORT_DATASETS.get(analytics_type)
+        if not method_name:
+            return []
         
-        if analytics_type in analytics_map:
-            return analytics_map[analytics_type]()
-        return []
\ No newline at end of file
+        data = getattr(self, method_name)()
+        return data if isinstance(data, list) else [data]
\ No newline at end of file
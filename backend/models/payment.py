@@ -5,6 +5,10 @@ Represents a payment transaction for a violation
 
 from typing import Optional, Dict
 from datetime import datetime
+import sys
+sys.path.append('..')
+
+from utils.transaction_ids import new_transaction_id
 
 
 class Payment:
@@ -14,6 +18,12 @@ class Payment:
     
     VALID_METHODS = ['cash', 'card', 'online', 'cheque']
     
+    # Fixed attribute layout instead of a per-instance __dict__
+    __slots__ = (
+        '_payment_id', '_violation_id', '_payment_date', '_amount_paid',
+        '_payment_method', '_transaction_id', '_created_at'
+    )
+    
     def __init__(
         self,
         payment_id: Optional[int] = None,
@@ -111,10 +121,9 @@ class Payment:
     def generate_transaction_id(self) -> str:
         """
         Generate a unique transaction ID
-        Format: TXN + timestamp
+        Format: TXN + millisecond timestamp + node + sequence
         """
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        return f"TXN{timestamp}"
+        return new_transaction_id()
     
     def is_online_payment(self) -> bool:
         """Check if payment was made online"""
@@ -156,6 +165,28 @@ class Payment:
             created_at=data.get('created_at')
         )
     
+    @classmethod
+    def from_row(cls, row: Dict) -> 'Payment':
+        """
+        Create Payment object from a payments table row
+        Sets the fields directly; a stored row already has its payment date,
+        a valid method and created_at, so __init__ has nothing to fill in
+        
+        Args:
+            row: Row dictionary from SELECT * FROM payments
+        Returns:
+            Payment object
+        """
+        payment = cls.__new__(cls)
+        payment._payment_id = row['payment_id']
+        payment._violation_id = row['violation_id']
+        payment._payment_date = row['payment_date']
+        payment._amount_paid = float(row['amount_paid'])
+        payment._payment_method = row['payment_method']
+        payment._transaction_id = row['transaction_id']
+        payment._created_at = row['created_at']
+        return payment
+    
     def __str__(self) -> str:
         """String representation of Payment"""
         return f"Payment(id={self._payment_id}, violation_id={self._violation_id}, amount={self._amount_paid}, method={self._payment_method})"
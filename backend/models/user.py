@@ -15,6 +15,11 @@ class User:
     
     VALID_ROLES = ['admin', 'officer', 'citizen']
     
+    # Slots keep instances small when many users are loaded
+    __slots__ = (
+        '_user_id', '_username', '_password', '_full_name', '_role', '_email', '_phone', '_created_at'
+    )
+    
     def __init__(
         self,
         user_id: Optional[int] = None,
@@ -178,6 +183,29 @@ class User:
             created_at=data.get('created_at')
         )
     
+    @classmethod
+    def from_row(cls, row: Dict) -> 'User':
+        """
+        Create User object from a users table row
+        Used by the lookup methods in UserManager; the role was checked when
+        the user was saved, so it is copied without validation
+        
+        Args:
+            row: Row dictionary from SELECT * FROM users
+        Returns:
+            User object
+        """
+        user = cls.__new__(cls)
+        user._user_id = row['user_id']
+        user._username = row['username']
+        user._password = row['password']
+        user._full_name = row['full_name']
+        user._role = row['role']
+        user._email = row['email']
+        user._phone = row['phone']
+        user._created_at = row['created_at']
+        return user
+    
     def __str__(self) -> str:
         """String representation of User"""
         return f"User(id={self._user_id}, username={self._username}, role={self._role})"
@@ -15,6 +15,12 @@ class Violation:
     
     VALID_STATUSES = ['unpaid', 'paid', 'disputed']
     
+    # No per-instance __dict__: managers may hold many of these at once
+    __slots__ = (
+        '_violation_id', '_vehicle_number', '_user_id', '_type_id', '_area_id', '_officer_id',
+        '_violation_date', '_fine_amount', '_status', '_notes', '_created_at'
+    )
+    
     def __init__(
         self,
         violation_id: Optional[int] = None,
@@ -236,6 +242,32 @@ class Violation:
             created_at=data.get('created_at')
         )
     
+    @classmethod
+    def from_row(cls, row: Dict) -> 'Violation':
+        """
+        Create Violation object from a violations table row
+        Fields are copied as stored (plates are already uppercase and the
+        status already valid), without going through __init__
+        
+        Args:
+            row: Row dictionary from SELECT * FROM violations
+        Returns:
+            Violation object
+        """
+        violation = cls.__new__(cls)
+        violation._violation_id = row['violation_id']
+        violation._vehicle_number = row['vehicle_number']
+        violation._user_id = row['user_id']
+        violation._type_id = row['type_id']
+        violation._area_id = row['area_id']
+        violation._officer_id = row['officer_id']
+        violation._violation_date = row['violation_date']
+        violation._fine_amount = float(row['fine_amount'])
+        violation._status = row['status']
+        violation._notes = row['notes']
+        violation._created_at = row['created_at']
+        return violation
+    
     def __str__(self) -> str:
         """String representation of Violation"""
         return f"Violation(id={self._violation_id}, vehicle={self._vehicle_number}, amount={self._fine_amount}, status={self._status})"
@@ -33,6 +33,24 @@ from .validators import (
     validate_payment_input
 )
 
+from .pagination import (
+    encode_cursor,
+    decode_cursor,
+    clamp_page_size,
+    next_cursor
+)
+
+from .transaction_ids import (
+    TransactionIdGenerator,
+    new_transaction_id
+)
+
+from .plates import (
+    plate_key,
+    ocr_fold,
+    edit_distance
+)
+
 __all__ = [
     # Exception
     'ValidationError',
@@ -59,5 +77,20 @@ __all__ = [
     # Comprehensive validators
     'validate_user_input',
     'validate_violation_input',
-    'validate_payment_input'
+    'validate_payment_input',
+    
+    # Pagination
+    'encode_cursor',
+    'decode_cursor',
+    'clamp_page_size',
+    'next_cursor',
+    
+    # Transaction IDs
+    'TransactionIdGenerator',
+    'new_transaction_id',
+    
+    # Plates
+    'plate_key',
+    'ocr_fold',
+    'edit_distance'
 ]
\ No newline at end of file
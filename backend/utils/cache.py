@@ -0,0 +1,170 @@
+"""
+Cache Module
+In-process caching utilities for the Traffic Violation Management System
+Location: backend/utils/cache.py
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+    """A load in progress that concurrent callers of the same key wait on"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe key/value cache whose entries expire after a fixed time
+    Optionally bounded to max_size entries (least recently used evicted first).
+    Concurrent misses on one key share a single load.
+    """
+    
+    def __init__(self, ttl: float, max_size: Optional[int] = None):
+        """
+        Initialize cache
+        
+        Args:
+            ttl: Seconds an entry stays valid after it is loaded
+            max_size: Maximum number of entries (None for unbounded)
+        """
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.updates = 0
+    
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, loading it on a miss or after expiry
+        
+        Args:
+            key: Cache key
+            loader: Callable producing the value when it is not cached
+        Returns:
+            Cached or freshly loaded value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation
+                leader = True
+        
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        
+        try:
+            value = loader()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+            raise
+        
+        with self._lock:
+            self._inflight.pop(key, None)
+            # Don't store a value loaded before an invalidation
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self._ttl, value)
+                self._entries.move_to_end(key)
+                if self._max_size is not None:
+                    while len(self._entries) > self._max_size:
+                        self._entries.popitem(last=False)
+        
+        flight.value = value
+        flight.event.set()
+        return value
+    
+    def peek(self, key: Hashable) -> Any:
+        """
+        Get a cached value without loading it or counting a lookup
+        
+        Args:
+            key: Cache key
+        Returns:
+            Cached value, or None when the key is missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            return None
+    
+    def update(self, key: Hashable, updater: Callable[[Any], Any]) -> bool:
+        """
+        Replace a cached value with updater(value), keeping its expiry
+        The updater runs under the cache lock, so keep it short and have it
+        return a new value rather than mutate the one readers may hold.
+        
+        Args:
+            key: Cache key
+            updater: Callable taking the cached value and returning the new one
+        Returns:
+            True if an entry was updated, False if the key is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or entry[0] <= time.monotonic():
+                return False
+            self._entries[key] = (entry[0], updater(entry[1]))
+            self.updates += 1
+            return True
+    
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        Drop one entry, or every entry when no key is given
+        
+        Args:
+            key: Cache key to drop (None clears the cache)
+        """
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict:
+        """
+        Get cache counters
+        
+        Returns:
+            Dictionary with hits, misses, coalesced loads, in-place updates, size and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'updates': self.updates,
+                'size': len(self._entries),
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
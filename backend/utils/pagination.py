@@ -0,0 +1,85 @@
+"""
+Pagination Module
+Keyset (cursor) pagination helpers for the Traffic Violation Management System
+Location: backend/utils/pagination.py
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .validators import ValidationError
+
+
+def encode_cursor(sort_value, row_id: int) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor
+    
+    Args:
+        sort_value: Value of the sort column (e.g. violation_date)
+        row_id: Primary key of the row, used as tie-breaker
+    Returns:
+        URL-safe cursor string
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.strftime('%Y-%m-%d %H:%M:%S')
+    
+    raw = f"{sort_value}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by encode_cursor
+    
+    Args:
+        cursor: Cursor string from a previous page
+    Returns:
+        Tuple of (sort_value, row_id)
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        sort_value, row_id = raw.rsplit('|', 1)
+        return sort_value, int(row_id)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise ValidationError("Invalid pagination cursor")
+
+
+def clamp_page_size(page_size: Optional[int], default: int, maximum: int) -> int:
+    """
+    Bound a requested page size
+    
+    Args:
+        page_size: Requested page size (None for default)
+        default: Page size used when none is requested
+        maximum: Largest allowed page size
+    Returns:
+        Page size between 1 and maximum
+    """
+    if not page_size or page_size < 1:
+        return default
+    return min(page_size, maximum)
+
+
+def next_cursor(rows: List[Dict], page_size: int, sort_key: str = 'violation_date',
+                id_key: str = 'violation_id') -> Optional[str]:
+    """
+    Build the cursor for the page after rows
+    
+    Args:
+        rows: Rows of the current page
+        page_size: Page size that was requested
+        sort_key: Name of the sort column in each row
+        id_key: Name of the tie-breaker column in each row
+    Returns:
+        Cursor string, or None if this was the last page
+    """
+    if len(rows) < page_size:
+        return None
+    
+    last = rows[-1]
+    return encode_cursor(last[sort_key], last[id_key])
@@ -0,0 +1,70 @@
+"""
+Plates Module
+Canonical vehicle number keys and OCR-tolerant comparison
+Location: backend/utils/plates.py
+"""
+
+import re
+
+NON_ALPHANUMERIC_RE = re.compile(r'[^A-Z0-9]')
+
+# Characters number-plate OCR commonly reads for one another, folded to one form
+OCR_CONFUSIONS = str.maketrans({
+    'O': '0', 'Q': '0',
+    'I': '1', 'L': '1',
+    'B': '8',
+    'S': '5',
+    'Z': '2',
+    'G': '6'
+})
+
+
+def plate_key(vehicle_number: str) -> str:
+    """
+    Get the canonical key of a vehicle number
+    Uppercase with spaces, hyphens and other separators removed, so
+    'ka-01-ab-1234' and 'KA01AB1234' share the key KA01AB1234
+    
+    Args:
+        vehicle_number: Vehicle number as entered or read
+    Returns:
+        Plate key
+    """
+    return NON_ALPHANUMERIC_RE.sub('', (vehicle_number or '').upper())
+
+
+def ocr_fold(key: str) -> str:
+    """
+    Fold OCR-confusable characters of a plate key (0/O, 1/I, 8/B, ...) together
+    
+    Args:
+        key: Plate key
+    Returns:
+        Folded key; keys differing only by confusable characters fold equal
+    """
+    return key.translate(OCR_CONFUSIONS)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Levenshtein distance between two strings
+    
+    Args:
+        a: First string
+        b: Second string
+    Returns:
+        Minimum number of single-character insertions, deletions and substitutions
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        previous = current
+    return previous[-1]
@@ -0,0 +1,81 @@
+"""
+Transaction ID Module
+Unique, time-sortable payment transaction IDs
+Location: backend/utils/transaction_ids.py
+"""
+
+import itertools
+import os
+import socket
+import time
+import zlib
+from typing import Optional
+
+
+class TransactionIdGenerator:
+    """
+    Generates IDs of the form PREFIX + millis(13) + node(5) + sequence(6)
+    e.g. TXN1760000000000042170000001
+    
+    The node number separates worker processes and the sequence separates
+    IDs issued by one process in the same millisecond. Set TRANSACTION_NODE_ID
+    to a distinct number for every worker: without it the node is a hash of
+    host name and PID, and two workers can hash to the same node (the
+    payments unique index then rejects the duplicate and
+    PaymentManager.process_payment retries with a new ID). next() takes no
+    lock: itertools.count is atomic under the GIL.
+    """
+    
+    NODE_DIGITS = 5
+    SEQUENCE_DIGITS = 6
+    
+    def __init__(self, prefix: str = 'TXN', node_id: Optional[int] = None):
+        """
+        Initialize generator
+        
+        Args:
+            prefix: Text placed before every ID
+            node_id: Number identifying this process (0-99999)
+        """
+        if node_id is None:
+            node_id = os.getenv('TRANSACTION_NODE_ID')
+        if node_id is None:
+            node_id = zlib.crc32(f"{socket.gethostname()}:{os.getpid()}".encode('utf-8'))
+        
+        self.prefix = prefix
+        self.node_id = int(node_id) % 10 ** self.NODE_DIGITS
+        self._sequence = itertools.count()
+        self._last_millis = 0
+    
+    def next(self) -> str:
+        """
+        Get a new transaction ID
+        
+        Returns:
+            Transaction ID string; IDs from one process sort in issue order
+        """
+        # Never step back if the wall clock is adjusted
+        millis = max(time.time_ns() // 1_000_000, self._last_millis)
+        self._last_millis = millis
+        sequence = next(self._sequence) % 10 ** self.SEQUENCE_DIGITS
+        return (f"{self.prefix}{millis:013d}"
+                f"{self.node_id:0{self.NODE_DIGITS}d}{sequence:0{self.SEQUENCE_DIGITS}d}")
+
+
+# Process-wide generator; recreated after fork so workers get their own node number
+_generator = TransactionIdGenerator()
+_generator_pid = os.getpid()
+
+
+def new_transaction_id() -> str:
+    """
+    Get a new transaction ID from the process-wide generator
+    
+    Returns:
+        Transaction ID string
+    """
+    global _generator, _generator_pid
+    if _generator_pid != os.getpid():
+        _generator = TransactionIdGenerator()
+        _generator_pid = os.getpid()
+    return _generator.next()
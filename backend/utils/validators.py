@@ -517,6 +517,12 @@ def validate_violation_input(data: dict) -> Tuple[bool, dict]:
     else:
         errors['fine_amount'] = "Fine amount is required"
     
+    # Validate violation date (optional, defaults to now)
+    if data.get('violation_date') and not isinstance(data['violation_date'], datetime):
+        is_valid, error = validate_datetime(str(data['violation_date']).strip())
+        if not is_valid:
+            errors['violation_date'] = error
+    
     return len(errors) == 0, errors
 
 
@@ -24,6 +24,14 @@ DATABASE_CONFIG = {
     }
 }
 
+# Connection Pool Configuration
+POOL_CONFIG = {
+    'min_size': int(os.getenv('DB_POOL_MIN', '1')),
+    'max_size': int(os.getenv('DB_POOL_MAX', '10')),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '30')),  # Seconds to wait for a free connection
+    'idle_timeout': float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))  # Seconds before idle connections are closed
+}
+
 # Application Configuration
 APP_CONFIG = {
     'host': os.getenv('APP_HOST', '0.0.0.0'),
@@ -50,6 +58,61 @@ PAGINATION_CONFIG = {
     'max_items_per_page': 100
 }
 
+# Bulk Ingestion Configuration
+BULK_CONFIG = {
+    'chunk_size': int(os.getenv('BULK_CHUNK_SIZE', '500')),  # Rows inserted per transaction
+    'max_rows_per_request': 10000,
+    'import_chunk_size': int(os.getenv('IMPORT_CHUNK_SIZE', '5000'))  # Rows per transaction in offline CSV imports
+}
+
+# Export / Streaming Configuration
+EXPORT_CONFIG = {
+    'batch_size': int(os.getenv('EXPORT_BATCH_SIZE', '1000')),  # Rows fetched per database round trip
+    'chunk_bytes': 64 * 1024  # Response bytes buffered before each write
+}
+
+# Reference Data Cache Configuration (violation types, areas)
+REFERENCE_CACHE_CONFIG = {
+    'ttl': int(os.getenv('REFERENCE_CACHE_TTL', '3600')),  # Seconds before reloading from the database
+    'browser_max_age': 300  # Cache-Control max-age for reference data endpoints
+}
+
+# Search Configuration (trigram index on vehicle numbers and users)
+SEARCH_CONFIG = {
+    'max_candidates': int(os.getenv('SEARCH_MAX_CANDIDATES', '1000')),  # Index entries ranked per plate/user search
+    'count_cap': 10000,  # Postings counted per trigram when picking the rarest ones
+    'max_joined_trigrams': 6,  # Rarest trigrams of a term intersected in SQL
+    'default_limit': 20
+}
+
+# Vehicle History Cache Configuration (per-plate violation list and unpaid total)
+VEHICLE_HISTORY_CONFIG = {
+    'ttl': int(os.getenv('VEHICLE_HISTORY_TTL', '300')),  # Bounds staleness from writes by other processes
+    'max_entries': int(os.getenv('VEHICLE_HISTORY_MAX_ENTRIES', '10000'))  # Least recently used plates evicted first
+}
+
+# Fuzzy Plate Matching Configuration (camera / OCR lookups)
+PLATE_MATCH_CONFIG = {
+    'max_distance': 1,  # Edits allowed besides OCR confusions (0/O, 1/I, 8/B, ...); 0 or 1
+    'max_results': 20
+}
+
+# Settlement Reconciliation Configuration
+RECONCILIATION_CONFIG = {
+    'chunk_size': int(os.getenv('RECONCILE_CHUNK_SIZE', '5000')),  # Settlement lines processed per chunk
+    'lookup_batch_size': 900,  # Transaction IDs per IN (...) lookup (SQLite allows 999 parameters)
+    'amount_tolerance': 0.01,  # Largest accepted amount difference
+    'date_tolerance_days': int(os.getenv('RECONCILE_DATE_TOLERANCE_DAYS', '3'))  # Settlement may lag payment by this many days
+}
+
+# Idempotency Configuration (Idempotency-Key header on create endpoints)
+IDEMPOTENCY_CONFIG = {
+    'ttl': int(os.getenv('IDEMPOTENCY_TTL', '86400')),  # Seconds a key and its response are kept
+    'lease': int(os.getenv('IDEMPOTENCY_LEASE', '60')),  # Seconds before an unfinished claim can be taken over
+    'purge_interval': 300,  # Seconds between expired-key purges run from begin()
+    'max_key_length': 255
+}
+
 # Email Configuration (for future implementation)
 EMAIL_CONFIG = {
     'smtp_server': os.getenv('SMTP_SERVER', 'smtp.gmail.com'),
@@ -63,13 +126,16 @@ EMAIL_CONFIG = {
 FINE_RULES = {
     'late_fee_percentage': 0.05,  # 5% per day
     'max_late_fee_days': 30,  # Maximum days for late fee calculation
-    'grace_period_days': 7  # Days before late fee applies
+    'grace_period_days': 7,  # Days before late fee applies
+    'late_fee_batch_size': 1000  # Violations per UPDATE in the nightly late-fee run
 }
 
 # Analytics Configuration
 ANALYTICS_CONFIG = {
     'default_months': 6,  # Default months for trend analysis
-    'default_top_count': 10  # Default count for top N queries
+    'default_top_count': 10,  # Default count for top N queries
+    'cache_ttl': int(os.getenv('ANALYTICS_CACHE_TTL', '60')),  # Seconds analytics results are reused
+    'cache_max_entries': 256  # Distinct method/argument combinations kept
 }
 
 # Logging Configuration
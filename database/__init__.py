@@ -4,5 +4,7 @@ Handles all database connections and operations
 """
 
 from .db_connection import DatabaseConnection, get_db
+from .connection_pool import ConnectionPool, PoolTimeoutError
+from .dialect import SQLDialect
 
-__all__ = ['DatabaseConnection', 'get_db']
\ No newline at end of file
+__all__ = ['DatabaseConnection', 'get_db', 'ConnectionPool', 'PoolTimeoutError', 'SQLDialect']
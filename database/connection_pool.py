@@ -0,0 +1,220 @@
+"""
+Connection Pool Module
+Bounded, thread-safe pool of database connections
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available before the checkout timeout"""
+    pass
+
+
+class ConnectionPool:
+    """
+    Bounded connection pool
+    Connections are created lazily up to max_size, health-checked when
+    borrowed and closed after sitting idle longer than idle_timeout
+    (the pool never shrinks below min_size)
+    """
+    
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        idle_timeout: float = 300.0,
+        health_check: Optional[Callable[[Any], bool]] = None
+    ):
+        """
+        Initialize connection pool
+        
+        Args:
+            factory: Callable that opens a new database connection
+            min_size: Connections kept open even when idle
+            max_size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection before failing
+            idle_timeout: Seconds an idle connection is kept before eviction
+            health_check: Callable returning True if a connection is usable
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        
+        self._factory = factory
+        self._min_size = min_size
+        self._max_size = max_size
+        self._timeout = timeout
+        self._idle_timeout = idle_timeout
+        self._health_check = health_check
+        
+        self._idle = deque()  # (connection, released_at) pairs, most recent on the right
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    @property
+    def size(self) -> int:
+        """Number of open connections (idle and checked out)"""
+        return self._size
+    
+    @property
+    def idle_count(self) -> int:
+        """Number of idle connections"""
+        return len(self._idle)
+    
+    def fill(self):
+        """Open connections until the pool holds min_size of them"""
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self._min_size:
+                    return
+                self._size += 1
+            
+            try:
+                connection = self._factory()
+            except Exception:
+                self._forget()
+                raise
+            
+            with self._condition:
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+    
+    def acquire(self) -> Any:
+        """
+        Borrow a connection from the pool
+        
+        Returns:
+            Healthy database connection
+        Raises:
+            PoolTimeoutError: If no connection is free within the timeout
+        """
+        deadline = time.monotonic() + self._timeout
+        
+        while True:
+            connection = None
+            
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Connection pool is closed")
+                    
+                    self._evict_idle()
+                    
+                    if self._idle:
+                        connection, _ = self._idle.pop()
+                        break
+                    
+                    if self._size < self._max_size:
+                        self._size += 1
+                        break
+                    
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No database connection available after {self._timeout} seconds"
+                        )
+                    self._condition.wait(remaining)
+            
+            if connection is None:
+                try:
+                    return self._factory()
+                except Exception:
+                    self._forget()
+                    raise
+            
+            if self._is_healthy(connection):
+                return connection
+            
+            # Stale connection: drop it and try again
+            self._close_connection(connection)
+            self._forget()
+    
+    def release(self, connection: Any):
+        """
+        Return a borrowed connection to the pool
+        
+        Args:
+            connection: Connection previously returned by acquire()
+        """
+        try:
+            # Never hand out a connection with a half-finished transaction
+            if getattr(connection, 'in_transaction', False):
+                connection.rollback()
+        except Exception:
+            self.discard(connection)
+            return
+        
+        with self._condition:
+            if self._closed:
+                close = True
+            else:
+                close = False
+                self._idle.append((connection, time.monotonic()))
+                self._condition.notify()
+        
+        if close:
+            self._close_connection(connection)
+            self._forget()
+    
+    def discard(self, connection: Any):
+        """
+        Close a borrowed connection instead of returning it to the pool
+        
+        Args:
+            connection: Connection previously returned by acquire()
+        """
+        self._close_connection(connection)
+        self._forget()
+    
+    def close_all(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        
+        for connection, _ in idle:
+            self._close_connection(connection)
+    
+    def _evict_idle(self):
+        """Close connections idle for longer than idle_timeout (caller holds the lock)"""
+        if self._idle_timeout is None:
+            return
+        
+        cutoff = time.monotonic() - self._idle_timeout
+        # Oldest connections sit on the left
+        while self._idle and self._size > self._min_size and self._idle[0][1] < cutoff:
+            connection, _ = self._idle.popleft()
+            self._size -= 1
+            self._close_connection(connection)
+    
+    def _forget(self):
+        """Account for a connection that no longer exists"""
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+    
+    def _is_healthy(self, connection: Any) -> bool:
+        """Run the health check, treating any error as unhealthy"""
+        if self._health_check is None:
+            return True
+        try:
+            return bool(self._health_check(connection))
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _close_connection(connection: Any):
+        """Close a connection, ignoring errors from already-dead connections"""
+        try:
+            connection.close()
+        except Exception:
+            pass
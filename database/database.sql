@@ -34,12 +34,14 @@ CREATE TABLE areas (
 CREATE TABLE violations (
     violation_id INT PRIMARY KEY AUTO_INCREMENT,
     vehicle_number VARCHAR(20) NOT NULL,
+    plate_key VARCHAR(20) NOT NULL DEFAULT '',
     user_id INT,
     type_id INT NOT NULL,
     area_id INT NOT NULL,
     officer_id INT NOT NULL,
     violation_date DATETIME NOT NULL,
     fine_amount DECIMAL(10, 2) NOT NULL,
+    late_fee DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
     status ENUM('unpaid', 'paid', 'disputed') DEFAULT 'unpaid',
     notes TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -61,12 +63,111 @@ CREATE TABLE payments (
     FOREIGN KEY (violation_id) REFERENCES violations(violation_id) ON DELETE CASCADE
 );
 
+-- Table: Daily Violation Rollups
+-- One row per day/area/type/officer/status, maintained by RollupManager
+CREATE TABLE violation_daily_rollups (
+    rollup_date DATE NOT NULL,
+    area_id INT NOT NULL,
+    type_id INT NOT NULL,
+    officer_id INT NOT NULL,
+    status ENUM('unpaid', 'paid', 'disputed') NOT NULL,
+    violation_count INT NOT NULL DEFAULT 0,
+    total_fines DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (rollup_date, area_id, type_id, officer_id, status)
+);
+
+-- Table: User Balances
+-- One row per citizen with violation counts and fine totals, maintained by BalanceManager
+CREATE TABLE user_balances (
+    user_id INT PRIMARY KEY,
+    violation_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    paid_count INT NOT NULL DEFAULT 0,
+    paid_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    unpaid_count INT NOT NULL DEFAULT 0,
+    unpaid_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    disputed_count INT NOT NULL DEFAULT 0,
+    disputed_amount DECIMAL(12, 2) NOT NULL DEFAULT 0
+);
+
+-- Table: Violation Totals
+-- Single row (totals_id = 1) of counts and fine totals over all violations, maintained by BalanceManager
+CREATE TABLE violation_totals (
+    totals_id INT PRIMARY KEY,
+    violation_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    paid_count INT NOT NULL DEFAULT 0,
+    paid_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    unpaid_count INT NOT NULL DEFAULT 0,
+    unpaid_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    disputed_count INT NOT NULL DEFAULT 0,
+    disputed_amount DECIMAL(14, 2) NOT NULL DEFAULT 0
+);
+
+-- Table: Search Trigrams
+-- Trigram index behind vehicle number and user search (see SearchIndexManager)
+CREATE TABLE plate_trigrams (
+    trigram CHAR(3) NOT NULL,
+    vehicle_number VARCHAR(20) NOT NULL,
+    PRIMARY KEY (trigram, vehicle_number)
+);
+
+CREATE TABLE user_trigrams (
+    trigram CHAR(3) NOT NULL,
+    user_id INT NOT NULL,
+    PRIMARY KEY (trigram, user_id)
+);
+
+-- Table: Plate Variants
+-- OCR-folded plate keys and their one-character deletions (see PlateMatchManager)
+CREATE TABLE plate_variants (
+    variant VARCHAR(20) NOT NULL,
+    plate_key VARCHAR(20) NOT NULL,
+    PRIMARY KEY (variant, plate_key)
+);
+
+-- Table: Idempotency Keys
+-- Responses of POSTs sent with an Idempotency-Key header, replayed on retries
+CREATE TABLE idempotency_keys (
+    scope VARCHAR(150) NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    response_status INT,
+    response_body MEDIUMTEXT,
+    created_at DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL,
+    claimed_at DATETIME,
+    claim_token CHAR(32),
+    PRIMARY KEY (scope, idempotency_key)
+);
+
+-- Table: Schema Migrations
+-- Versions from database/migrations already applied to this database
+CREATE TABLE schema_migrations (
+    version VARCHAR(100) PRIMARY KEY,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Indexes for performance
 CREATE INDEX idx_vehicle_number ON violations(vehicle_number);
 CREATE INDEX idx_violation_date ON violations(violation_date);
 CREATE INDEX idx_status ON violations(status);
 CREATE INDEX idx_user_violations ON violations(user_id);
 
+-- Composite indexes (migrations 001-006)
+CREATE INDEX idx_status_date ON violations(status, violation_date);
+CREATE INDEX idx_user_date ON violations(user_id, violation_date);
+CREATE INDEX idx_vehicle_date ON violations(vehicle_number, violation_date);
+CREATE INDEX idx_plate_key_date ON violations(plate_key, violation_date);
+CREATE INDEX idx_officer_date ON violations(officer_id, violation_date);
+CREATE INDEX idx_area_date ON violations(area_id, violation_date);
+CREATE INDEX idx_type_date ON violations(type_id, violation_date);
+CREATE INDEX idx_payment_violation ON payments(violation_id);
+CREATE INDEX idx_payment_date ON payments(payment_date);
+CREATE UNIQUE INDEX idx_payment_transaction ON payments(transaction_id);
+CREATE INDEX idx_idempotency_expires ON idempotency_keys(expires_at);
+CREATE INDEX idx_user_trigrams_user ON user_trigrams(user_id);
+
 -- Sample Data Insertion
 
 -- Insert sample users
@@ -102,15 +203,15 @@ INSERT INTO areas (area_name, city) VALUES
 ('MI Road', 'Jaipur');
 
 -- Insert sample violations
-INSERT INTO violations (vehicle_number, user_id, type_id, area_id, officer_id, violation_date, fine_amount, status) VALUES
-('KA01AB1234', 4, 1, 1, 2, '2024-12-15 10:30:00', 500.00, 'paid'),
-('DL02CD5678', 5, 2, 2, 2, '2024-12-20 14:45:00', 1000.00, 'unpaid'),
-('MH03EF9012', 4, 3, 3, 3, '2025-01-05 09:15:00', 300.00, 'paid'),
-('TN04GH3456', 5, 7, 4, 2, '2025-01-08 16:20:00', 750.00, 'unpaid'),
-('KA01AB1234', 4, 6, 1, 3, '2025-01-10 11:00:00', 500.00, 'unpaid'),
-('WB05IJ7890', 4, 4, 5, 2, '2025-01-12 13:30:00', 200.00, 'paid'),
-('TS06KL2345', 5, 8, 6, 3, '2025-01-13 17:45:00', 1500.00, 'unpaid'),
-('GJ07MN6789', 4, 1, 7, 2, '2025-01-14 08:00:00', 500.00, 'paid');
+INSERT INTO violations (vehicle_number, plate_key, user_id, type_id, area_id, officer_id, violation_date, fine_amount, status) VALUES
+('KA01AB1234', 'KA01AB1234', 4, 1, 1, 2, '2024-12-15 10:30:00', 500.00, 'paid'),
+('DL02CD5678', 'DL02CD5678', 5, 2, 2, 2, '2024-12-20 14:45:00', 1000.00, 'unpaid'),
+('MH03EF9012', 'MH03EF9012', 4, 3, 3, 3, '2025-01-05 09:15:00', 300.00, 'paid'),
+('TN04GH3456', 'TN04GH3456', 5, 7, 4, 2, '2025-01-08 16:20:00', 750.00, 'unpaid'),
+('KA01AB1234', 'KA01AB1234', 4, 6, 1, 3, '2025-01-10 11:00:00', 500.00, 'unpaid'),
+('WB05IJ7890', 'WB05IJ7890', 4, 4, 5, 2, '2025-01-12 13:30:00', 200.00, 'paid'),
+('TS06KL2345', 'TS06KL2345', 5, 8, 6, 3, '2025-01-13 17:45:00', 1500.00, 'unpaid'),
+('GJ07MN6789', 'GJ07MN6789', 4, 1, 7, 2, '2025-01-14 08:00:00', 500.00, 'paid');
 
 -- Insert sample payments
 INSERT INTO payments (violation_id, payment_date, amount_paid, payment_method, transaction_id) VALUES
@@ -119,6 +220,55 @@ INSERT INTO payments (violation_id, payment_date, amount_paid, payment_method, t
 (6, '2025-01-13 09:15:00', 200.00, 'cash', 'CASH001'),
 (8, '2025-01-15 11:45:00', 500.00, 'online', 'TXN001234569');
 
+-- Build rollups for the sample violations
+INSERT INTO violation_daily_rollups
+(rollup_date, area_id, type_id, officer_id, status, violation_count, total_fines)
+SELECT DATE(violation_date), area_id, type_id, officer_id, status, COUNT(*), SUM(fine_amount)
+FROM violations
+GROUP BY DATE(violation_date), area_id, type_id, officer_id, status;
+
+-- Build balances for the sample violations
+INSERT INTO user_balances
+(user_id, violation_count, total_amount, paid_count, paid_amount,
+ unpaid_count, unpaid_amount, disputed_count, disputed_amount)
+SELECT user_id, COUNT(*), SUM(fine_amount),
+    SUM(CASE WHEN status = 'paid' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END),
+    SUM(CASE WHEN status = 'unpaid' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END),
+    SUM(CASE WHEN status = 'disputed' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'disputed' THEN fine_amount ELSE 0 END)
+FROM violations
+WHERE user_id IS NOT NULL
+GROUP BY user_id;
+
+-- Build the totals row for the sample violations
+INSERT INTO violation_totals
+(totals_id, violation_count, total_amount, paid_count, paid_amount,
+ unpaid_count, unpaid_amount, disputed_count, disputed_amount)
+SELECT 1, COUNT(*), COALESCE(SUM(fine_amount), 0),
+    COALESCE(SUM(CASE WHEN status = 'paid' THEN 1 ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN status = 'unpaid' THEN 1 ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN status = 'disputed' THEN 1 ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN status = 'disputed' THEN fine_amount ELSE 0 END), 0)
+FROM violations;
+
+-- This schema already includes every migration up to:
+INSERT INTO schema_migrations (version) VALUES
+('001_composite_indexes'),
+('002_unique_transaction_id'),
+('003_idempotency_keys'),
+('004_violation_late_fee'),
+('005_search_trigrams'),
+('006_plate_key'),
+('007_user_balances'),
+('008_violation_totals'),
+('009_violation_daily_rollups'),
+('010_idempotency_claimed_at'),
+('011_idempotency_claim_token');
+
 -- Useful Queries
 
 -- 1. Get all unpaid violations with details
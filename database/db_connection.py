@@ -6,18 +6,26 @@ Handles database connectivity using MySQL/SQLite
 import mysql.connector
 from mysql.connector import Error
 import sqlite3
-from typing import Optional, Any, List, Tuple
+import threading
+from contextlib import contextmanager
+from typing import Optional, Any, Callable, Iterator, List, Tuple
 import os
 
+from config import EXPORT_CONFIG, POOL_CONFIG
+from .connection_pool import ConnectionPool
+from .dialect import SQLDialect
+
 
 class DatabaseConnection:
     """
     Singleton database connection class
     Supports both MySQL and SQLite databases
+    Connections come from a bounded pool; each thread checks out its own
+    connection for the duration of a call
     """
     
     _instance = None
-    _connection = None
+    _pool = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -27,6 +35,7 @@ class DatabaseConnection:
     def __init__(self):
         """Initialize database configuration"""
         self.db_type = os.getenv('DB_TYPE', 'sqlite')  # 'mysql' or 'sqlite'
+        self.dialect = SQLDialect(self.db_type)
         self.config = {
             'mysql': {
                 'host': os.getenv('DB_HOST', 'localhost'),
@@ -38,44 +47,183 @@ class DatabaseConnection:
                 'database': os.getenv('SQLITE_DB', 'traffic_violations.db')
             }
         }
+        
+        # __init__ runs on every DatabaseConnection() call; keep per-thread state
+        if not hasattr(self, '_local'):
+            self._local = threading.local()
+            self._pool_lock = threading.Lock()
+    
+    def _open_connection(self):
+        """
+        Open a new raw database connection
+        Returns: Database connection object
+        """
+        if self.db_type == 'mysql':
+            return mysql.connector.connect(
+                host=self.config['mysql']['host'],
+                user=self.config['mysql']['user'],
+                password=self.config['mysql']['password'],
+                database=self.config['mysql']['database']
+            )
+        
+        # SQLite: each pooled connection is only ever used by one thread at a time
+        connection = sqlite3.connect(
+            self.config['sqlite']['database'],
+            check_same_thread=False
+        )
+        connection.row_factory = sqlite3.Row
+        return connection
+    
+    def _is_healthy(self, connection) -> bool:
+        """
+        Check that a pooled connection is still usable
+        Returns: True if the connection can run queries
+        """
+        if self.db_type == 'mysql':
+            return connection.is_connected()
+        connection.execute("SELECT 1")
+        return True
+    
+    def _get_pool(self) -> ConnectionPool:
+        """Create the connection pool on first use"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    DatabaseConnection._pool = ConnectionPool(
+                        self._open_connection,
+                        min_size=POOL_CONFIG['min_size'],
+                        max_size=POOL_CONFIG['max_size'],
+                        timeout=POOL_CONFIG['timeout'],
+                        idle_timeout=POOL_CONFIG['idle_timeout'],
+                        health_check=self._is_healthy
+                    )
+        return self._pool
     
     def connect(self) -> bool:
         """
-        Establish database connection
+        Establish database connection pool
         Returns: True if successful, False otherwise
         """
         try:
-            if self.db_type == 'mysql':
-                self._connection = mysql.connector.connect(
-                    host=self.config['mysql']['host'],
-                    user=self.config['mysql']['user'],
-                    password=self.config['mysql']['password'],
-                    database=self.config['mysql']['database']
-                )
-            else:  # SQLite
-                self._connection = sqlite3.connect(
-                    self.config['sqlite']['database'],
-                    check_same_thread=False
-                )
-                self._connection.row_factory = sqlite3.Row
-            
+            self._get_pool().fill()
             print(f"Successfully connected to {self.db_type} database")
             return True
-            
-        except Error as e:
+        
+        except (Error, sqlite3.Error) as e:
             print(f"Error connecting to database: {e}")
             return False
     
+    @contextmanager
+    def _checkout(self):
+        """
+        Check out a pooled connection for the current thread
+        Nested checkouts on the same thread reuse the same connection
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            yield connection
+            return
+        
+        pool = self._get_pool()
+        connection = pool.acquire()
+        self._local.connection = connection
+        try:
+            yield connection
+        finally:
+            self._local.connection = None
+            pool.release(connection)
+    
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """
+        Run several statements as one transaction on one pooled connection
+        Every query method called on this thread inside the block uses the
+        same connection and leaves committing to the block: it commits when
+        the block exits normally and rolls back if it raises. Nested blocks
+        join the outer transaction.
+        Args:
+            immediate: On SQLite, take the write lock up front (BEGIN IMMEDIATE)
+                       so a read-then-write can't race another writer. On
+                       MySQL lock rows with dialect.for_update() instead.
+        Yields: Database connection
+        """
+        if getattr(self._local, 'in_transaction', False):
+            yield self._local.connection
+            return
+        
+        with self._checkout() as connection:
+            if self.db_type == 'mysql':
+                connection.start_transaction()
+            else:
+                connection.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            
+            self._local.in_transaction = True
+            self._local.on_commit = []
+            try:
+                yield connection
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+            finally:
+                self._local.in_transaction = False
+                callbacks, self._local.on_commit = self._local.on_commit, []
+            
+            for callback in callbacks:
+                self._run_callback(callback)
+    
+    def on_commit(self, callback: Callable[[], None]):
+        """
+        Run a callback once the current transaction commits (immediately if
+        none is open); dropped if the transaction rolls back. A callback that
+        raises is logged and skipped: the data is already committed, so it
+        must not turn the caller's success into a failure (and a retry into
+        a duplicate write)
+        Args:
+            callback: Function taking no arguments
+        """
+        if getattr(self._local, 'in_transaction', False):
+            self._local.on_commit.append(callback)
+        else:
+            self._run_callback(callback)
+    
+    @staticmethod
+    def _run_callback(callback: Callable[[], None]):
+        """Run an on_commit callback, logging instead of raising its errors"""
+        try:
+            callback()
+        except Exception as e:
+            print(f"Error in on_commit callback {getattr(callback, '__name__', callback)}: {e}")
+    
+    def _commit(self, connection):
+        """Commit a single statement unless it belongs to an open transaction()"""
+        if not getattr(self._local, 'in_transaction', False):
+            connection.commit()
+    
+    def _cursor(self, connection, dictionary: bool = False):
+        """Open a cursor, returning rows as dicts on MySQL when requested"""
+        if dictionary and self.db_type == 'mysql':
+            return connection.cursor(dictionary=True)
+        return connection.cursor()
+    
     def get_connection(self):
         """
-        Get active database connection
+        Get a database connection pinned to the current thread
+        The connection stays checked out until release_connection() is called
         Returns: Database connection object
         """
-        if self._connection is None or (
-            self.db_type == 'mysql' and not self._connection.is_connected()
-        ):
-            self.connect()
-        return self._connection
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._get_pool().acquire()
+            self._local.connection = connection
+        return connection
+    
+    def release_connection(self):
+        """Return the connection pinned by get_connection() to the pool"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            self._local.connection = None
+            self._get_pool().release(connection)
     
     def execute_query(self, query: str, params: Optional[Tuple] = None) -> bool:
         """
@@ -86,22 +234,111 @@ class DatabaseConnection:
         Returns: True if successful, False otherwise
         """
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            connection.commit()
-            cursor.close()
-            return True
-            
+            with self._checkout() as connection:
+                cursor = connection.cursor()
+                
+                if params:
+                    cursor.execute(self.dialect.placeholders(query), params)
+                else:
+                    cursor.execute(query)
+                
+                # Remember the insert ID per thread; pooled connections are shared
+                self._local.last_insert_id = cursor.lastrowid
+                
+                self._commit(connection)
+                cursor.close()
+                return True
+        
         except Error as e:
             print(f"Error executing query: {e}")
             return False
     
+    def execute_update(self, query: str, params: Optional[Tuple] = None) -> Optional[int]:
+        """
+        Execute an UPDATE or DELETE and report how many rows it changed
+        Args:
+            query: SQL query string
+            params: Query parameters (tuple)
+        Returns: Number of affected rows, or None on failure
+        """
+        try:
+            with self._checkout() as connection:
+                cursor = connection.cursor()
+                
+                if params:
+                    cursor.execute(self.dialect.placeholders(query), params)
+                else:
+                    cursor.execute(query)
+                
+                rowcount = cursor.rowcount
+                self._commit(connection)
+                cursor.close()
+                return rowcount
+        
+        except Error as e:
+            print(f"Error executing update: {e}")
+            return None
+    
+    def insert_returning_id(self, query: str, params: Optional[Tuple] = None) -> Optional[int]:
+        """
+        Execute an INSERT and return the generated ID in one round trip
+        Args:
+            query: SQL INSERT query string
+            params: Query parameters (tuple)
+        Returns: ID of the inserted row, or None on failure
+        """
+        try:
+            with self._checkout() as connection:
+                cursor = connection.cursor()
+                
+                if params:
+                    cursor.execute(self.dialect.placeholders(query), params)
+                else:
+                    cursor.execute(query)
+                
+                # lastrowid is bound to this cursor, so concurrent inserts can't leak in
+                insert_id = cursor.lastrowid
+                self._local.last_insert_id = insert_id
+                
+                self._commit(connection)
+                cursor.close()
+                return insert_id
+        
+        except Error as e:
+            print(f"Error executing insert: {e}")
+            return None
+    
+    def execute_many(self, query: str, params_list: List[Tuple]) -> bool:
+        """
+        Execute one statement for many parameter sets in a single transaction
+        Args:
+            query: SQL query string
+            params_list: List of query parameter tuples
+        Returns: True if every row was written, False otherwise (nothing is
+                 written, unless inside transaction() where the caller rolls back)
+        """
+        if not params_list:
+            return True
+        
+        try:
+            with self._checkout() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.executemany(self.dialect.placeholders(query), params_list)
+                    self._commit(connection)
+                except Exception:
+                    # Inside transaction() the block owner decides whether to roll back
+                    if not getattr(self._local, 'in_transaction', False):
+                        connection.rollback()
+                    raise
+                finally:
+                    cursor.close()
+                return True
+        
+        except (Error, sqlite3.Error) as e:
+            print(f"Error executing batch: {e}")
+            return False
+    
     def fetch_one(self, query: str, params: Optional[Tuple] = None) -> Optional[Any]:
         """
         Fetch single row from database
@@ -111,23 +348,23 @@ class DatabaseConnection:
         Returns: Single row result or None
         """
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True) if self.db_type == 'mysql' else connection.cursor()
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            result = cursor.fetchone()
-            cursor.close()
+            with self._checkout() as connection:
+                cursor = self._cursor(connection, dictionary=True)
+                
+                if params:
+                    cursor.execute(self.dialect.placeholders(query), params)
+                else:
+                    cursor.execute(query)
+                
+                result = cursor.fetchone()
+                cursor.close()
             
             # Convert sqlite3.Row to dict
             if self.db_type == 'sqlite' and result:
                 result = dict(result)
             
             return result
-            
+        
         except Error as e:
             print(f"Error fetching data: {e}")
             return None
@@ -141,57 +378,116 @@ class DatabaseConnection:
         Returns: List of rows or empty list
         """
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True) if self.db_type == 'mysql' else connection.cursor()
-            
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            results = cursor.fetchall()
-            cursor.close()
+            with self._checkout() as connection:
+                cursor = self._cursor(connection, dictionary=True)
+                
+                if params:
+                    cursor.execute(self.dialect.placeholders(query), params)
+                else:
+                    cursor.execute(query)
+                
+                results = cursor.fetchall()
+                cursor.close()
             
             # Convert sqlite3.Row to dict
             if self.db_type == 'sqlite':
                 results = [dict(row) for row in results]
             
             return results
-            
+        
         except Error as e:
             print(f"Error fetching data: {e}")
             return []
     
+    def fetch_iter(self, query: str, params: Optional[Tuple] = None,
+                   batch_size: Optional[int] = None) -> Iterator[dict]:
+        """
+        Stream rows from database without loading the whole result
+        Rows are read batch_size at a time (unbuffered cursor on MySQL, so the
+        server streams the result). The generator holds its own pooled
+        connection until it is exhausted or closed; inside transaction() it
+        reads on the transaction's connection instead (buffered on MySQL, so
+        the block can run other statements while it iterates).
+        Args:
+            query: SQL SELECT query
+            params: Query parameters (tuple)
+            batch_size: Rows fetched per round trip
+        Returns: Iterator of row dictionaries
+        Raises: The database error if the query fails, so a broken stream is
+                never mistaken for the end of the data
+        """
+        batch_size = batch_size or EXPORT_CONFIG['batch_size']
+        in_transaction = getattr(self._local, 'in_transaction', False)
+        pool = None
+        if in_transaction:
+            connection = self._local.connection
+        else:
+            pool = self._get_pool()
+            connection = pool.acquire()
+        cursor = None
+        try:
+            if self.db_type == 'mysql':
+                cursor = connection.cursor(dictionary=True, buffered=in_transaction)
+            else:
+                cursor = connection.cursor()
+            
+            if params:
+                cursor.execute(self.dialect.placeholders(query), params)
+            else:
+                cursor.execute(query)
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row) if self.db_type == 'sqlite' else row
+        
+        except (Error, sqlite3.Error) as e:
+            print(f"Error streaming data: {e}")
+            raise
+        
+        finally:
+            # An unbuffered MySQL result must be drained before the connection is reused
+            if self.db_type == 'mysql' and getattr(connection, 'unread_result', False):
+                connection.consume_results()
+            if cursor is not None:
+                cursor.close()
+            if pool is not None:
+                pool.release(connection)
+    
     def get_last_insert_id(self) -> Optional[int]:
         """
-        Get the ID of the last inserted row
+        Get the ID of the last row inserted by the current thread
         Returns: Last insert ID or None
         """
+        last_insert_id = getattr(self._local, 'last_insert_id', None)
+        if last_insert_id:
+            return last_insert_id
+        
         try:
-            connection = self.get_connection()
-            cursor = connection.cursor()
-            
-            if self.db_type == 'mysql':
-                cursor.execute("SELECT LAST_INSERT_ID()")
-                result = cursor.fetchone()
-                return result[0] if result else None
-            else:  # SQLite
-                cursor.execute("SELECT last_insert_rowid()")
+            with self._checkout() as connection:
+                cursor = connection.cursor()
+                
+                if self.db_type == 'mysql':
+                    cursor.execute("SELECT LAST_INSERT_ID()")
+                else:  # SQLite
+                    cursor.execute("SELECT last_insert_rowid()")
+                
                 result = cursor.fetchone()
+                cursor.close()
                 return result[0] if result else None
-                
+        
         except Error as e:
             print(f"Error getting last insert ID: {e}")
             return None
     
     def close(self):
-        """Close database connection"""
-        if self._connection:
-            if self.db_type == 'mysql':
-                if self._connection.is_connected():
-                    self._connection.close()
-            else:
-                self._connection.close()
+        """Close all pooled database connections"""
+        if self._pool is not None:
+            self.release_connection()
+            self._pool.close_all()
+            DatabaseConnection._pool = None
             print("Database connection closed")
     
     def __del__(self):
@@ -202,4 +498,4 @@ class DatabaseConnection:
 # Utility function for easy access
 def get_db():
     """Get database connection instance"""
-    return DatabaseConnection()
\ No newline at end of file
+    return DatabaseConnection()
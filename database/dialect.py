@@ -0,0 +1,109 @@
+"""
+SQL Dialect Module
+Backend-specific SQL fragments for MySQL and SQLite
+"""
+
+import calendar
+from datetime import datetime, timedelta
+
+
+class SQLDialect:
+    """
+    SQL fragments that differ between MySQL and SQLite
+    Date windows are computed in Python and passed as parameters, so the
+    date column is compared directly and its index can be used
+    """
+    
+    BUCKETS = {
+        'mysql': {
+            'hour': "HOUR({column})",
+            'day': "DATE({column})",
+            'month': "DATE_FORMAT({column}, '%Y-%m')"
+        },
+        'sqlite': {
+            'hour': "CAST(strftime('%H', {column}) AS INTEGER)",
+            'day': "DATE({column})",
+            'month': "strftime('%Y-%m', {column})"
+        }
+    }
+    
+    def __init__(self, db_type: str):
+        """
+        Initialize dialect
+        
+        Args:
+            db_type: 'mysql' or 'sqlite'
+        """
+        if db_type not in self.BUCKETS:
+            raise ValueError(f"Unsupported database type: {db_type}")
+        self.db_type = db_type
+    
+    def bucket(self, column: str, unit: str) -> str:
+        """
+        Get an expression grouping a datetime column into hour, day or month buckets
+        
+        Args:
+            column: Column name (e.g. 'v.violation_date')
+            unit: 'hour' (0-23), 'day' (YYYY-MM-DD) or 'month' (YYYY-MM)
+        Returns:
+            SQL expression
+        """
+        return self.BUCKETS[self.db_type][unit].format(column=column)
+    
+    def placeholders(self, query: str) -> str:
+        """
+        Rewrite %s parameter markers into the backend's parameter style
+        
+        Args:
+            query: SQL query with %s placeholders
+        Returns:
+            SQL query for this backend
+        """
+        return query if self.db_type == 'mysql' else query.replace('%s', '?')
+    
+    def insert_ignore(self) -> str:
+        """
+        Get the INSERT variant that skips rows violating a unique key
+        
+        Returns:
+            'INSERT IGNORE' on MySQL, 'INSERT OR IGNORE' on SQLite
+        """
+        return 'INSERT IGNORE' if self.db_type == 'mysql' else 'INSERT OR IGNORE'
+    
+    def for_update(self) -> str:
+        """
+        Get the row-locking suffix for a SELECT inside DatabaseConnection.transaction()
+        SQLite has no row locks; use transaction(immediate=True) there instead
+        
+        Returns:
+            ' FOR UPDATE' on MySQL, '' on SQLite
+        """
+        return ' FOR UPDATE' if self.db_type == 'mysql' else ''
+    
+    @staticmethod
+    def days_ago(days: int) -> str:
+        """
+        Get the date a number of days before today
+        
+        Args:
+            days: Number of days to go back
+        Returns:
+            Date string (YYYY-MM-DD)
+        """
+        return (datetime.now().date() - timedelta(days=days)).isoformat()
+    
+    @staticmethod
+    def months_ago(months: int) -> str:
+        """
+        Get the date a number of calendar months before today
+        
+        Args:
+            months: Number of months to go back
+        Returns:
+            Date string (YYYY-MM-DD), clamped to the end of shorter months
+        """
+        today = datetime.now().date()
+        month_index = today.year * 12 + today.month - 1 - months
+        year, month = divmod(month_index, 12)
+        day = min(today.day, calendar.monthrange(year, month + 1)[1])
+        return today.replace(year=year, month=month + 1, day=day).isoformat()
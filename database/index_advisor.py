@@ -0,0 +1,234 @@
+"""
+Index Advisor Module
+Runs every read query issued by the managers and the analytics engine through
+EXPLAIN and reports full table scans
+Usage: python -m database.index_advisor [--allow TABLE ...]
+"""
+
+import argparse
+import inspect
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from .db_connection import get_db
+
+
+# Small tables where a scan is cheaper than an index lookup
+DEFAULT_ALLOWED_TABLES = {'areas', 'violation_types', 'violation_daily_rollups'}
+
+# Methods with these prefixes only read; anything else is never called
+READ_PREFIXES = ('get_', 'search_', 'calculate_', 'summarize_', 'generate_')
+
+# Values for required arguments, matched by parameter name
+SAMPLE_ARGS = {
+    'violation_id': 1,
+    'payment_id': 1,
+    'user_id': 1,
+    'type_id': 1,
+    'vehicle_number': 'KA01AB1234',
+    'search_term': 'KA01',
+    'username': 'admin',
+    'email': 'admin@example.com',
+    'payment_method': 'cash',
+    'transaction_id': 'TXN001234567',
+    'name': 'areas',
+    'start_date': datetime.now() - timedelta(days=30),
+    'end_date': datetime.now()
+}
+
+# Extra calls covering filter and sort variants of dynamic queries
+EXTRA_CALLS = [
+    ('ViolationManager', 'get_all_violations', {'filters': {'status': 'unpaid'}}),
+    ('ViolationManager', 'get_all_violations', {'filters': {'user_id': 1}}),
+    ('ViolationManager', 'get_all_violations', {'filters': {'area_id': 1}}),
+    ('ViolationManager', 'get_all_violations', {'sort': 'fine_desc'}),
+    ('ViolationManager', 'summarize_violations', {'filters': {'status': 'unpaid'}})
+]
+
+TABLE_ALIAS_RE = re.compile(r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+
+
+def _sources():
+    """Instantiate every class whose queries are checked"""
+    from managers.violation_manager import ViolationManager
+    from managers.payment_manager import PaymentManager
+    from managers.user_manager import UserManager
+    from models.analytics import AnalyticsEngine
+    
+    return [ViolationManager(), PaymentManager(), UserManager(), AnalyticsEngine()]
+
+
+def _call_kwargs(method) -> Optional[Dict]:
+    """
+    Build keyword arguments for a read method from SAMPLE_ARGS
+    
+    Returns:
+        Keyword arguments, or None if a required argument has no sample value
+    """
+    kwargs = {}
+    for param in inspect.signature(method).parameters.values():
+        if param.default is not inspect.Parameter.empty:
+            continue
+        if param.name not in SAMPLE_ARGS:
+            return None
+        kwargs[param.name] = SAMPLE_ARGS[param.name]
+    return kwargs
+
+
+def capture_queries() -> List[Dict]:
+    """
+    Call every read method and record the queries it runs
+    
+    Returns:
+        List of dictionaries with source, query and params (deduplicated by query)
+    """
+    db = get_db()
+    captured = []
+    seen = set()
+    current = {'source': None}
+    
+    def recorder(original):
+        def record(query, params=None):
+            if query not in seen:
+                seen.add(query)
+                captured.append({'source': current['source'], 'query': query, 'params': params})
+            return original(query, params)
+        return record
+    
+    originals = {name: getattr(db, name) for name in ('fetch_one', 'fetch_all')}
+    for name, original in originals.items():
+        setattr(db, name, recorder(original))
+    
+    try:
+        from models.analytics import invalidate_analytics_cache
+        sources = _sources()
+        calls = []
+        for source in sources:
+            for name, method in inspect.getmembers(source, inspect.ismethod):
+                if name.startswith(READ_PREFIXES):
+                    calls.append((source, name, _call_kwargs(method)))
+        for class_name, name, kwargs in EXTRA_CALLS:
+            for source in sources:
+                if type(source).__name__ == class_name:
+                    calls.append((source, name, kwargs))
+        
+        for source, name, kwargs in calls:
+            current['source'] = f"{type(source).__name__}.{name}"
+            if kwargs is None:
+                print(f"Skipped {current['source']}: no sample value for a required argument")
+                continue
+            # Empty the caches so every call reaches the database
+            invalidate_analytics_cache()
+            if hasattr(source, 'invalidate_reference_data'):
+                source.invalidate_reference_data()
+            try:
+                getattr(source, name)(**kwargs)
+            except Exception as e:
+                print(f"Error calling {current['source']}: {e}")
+    finally:
+        for name in originals:
+            delattr(db, name)
+    
+    return captured
+
+
+def explain(query: str, params=None) -> List[Dict]:
+    """
+    Get the plan of a query as a list of steps
+    
+    Args:
+        query: SQL query with %s placeholders
+        params: Query parameters
+    Returns:
+        List of dictionaries with table, full_scan and detail
+    """
+    db = get_db()
+    aliases = {}
+    for table, alias in TABLE_ALIAS_RE.findall(query):
+        aliases[table] = table
+        if alias and alias.upper() not in ('WHERE', 'JOIN', 'ON', 'GROUP', 'ORDER', 'LIMIT',
+                                           'LEFT', 'INNER', 'HAVING'):
+            aliases[alias] = table
+    
+    prefix = 'EXPLAIN ' if db.db_type == 'mysql' else 'EXPLAIN QUERY PLAN '
+    with db._checkout() as connection:
+        cursor = db._cursor(connection, dictionary=True)
+        cursor.execute(prefix + db.dialect.placeholders(query), params or ())
+        rows = cursor.fetchall()
+        cursor.close()
+    
+    steps = []
+    for row in rows:
+        if db.db_type == 'mysql':
+            table = aliases.get(row['table'], row['table'])
+            steps.append({
+                'table': table,
+                'full_scan': row['type'] == 'ALL',
+                'detail': f"type={row['type']} key={row['key']} rows={row['rows']}"
+            })
+        else:
+            detail = row[3]
+            match = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+            table = aliases.get(match.group(1), match.group(1)) if match else None
+            steps.append({
+                'table': table,
+                'full_scan': bool(match) and 'INDEX' not in detail,
+                'detail': detail
+            })
+    return steps
+
+
+def analyze(allowed_tables: Optional[Set[str]] = None) -> List[Dict]:
+    """
+    Explain every captured query and flag full scans
+    
+    Args:
+        allowed_tables: Tables where full scans are acceptable
+    Returns:
+        List of findings with source, query, table and detail
+    """
+    allowed = DEFAULT_ALLOWED_TABLES if allowed_tables is None else allowed_tables
+    findings = []
+    
+    for item in capture_queries():
+        try:
+            steps = explain(item['query'], item['params'])
+        except Exception as e:
+            print(f"Could not explain query from {item['source']}: {e}")
+            continue
+        
+        for step in steps:
+            if step['full_scan'] and step['table'] not in allowed:
+                findings.append({
+                    'source': item['source'],
+                    'query': ' '.join(item['query'].split()),
+                    'table': step['table'],
+                    'detail': step['detail']
+                })
+    
+    return findings
+
+
+def main(argv=None) -> int:
+    """Command line entry point; exits non-zero when full scans are found"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--allow', action='append', default=[],
+                        help='Table where full scans are acceptable (repeatable)')
+    args = parser.parse_args(argv)
+    
+    findings = analyze(DEFAULT_ALLOWED_TABLES | set(args.allow))
+    for finding in findings:
+        print(f"[FULL SCAN] {finding['source']}: {finding['table']} ({finding['detail']})")
+        print(f"    {finding['query'][:200]}")
+    
+    print(f"{len(findings)} full table scan(s) found")
+    return 1 if findings else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Schema Migration Module
+Applies versioned SQL files from database/migrations in order
+A migration is NNN_name.sql, or NNN_name.mysql.sql plus NNN_name.sqlite.sql
+when the SQL differs between backends
+Usage: python -m database.migrate
+"""
+
+import os
+from typing import List
+
+from .db_connection import get_db
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a migration file into individual statements
+    
+    Args:
+        sql: Migration file contents
+    Returns:
+        List of SQL statements without comments
+    """
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def available_migrations() -> List[str]:
+    """
+    Get migration versions found on disk
+    
+    Returns:
+        Sorted list of versions (file names without backend suffix and .sql)
+    """
+    versions = set()
+    for name in os.listdir(MIGRATIONS_DIR):
+        if name.endswith('.sql'):
+            version = name[:-4]
+            for backend in ('.mysql', '.sqlite'):
+                if version.endswith(backend):
+                    version = version[:-len(backend)]
+            versions.add(version)
+    return sorted(versions)
+
+
+def migration_path(version: str, db_type: str) -> str:
+    """
+    Get the file of a migration for a backend
+    
+    Args:
+        version: Migration version
+        db_type: 'mysql' or 'sqlite'
+    Returns:
+        Path of the backend-specific file if there is one, else the shared file
+    """
+    specific = os.path.join(MIGRATIONS_DIR, f"{version}.{db_type}.sql")
+    if os.path.exists(specific):
+        return specific
+    return os.path.join(MIGRATIONS_DIR, f"{version}.sql")
+
+
+def applied_migrations(db) -> List[str]:
+    """
+    Get migration versions already applied, creating the tracking table if needed
+    
+    Args:
+        db: DatabaseConnection
+    Returns:
+        List of applied versions
+    """
+    db.execute_query("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(100) PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    rows = db.fetch_all("SELECT version FROM schema_migrations ORDER BY version")
+    return [row['version'] for row in rows]
+
+
+def apply_migrations(db=None) -> List[str]:
+    """
+    Apply every migration not yet recorded in schema_migrations
+    Stops at the first migration that fails
+    
+    Args:
+        db: DatabaseConnection (defaults to the shared connection)
+    Returns:
+        List of versions applied by this run
+    """
+    db = db or get_db()
+    done = set(applied_migrations(db))
+    applied = []
+    
+    for version in available_migrations():
+        if version in done:
+            continue
+        
+        with open(migration_path(version, db.db_type), encoding='utf-8') as f:
+            statements = split_statements(f.read())
+        
+        for statement in statements:
+            if not db.execute_query(statement):
+                print(f"Migration {version} failed on: {statement}")
+                return applied
+        
+        db.execute_query("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+        applied.append(version)
+        print(f"Applied migration {version}")
+    
+    return applied
+
+
+if __name__ == '__main__':
+    versions = apply_migrations()
+    if not versions:
+        print("Schema is up to date")
@@ -0,0 +1,13 @@
+-- Migration 001: composite indexes for the manager and analytics queries
+-- Date-ordered listings filtered by status, owner, vehicle, officer, area or type
+CREATE INDEX idx_status_date ON violations(status, violation_date);
+CREATE INDEX idx_user_date ON violations(user_id, violation_date);
+CREATE INDEX idx_vehicle_date ON violations(vehicle_number, violation_date);
+CREATE INDEX idx_officer_date ON violations(officer_id, violation_date);
+CREATE INDEX idx_area_date ON violations(area_id, violation_date);
+CREATE INDEX idx_type_date ON violations(type_id, violation_date);
+
+-- Payment lookups by violation, date range and transaction
+CREATE INDEX idx_payment_violation ON payments(violation_id);
+CREATE INDEX idx_payment_date ON payments(payment_date);
+CREATE INDEX idx_payment_transaction ON payments(transaction_id);
@@ -0,0 +1,15 @@
+-- Migration 002: transaction IDs are unique
+-- Blank IDs become NULL; IDs shared by several payments get the payment ID appended
+UPDATE payments SET transaction_id = NULL WHERE transaction_id = '';
+
+UPDATE payments p
+JOIN (
+    SELECT transaction_id FROM payments
+    WHERE transaction_id IS NOT NULL
+    GROUP BY transaction_id
+    HAVING COUNT(*) > 1
+) duplicates ON p.transaction_id = duplicates.transaction_id
+SET p.transaction_id = CONCAT(p.transaction_id, '-', p.payment_id);
+
+DROP INDEX idx_payment_transaction ON payments;
+CREATE UNIQUE INDEX idx_payment_transaction ON payments(transaction_id);
@@ -0,0 +1,15 @@
+-- Migration 002: transaction IDs are unique
+-- Blank IDs become NULL; IDs shared by several payments get the payment ID appended
+UPDATE payments SET transaction_id = NULL WHERE transaction_id = '';
+
+UPDATE payments
+SET transaction_id = transaction_id || '-' || payment_id
+WHERE transaction_id IN (
+    SELECT transaction_id FROM payments
+    WHERE transaction_id IS NOT NULL
+    GROUP BY transaction_id
+    HAVING COUNT(*) > 1
+);
+
+DROP INDEX idx_payment_transaction;
+CREATE UNIQUE INDEX idx_payment_transaction ON payments(transaction_id);
@@ -0,0 +1,13 @@
+-- Migration 003: stored responses for Idempotency-Key replays
+CREATE TABLE idempotency_keys (
+    scope VARCHAR(150) NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    response_status INT,
+    response_body MEDIUMTEXT,
+    created_at DATETIME NOT NULL,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (scope, idempotency_key)
+);
+
+CREATE INDEX idx_idempotency_expires ON idempotency_keys(expires_at);
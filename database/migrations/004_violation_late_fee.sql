@@ -0,0 +1,2 @@
+-- Migration 004: late fee accrued on unpaid violations (see LateFeeManager)
+ALTER TABLE violations ADD COLUMN late_fee DECIMAL(10, 2) NOT NULL DEFAULT 0.00;
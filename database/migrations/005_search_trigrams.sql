@@ -0,0 +1,15 @@
+-- Migration 005: trigram index for vehicle number and user search
+-- Populate it afterwards with: python rebuild_search_index.py
+CREATE TABLE plate_trigrams (
+    trigram CHAR(3) NOT NULL,
+    vehicle_number VARCHAR(20) NOT NULL,
+    PRIMARY KEY (trigram, vehicle_number)
+);
+
+CREATE TABLE user_trigrams (
+    trigram CHAR(3) NOT NULL,
+    user_id INT NOT NULL,
+    PRIMARY KEY (trigram, user_id)
+);
+
+CREATE INDEX idx_user_trigrams_user ON user_trigrams(user_id);
@@ -0,0 +1,13 @@
+-- Migration 006: canonical plate key (uppercase, separators removed) for vehicle lookups
+-- and the plate_variants table behind OCR-tolerant matching.
+-- Fill plate_key (with utils.plates.plate_key, the same normalization new writes use),
+-- plate_variants and the search index afterwards: python rebuild_search_index.py
+ALTER TABLE violations ADD COLUMN plate_key VARCHAR(20) NOT NULL DEFAULT '';
+
+CREATE INDEX idx_plate_key_date ON violations(plate_key, violation_date);
+
+CREATE TABLE plate_variants (
+    variant VARCHAR(20) NOT NULL,
+    plate_key VARCHAR(20) NOT NULL,
+    PRIMARY KEY (variant, plate_key)
+);
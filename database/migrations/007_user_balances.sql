@@ -0,0 +1,30 @@
+-- Migration 007: per-user running fine balances (see BalanceManager)
+-- Check them against the violations table with: python rebuild_balances.py --verify
+CREATE TABLE user_balances (
+    user_id INT PRIMARY KEY,
+    violation_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    paid_count INT NOT NULL DEFAULT 0,
+    paid_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    unpaid_count INT NOT NULL DEFAULT 0,
+    unpaid_amount DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    disputed_count INT NOT NULL DEFAULT 0,
+    disputed_amount DECIMAL(12, 2) NOT NULL DEFAULT 0
+);
+
+INSERT INTO user_balances
+(user_id, violation_count, total_amount, paid_count, paid_amount,
+ unpaid_count, unpaid_amount, disputed_count, disputed_amount)
+SELECT
+    user_id,
+    COUNT(*),
+    SUM(fine_amount),
+    SUM(CASE WHEN status = 'paid' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END),
+    SUM(CASE WHEN status = 'unpaid' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END),
+    SUM(CASE WHEN status = 'disputed' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'disputed' THEN fine_amount ELSE 0 END)
+FROM violations
+WHERE user_id IS NOT NULL
+GROUP BY user_id;
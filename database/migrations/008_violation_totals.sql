@@ -0,0 +1,28 @@
+-- Migration 008: single row of counts and fine totals over all violations (see BalanceManager)
+-- Check it against the violations table with: python rebuild_balances.py --verify
+CREATE TABLE violation_totals (
+    totals_id INT PRIMARY KEY,
+    violation_count INT NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    paid_count INT NOT NULL DEFAULT 0,
+    paid_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    unpaid_count INT NOT NULL DEFAULT 0,
+    unpaid_amount DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    disputed_count INT NOT NULL DEFAULT 0,
+    disputed_amount DECIMAL(14, 2) NOT NULL DEFAULT 0
+);
+
+INSERT INTO violation_totals
+(totals_id, violation_count, total_amount, paid_count, paid_amount,
+ unpaid_count, unpaid_amount, disputed_count, disputed_amount)
+SELECT
+    1,
+    COUNT(*),
+    COALESCE(SUM(fine_amount), 0),
+    COALESCE(SUM(CASE WHEN status = 'paid' THEN 1 ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN status = 'paid' THEN fine_amount ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN status = 'unpaid' THEN 1 ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN status = 'unpaid' THEN fine_amount ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN status = 'disputed' THEN 1 ELSE 0 END), 0),
+    COALESCE(SUM(CASE WHEN status = 'disputed' THEN fine_amount ELSE 0 END), 0)
+FROM violations;
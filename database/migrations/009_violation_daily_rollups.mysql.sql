@@ -0,0 +1,21 @@
+-- Migration 009: daily violation rollups behind the analytics engine (see RollupManager)
+-- Databases created before the table was added to database.sql never got it;
+-- on the others this recomputes it. Recompute any time with: python rebuild_rollups.py
+CREATE TABLE IF NOT EXISTS violation_daily_rollups (
+    rollup_date DATE NOT NULL,
+    area_id INT NOT NULL,
+    type_id INT NOT NULL,
+    officer_id INT NOT NULL,
+    status ENUM('unpaid', 'paid', 'disputed') NOT NULL,
+    violation_count INT NOT NULL DEFAULT 0,
+    total_fines DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (rollup_date, area_id, type_id, officer_id, status)
+);
+
+DELETE FROM violation_daily_rollups;
+
+INSERT INTO violation_daily_rollups
+(rollup_date, area_id, type_id, officer_id, status, violation_count, total_fines)
+SELECT DATE(violation_date), area_id, type_id, officer_id, status, COUNT(*), SUM(fine_amount)
+FROM violations
+GROUP BY DATE(violation_date), area_id, type_id, officer_id, status;
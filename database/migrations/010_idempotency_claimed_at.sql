@@ -0,0 +1,2 @@
+-- Migration 010: when an in-progress Idempotency-Key was claimed (see IdempotencyManager lease)
+ALTER TABLE idempotency_keys ADD COLUMN claimed_at DATETIME;
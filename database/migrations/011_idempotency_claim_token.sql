@@ -0,0 +1,2 @@
+-- Migration 011: token of the request holding an Idempotency-Key (see IdempotencyManager)
+ALTER TABLE idempotency_keys ADD COLUMN claim_token CHAR(32);
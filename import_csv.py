@@ -0,0 +1,41 @@
+"""
+Offline bulk import of historical violations and payments
+Usage:
+    python import_csv.py violations violations.csv [--officer-id 2] [--reject rejects.csv]
+    python import_csv.py payments payments.csv [--reject rejects.csv]
+"""
+
+import argparse
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from managers.import_manager import ImportManager
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import violations or payments from a CSV file")
+    parser.add_argument('dataset', choices=['violations', 'payments'])
+    parser.add_argument('csv_path')
+    parser.add_argument('--reject', help='Reject file path (default: <csv_path>.rejects.csv)')
+    parser.add_argument('--officer-id', type=int, help='Officer for violation rows without officer_id')
+    parser.add_argument('--chunk-size', type=int, help='Rows per transaction')
+    args = parser.parse_args(argv)
+    
+    importer = ImportManager(chunk_size=args.chunk_size)
+    if args.dataset == 'violations':
+        summary = importer.import_violations(args.csv_path, args.reject, args.officer_id)
+    else:
+        summary = importer.import_payments(args.csv_path, args.reject)
+    
+    print(f"Imported {summary['imported']} of {summary['total']} rows "
+          f"in {summary['seconds']}s ({summary['rows_per_minute']} rows/min)")
+    if summary['rejected']:
+        print(f"{summary['rejected']} rejected rows written to {summary['reject_file']}")
+    return 0 if not summary['rejected'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
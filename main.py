@@ -3,21 +3,40 @@ Main Application Entry Point
 Flask-based REST API for Traffic Violation Management System
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import (
+    Flask, Response, make_response, render_template, request, jsonify, session, redirect, url_for
+)
 from functools import wraps
-from datetime import datetime
+from datetime import datetime, timedelta
+import csv
+import hashlib
+import io
 import os
 import sys
+import zlib
 
 # Add backend to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 
-from backend.database.db_connection import get_db
-from backend.models.user import User
-from backend.models.violation import Violation
-from backend.models.payment import Payment
-from backend.managers.violation_manager import ViolationManager
-from backend.models.analytics import AnalyticsEngine
+# Import through the same module names the managers use, so module-level
+# state (connection pool, caches) exists once per process
+from database.db_connection import get_db
+from models.user import User
+from models.violation import Violation
+from models.payment import Payment
+from managers.violation_manager import ViolationManager
+from managers.payment_manager import PaymentManager
+from managers.idempotency_manager import IdempotencyManager
+from models.analytics import AnalyticsEngine
+from utils.validators import (
+    ValidationError, validate_date, validate_id, validate_payment_input, validate_violation_input,
+    validate_violation_status
+)
+from utils.pagination import clamp_page_size, decode_cursor, next_cursor
+from config import (
+    BULK_CONFIG, EXPORT_CONFIG, IDEMPOTENCY_CONFIG, PAGINATION_CONFIG, REFERENCE_CACHE_CONFIG,
+    SEARCH_CONFIG
+)
 
 app = Flask(__name__, 
             template_folder='templates',
@@ -28,6 +47,8 @@ app.config['SESSION_TYPE'] = 'filesystem'
 
 # Initialize managers
 violation_manager = ViolationManager()
+payment_manager = PaymentManager()
+idempotency_manager = IdempotencyManager()
 analytics_engine = AnalyticsEngine()
 
 
@@ -53,6 +74,211 @@ def role_required(roles):
     return decorator
 
 
+def idempotent(f):
+    """
+    Decorator honouring the Idempotency-Key header on create endpoints
+    The first request with a key runs and its response is stored; retries with
+    the same key and body get that response back instead of creating again.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return f(*args, **kwargs)
+        
+        key = key.strip()
+        if not key or len(key) > IDEMPOTENCY_CONFIG['max_key_length']:
+            return jsonify({'success': False, 'message': 'Invalid Idempotency-Key'}), 400
+        
+        # Keys are per user and per endpoint
+        scope = f"{session.get('user_id')}:{request.endpoint}"
+        request_hash = hashlib.sha256(request.get_data()).hexdigest()
+        claim = idempotency_manager.begin(scope, key, request_hash)
+        
+        if claim['state'] == 'replay':
+            response = Response(claim['response_body'], status=claim['response_status'],
+                                mimetype='application/json')
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+        if claim['state'] == 'mismatch':
+            return jsonify({
+                'success': False,
+                'message': 'Idempotency-Key was already used for a different request'
+            }), 422
+        if claim['state'] == 'in_progress':
+            return jsonify({
+                'success': False,
+                'message': 'A request with this Idempotency-Key is still in progress'
+            }), 409
+        
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            idempotency_manager.abandon(scope, key, claim['claim'])
+            raise
+        
+        # Server errors are not stored so the client can retry them
+        if response.status_code >= 500:
+            idempotency_manager.abandon(scope, key, claim['claim'])
+        else:
+            idempotency_manager.complete(scope, key, claim['claim'], response.status_code,
+                                         response.get_data(as_text=True))
+        return response
+    return decorated_function
+
+
+def get_page_args():
+    """
+    Read keyset pagination arguments from the query string
+    Returns: Tuple of (page_size, after_cursor)
+    Raises: ValidationError if the cursor is malformed
+    """
+    page_size = clamp_page_size(
+        request.args.get('page_size', type=int),
+        PAGINATION_CONFIG['items_per_page'],
+        PAGINATION_CONFIG['max_items_per_page']
+    )
+    after = request.args.get('after') or None
+    if after:
+        decode_cursor(after)
+    return page_size, after
+
+
+def buffered(pieces):
+    """
+    Join small string pieces into chunks of about EXPORT_CONFIG['chunk_bytes']
+    Returns: Generator of strings
+    """
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= EXPORT_CONFIG['chunk_bytes']:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_json_array(rows):
+    """
+    Stream rows as {"success": true, "data": [...]} without building the whole body
+    Returns: Streaming JSON response
+    """
+    def pieces():
+        yield '{"success": true, "data": ['
+        for index, row in enumerate(rows):
+            yield (',' if index else '') + app.json.dumps(row)
+        yield ']}'
+    return Response(buffered(pieces()), mimetype='application/json')
+
+
+def stream_ndjson(rows):
+    """
+    Stream rows as newline-delimited JSON, one object per line
+    Returns: Streaming NDJSON response
+    """
+    return Response(buffered(ndjson_lines(rows)), mimetype='application/x-ndjson')
+
+
+def ndjson_lines(rows):
+    """
+    Format rows as newline-delimited JSON
+    Returns: Generator of JSON lines
+    """
+    for row in rows:
+        yield app.json.dumps(row) + '\n'
+
+
+def get_date_range():
+    """
+    Read date_from/date_to (YYYY-MM-DD, both inclusive) from the query string
+    Returns: Dict with date_from and/or date_to as 'YYYY-MM-DD HH:MM:SS',
+             date_to being the exclusive start of the following day
+    Raises: ValidationError if a date is invalid
+    """
+    date_range = {}
+    for field in ('date_from', 'date_to'):
+        value = request.args.get(field)
+        if value:
+            is_valid, error = validate_date(value)
+            if not is_valid:
+                raise ValidationError(error)
+            day = datetime.strptime(value, '%Y-%m-%d')
+            if field == 'date_to':
+                day += timedelta(days=1)
+            date_range[field] = day.strftime('%Y-%m-%d %H:%M:%S')
+    return date_range
+
+
+def csv_lines(rows):
+    """
+    Format rows as CSV text, header taken from the first row's keys
+    Returns: Generator of CSV lines
+    """
+    buffer = io.StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()))
+            writer.writeheader()
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def gzip_chunks(chunks):
+    """
+    Gzip-compress a stream of text chunks
+    Returns: Generator of compressed bytes
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def get_violation_filters():
+    """
+    Read violation listing filters from the query string
+    Returns: Tuple of (filters dict, sort key)
+    Raises: ValidationError if a filter value is invalid
+    """
+    filters = {}
+    
+    status = request.args.get('status')
+    if status:
+        is_valid, error = validate_violation_status(status)
+        if not is_valid:
+            raise ValidationError(error)
+        filters['status'] = status.lower()
+    
+    for field, label in (('type_id', 'Violation type'), ('area_id', 'Area'), ('officer_id', 'Officer')):
+        value = request.args.get(field)
+        if value:
+            is_valid, error = validate_id(value, label)
+            if not is_valid:
+                raise ValidationError(error)
+            filters[field] = int(value)
+    
+    filters.update(get_date_range())
+    
+    search_term = request.args.get('q', '').strip()
+    if search_term:
+        filters['q'] = search_term
+    
+    sort = request.args.get('sort', 'date_desc')
+    if sort not in ViolationManager.SORT_OPTIONS:
+        raise ValidationError(f"Invalid sort. Must be one of: {', '.join(ViolationManager.SORT_OPTIONS)}")
+    
+    return filters, sort
+
+
 # ============================================
 # Authentication Routes
 # ============================================
@@ -151,18 +377,46 @@ def analytics_page():
 @app.route('/api/violations', methods=['GET'])
 @login_required
 def get_violations():
-    """Get all violations or filtered violations"""
+    """
+    Get one page of filtered, sorted violations
+    With summary=1, the first page also carries totals over the filtered set
+    (an aggregate over violations; /api/stats has the unfiltered ones)
+    With stream=json or stream=ndjson, stream every matching violation instead
+    """
     try:
         role = session.get('role')
         user_id = session.get('user_id')
+        page_size, after = get_page_args()
+        filters, sort = get_violation_filters()
         
+        # Citizens only ever see their own violations
         if role == 'citizen':
-            violations = violation_manager.get_violations_by_user(user_id)
-        else:
-            violations = violation_manager.get_all_violations()
+            filters['user_id'] = user_id
+        
+        stream = request.args.get('stream')
+        if stream in ('json', 'ndjson'):
+            rows = violation_manager.iter_violations(filters, sort, after)
+            return stream_ndjson(rows) if stream == 'ndjson' else stream_json_array(rows)
         
-        return jsonify({'success': True, 'data': violations})
+        violations = violation_manager.get_all_violations(
+            limit=page_size, after=after, filters=filters, sort=sort
+        )
+        response = {
+            'success': True,
+            'data': violations,
+            'next_cursor': next_cursor(
+                violations, page_size, sort_key=ViolationManager.SORT_OPTIONS[sort][2]
+            )
+        }
+        
+        # Totals describe the whole filtered set, so only a first page asking for them gets them
+        if not after and request.args.get('summary') == '1':
+            response['summary'] = violation_manager.summarize_violations(filters)
         
+        return jsonify(response)
+        
+    except ValidationError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -185,36 +439,24 @@ def get_violation(violation_id):
 @app.route('/api/violations', methods=['POST'])
 @login_required
 @role_required(['officer','admin'])
+@idempotent
 def create_violation():
     """Register a new violation"""
     try:
         data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'message': 'A violation object is required'}), 400
+        
+        is_valid, errors = validate_violation_input(data)
+        if not is_valid:
+            return jsonify({'success': False, 'errors': errors}), 400
         
         # Get officer_id from session, default to 2 if not available
         officer_id = session.get('user_id', 2)
         
-        # For now, insert directly with SQL since Violation model doesn't have owner_name
-        db = get_db()
-        query = """
-            INSERT INTO violations
-            (vehicle_number, owner_name, user_id, type_id, area_id, officer_id, 
-            violation_date, fine_amount, status, notes)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        params = (
-            data['vehicle_number'],
-            data.get('owner_name',''),
-            data.get('user_id'),
-            data['type_id'],
-            data['area_id'],
-            officer_id,
-            data['violation_date'],
-            float(data['fine_amount']),
-            'unpaid',
-            data.get('notes', '')
-        )
-        if db.execute_query(query, params):
-            violation_id = db.get_last_insert_id()
+        # Goes through the manager (not the Violation model) since the form carries owner_name
+        violation_id = violation_manager.register_violation(data, officer_id)
+        if violation_id:
             return jsonify({
                 'success': True,
                 'message': 'Violation registered successfully',
@@ -229,6 +471,88 @@ def create_violation():
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
+@app.route('/api/violations/bulk', methods=['POST'])
+@login_required
+@role_required(['officer','admin'])
+@idempotent
+def create_violations_bulk():
+    """Register many violations in one request"""
+    try:
+        data = request.get_json()
+        records = data.get('violations') if isinstance(data, dict) else data
+        
+        if not isinstance(records, list) or not records:
+            return jsonify({'success': False, 'message': 'A list of violations is required'}), 400
+        
+        if len(records) > BULK_CONFIG['max_rows_per_request']:
+            return jsonify({
+                'success': False,
+                'message': f"At most {BULK_CONFIG['max_rows_per_request']} violations per request"
+            }), 400
+        
+        if not all(isinstance(record, dict) for record in records):
+            return jsonify({'success': False, 'message': 'Each violation must be an object'}), 400
+        
+        results = violation_manager.create_violations_bulk(
+            records, officer_id=session.get('user_id')
+        )
+        inserted = sum(1 for result in results if result['success'])
+        
+        return jsonify({
+            'success': inserted == len(results),
+            'inserted': inserted,
+            'failed': len(results) - inserted,
+            'results': results
+        })
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@app.route('/api/payments', methods=['POST'])
+@login_required
+@idempotent
+def create_payment():
+    """Pay a violation"""
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'message': 'A payment object is required'}), 400
+        
+        is_valid, errors = validate_payment_input(data)
+        if not is_valid:
+            return jsonify({'success': False, 'errors': errors}), 400
+        
+        violation = violation_manager.get_violation_by_id(int(data['violation_id']))
+        if not violation:
+            return jsonify({'success': False, 'message': 'Violation not found'}), 404
+        
+        # Citizens can only pay their own violations
+        if session.get('role') == 'citizen' and violation.user_id != session['user_id']:
+            return jsonify({'error': 'Unauthorized access'}), 403
+        
+        payment_id, outcome = payment_manager.process_payment_with_outcome(
+            violation.violation_id, float(data['amount_paid']), data['payment_method'].lower()
+        )
+        if payment_id:
+            payment = payment_manager.get_payment_by_id(payment_id)
+            return jsonify({
+                'success': True,
+                'message': 'Payment recorded successfully',
+                'payment_id': payment_id,
+                'transaction_id': payment.transaction_id if payment else None
+            })
+        elif outcome == 'already_paid':
+            return jsonify({'success': False, 'message': 'Violation is already paid'}), 409
+        elif outcome == 'not_found':
+            return jsonify({'success': False, 'message': 'Violation not found'}), 404
+        else:
+            return jsonify({'success': False, 'message': 'Failed to record payment'}), 500
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
 @app.route('/api/violations/<int:violation_id>/status', methods=['PUT'])
 @login_required
 @role_required(['officer','admin'])
@@ -254,11 +578,80 @@ def search_violations():
         search_term = request.args.get('q', '')
         
         if search_term:
-            violations = violation_manager.search_violations(search_term)
-            return jsonify({'success': True, 'data': violations})
+            page_size, after = get_page_args()
+            violations = violation_manager.search_violations(search_term, limit=page_size, after=after)
+            return jsonify({
+                'success': True,
+                'data': violations,
+                'next_cursor': violation_manager.search_cursor(violations, page_size)
+            })
         else:
             return jsonify({'success': False, 'message': 'Search term required'}), 400
             
+    except ValidationError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@app.route('/api/plates/match', methods=['GET'])
+@login_required
+@role_required(['officer','admin'])
+def match_plate():
+    """Known vehicles matching a camera-read plate, tolerating OCR confusions"""
+    try:
+        plate = request.args.get('plate', '').strip()
+        if not plate:
+            return jsonify({'success': False, 'message': 'Plate required'}), 400
+        
+        max_distance = request.args.get('max_distance', type=int)
+        if max_distance is not None and max_distance not in (0, 1):
+            return jsonify({'success': False, 'message': 'max_distance must be 0 or 1'}), 400
+        
+        candidates = violation_manager.plates.match_plate(plate, max_distance=max_distance)
+        return jsonify({'success': True, 'data': candidates})
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@app.route('/api/vehicles/<vehicle_number>/history', methods=['GET'])
+@login_required
+@role_required(['officer','admin'])
+def get_vehicle_history(vehicle_number):
+    """A vehicle's violations (newest first) and unpaid total"""
+    try:
+        history = violation_manager.get_vehicle_history(vehicle_number)
+        if not history['plate_key']:
+            return jsonify({'success': False, 'message': 'Invalid vehicle number'}), 400
+        return jsonify({'success': True, 'data': history})
+    
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@app.route('/api/search/plates', methods=['GET'])
+@login_required
+@role_required(['officer','admin'])
+def search_plates():
+    """Vehicle numbers containing a term, exact and prefix matches first"""
+    try:
+        search_term = request.args.get('q', '').strip()
+        if not search_term:
+            return jsonify({'success': False, 'message': 'Search term required'}), 400
+        
+        limit = clamp_page_size(request.args.get('limit', type=int),
+                                SEARCH_CONFIG['default_limit'], SEARCH_CONFIG['max_candidates'])
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        plates, truncated = violation_manager.search_index.rank_plates(search_term)
+        
+        return jsonify({
+            'success': True,
+            'data': plates[offset:offset + limit],
+            'next_offset': offset + limit if len(plates) > offset + limit else None,
+            'truncated': truncated
+        })
+    
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -267,12 +660,24 @@ def search_violations():
 # Reference Data Routes
 # ============================================
 
+def reference_data_response(name, data):
+    """
+    Build a browser-cacheable response for reference data
+    Answers 304 Not Modified when the client's ETag is still current
+    """
+    response = jsonify({'success': True, 'data': data})
+    response.set_etag(violation_manager.get_reference_etag(name))
+    response.cache_control.public = True
+    response.cache_control.max_age = REFERENCE_CACHE_CONFIG['browser_max_age']
+    return response.make_conditional(request)
+
+
 @app.route('/api/violation-types', methods=['GET'])
 def get_violation_types():
     """Get all violation types"""
     try:
         types = violation_manager.get_violation_types()
-        return jsonify({'success': True, 'data': types})
+        return reference_data_response('violation_types', types)
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -282,7 +687,7 @@ def get_areas():
     """Get all areas"""
     try:
         areas = violation_manager.get_areas()
-        return jsonify({'success': True, 'data': areas})
+        return reference_data_response('areas', areas)
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -365,6 +770,86 @@ def get_top_violators():
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
+@app.route('/api/analytics/cache-stats', methods=['GET'])
+@login_required
+@role_required(['admin'])
+def get_analytics_cache_stats():
+    """Get analytics cache hit/miss counters"""
+    return jsonify({'success': True, 'data': analytics_engine.cache_stats()})
+
+
+@app.route('/api/vehicles/history-cache-stats', methods=['GET'])
+@login_required
+@role_required(['admin'])
+def get_vehicle_history_cache_stats():
+    """Get vehicle history cache hit rate and in-place update counters"""
+    return jsonify({'success': True, 'data': violation_manager.vehicle_history_stats()})
+
+
+# ============================================
+# Export Routes
+# ============================================
+
+@app.route('/api/export/<dataset>', methods=['GET'])
+@login_required
+@role_required(['admin'])
+def export_dataset(dataset):
+    """
+    Stream a dataset as CSV (format=csv, default) or NDJSON (format=ndjson)
+    violations and payments accept date_from/date_to and resume after the
+    last ID received with after_id; they are ordered by ID. Every
+    AnalyticsEngine.EXPORT_DATASETS name is also accepted (without those
+    parameters, which are rejected with 400).
+    The body is gzip-compressed when the client accepts gzip.
+    """
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in ('csv', 'ndjson'):
+            raise ValidationError("Invalid format. Must be one of: csv, ndjson")
+        
+        date_range = get_date_range()
+        after_id = request.args.get('after_id')
+        if after_id:
+            is_valid, error = validate_id(after_id, 'after_id')
+            if not is_valid:
+                raise ValidationError(error)
+            after_id = int(after_id)
+        
+        if dataset == 'violations':
+            rows = violation_manager.iter_violations(
+                dict(date_range, after_id=after_id), sort='id_asc'
+            )
+        elif dataset == 'payments':
+            rows = payment_manager.iter_payments(after_id=after_id, **date_range)
+        elif dataset in AnalyticsEngine.EXPORT_DATASETS:
+            unsupported = [name for name in ('date_from', 'date_to', 'after_id') if request.args.get(name)]
+            if unsupported:
+                raise ValidationError(f"{', '.join(unsupported)} not supported for the {dataset} dataset")
+            rows = analytics_engine.export_analytics_data(dataset)
+        else:
+            return jsonify({'success': False, 'message': 'Unknown dataset'}), 404
+        
+        if export_format == 'csv':
+            chunks = buffered(csv_lines(rows))
+            mimetype = 'text/csv'
+        else:
+            chunks = buffered(ndjson_lines(rows))
+            mimetype = 'application/x-ndjson'
+        
+        headers = {'Content-Disposition': f'attachment; filename={dataset}.{export_format}'}
+        if request.accept_encodings['gzip']:
+            chunks = gzip_chunks(chunks)
+            headers['Content-Encoding'] = 'gzip'
+            headers['Vary'] = 'Accept-Encoding'
+        
+        return Response(chunks, mimetype=mimetype, headers=headers)
+    
+    except ValidationError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
 # ============================================
 # Statistics Routes
 # ============================================
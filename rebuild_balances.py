@@ -0,0 +1,52 @@
+"""
+Rebuild or verify the per-user fine balances (user_balances) and the
+global totals row (violation_totals)
+Run with --verify periodically (e.g. nightly from cron); it exits with
+status 1 when either has drifted from the violations table
+Usage:
+    python rebuild_balances.py [--verify]
+"""
+
+import argparse
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from managers.balance_manager import BalanceManager
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify fine balances and totals")
+    parser.add_argument('--verify', action='store_true',
+                        help='Only report balances and totals that differ from the violations')
+    args = parser.parse_args(argv)
+    
+    balances = BalanceManager()
+    if args.verify:
+        drift = balances.verify()
+        for user in drift:
+            changed = [column for column in balances.COLUMNS
+                       if user['stored'][column] != user['actual'][column]]
+            print(f"User {user['user_id']}: " + ', '.join(
+                f"{column} {user['stored'][column]} != {user['actual'][column]}" for column in changed))
+        print(f"{len(drift)} user balance(s) out of step")
+        
+        totals = balances.verify_totals()
+        if totals:
+            print("Violation totals: " + ', '.join(
+                f"{column} {totals['stored'][column]} != {totals['actual'][column]}"
+                for column in balances.COLUMNS if totals['stored'][column] != totals['actual'][column]))
+        else:
+            print("Violation totals in step")
+        return 1 if drift or totals else 0
+    
+    if not (balances.rebuild() and balances.rebuild_totals()):
+        return 1
+    print("User balances and violation totals rebuilt")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
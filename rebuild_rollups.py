@@ -0,0 +1,25 @@
+"""
+Recompute the daily violation rollups (violation_daily_rollups) from the
+violations table
+Usage:
+    python rebuild_rollups.py
+"""
+
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from managers.rollup_manager import RollupManager
+
+
+def main() -> int:
+    if not RollupManager().rebuild():
+        return 1
+    print("Violation rollups rebuilt")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,28 @@
+"""
+Recompute plate keys, then rebuild the trigram search index and the plate
+variant index from the violations and users tables
+Usage:
+    python rebuild_search_index.py
+"""
+
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from managers.search_index_manager import SearchIndexManager
+from managers.plate_match_manager import PlateMatchManager
+
+
+def main() -> int:
+    plates = PlateMatchManager()
+    print(f"Updated the plate key of {plates.refresh_plate_keys()} violations")
+    counts = SearchIndexManager().rebuild()
+    print(f"Indexed {counts['plates']} vehicle numbers and {counts['users']} users")
+    print(f"Indexed {plates.rebuild()} plate keys for fuzzy matching")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""
+Reconcile a bank / card settlement file against recorded payments
+Usage:
+    python reconcile_settlement.py settlement.csv [--output-dir out/] [--chunk-size 5000]
+"""
+
+import argparse
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from managers.reconciliation_manager import ReconciliationManager
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reconcile a settlement CSV against payments")
+    parser.add_argument('settlement_path')
+    parser.add_argument('--output-dir', help='Result directory (default: <settlement_path>.reconciliation)')
+    parser.add_argument('--chunk-size', type=int, help='Settlement lines per chunk')
+    args = parser.parse_args(argv)
+    
+    summary = ReconciliationManager(chunk_size=args.chunk_size).reconcile(
+        args.settlement_path, args.output_dir
+    )
+    
+    print(f"Reconciled {summary['total']} lines in {summary['seconds']}s "
+          f"({summary['rows_per_minute']} rows/min)")
+    for result in ReconciliationManager.RESULTS:
+        print(f"  {result}: {summary[result]}")
+    print(f"Results written to {summary['output_dir']}")
+    return 0 if summary['matched'] == summary['total'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
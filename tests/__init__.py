@@ -0,0 +1,14 @@
+"""
+Unit tests for the Traffic Violation Management System
+Run from the project root:
+    python -m unittest discover -s tests -t .
+"""
+
+import os
+import sys
+
+# Same import roots the application uses
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, 'backend')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,47 @@
+"""
+Base test case for manager tests on a throwaway SQLite database
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from database.db_connection import get_db
+
+
+class SQLiteTestCase(unittest.TestCase):
+    """
+    Points DatabaseConnection at a fresh SQLite file for every test
+    Subclasses set SCHEMA to the SQLite DDL of the tables they use
+    """
+    
+    SCHEMA = ''
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, 'test.db')
+        
+        connection = sqlite3.connect(path)
+        connection.executescript(self.SCHEMA)
+        connection.close()
+        
+        environment = mock.patch.dict(os.environ, {'DB_TYPE': 'sqlite', 'SQLITE_DB': path})
+        environment.start()
+        self.addCleanup(environment.stop)
+        
+        self.db = get_db()
+        self.close_pool()
+    
+    def tearDown(self):
+        self.close_pool()
+        shutil.rmtree(self.directory, ignore_errors=True)
+    
+    def close_pool(self):
+        """Close pooled connections without printing the close notice"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.db.close()
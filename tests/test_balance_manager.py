@@ -0,0 +1,187 @@
+"""
+Tests for backend/managers/balance_manager.py
+"""
+
+import random
+import unittest
+
+from managers.balance_manager import BalanceManager
+from tests.sqlite_case import SQLiteTestCase
+
+
+class BalanceManagerTest(SQLiteTestCase):
+
+    SCHEMA = """
+        CREATE TABLE violations (
+            violation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            fine_amount REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'unpaid'
+        );
+        CREATE TABLE user_balances (
+            user_id INTEGER PRIMARY KEY,
+            violation_count INTEGER NOT NULL DEFAULT 0,
+            total_amount REAL NOT NULL DEFAULT 0,
+            paid_count INTEGER NOT NULL DEFAULT 0,
+            paid_amount REAL NOT NULL DEFAULT 0,
+            unpaid_count INTEGER NOT NULL DEFAULT 0,
+            unpaid_amount REAL NOT NULL DEFAULT 0,
+            disputed_count INTEGER NOT NULL DEFAULT 0,
+            disputed_amount REAL NOT NULL DEFAULT 0
+        );
+        CREATE TABLE violation_totals (
+            totals_id INTEGER PRIMARY KEY,
+            violation_count INTEGER NOT NULL DEFAULT 0,
+            total_amount REAL NOT NULL DEFAULT 0,
+            paid_count INTEGER NOT NULL DEFAULT 0,
+            paid_amount REAL NOT NULL DEFAULT 0,
+            unpaid_count INTEGER NOT NULL DEFAULT 0,
+            unpaid_amount REAL NOT NULL DEFAULT 0,
+            disputed_count INTEGER NOT NULL DEFAULT 0,
+            disputed_amount REAL NOT NULL DEFAULT 0
+        );
+        INSERT INTO violation_totals (totals_id) VALUES (1);
+    """
+    
+    def setUp(self):
+        super().setUp()
+        self.manager = BalanceManager()
+    
+    def create(self, *violations):
+        """Insert (user_id, status, fine_amount) rows and record them the way managers do"""
+        rows = []
+        for user_id, status, fine_amount in violations:
+            self.db.execute_query(
+                "INSERT INTO violations (user_id, status, fine_amount) VALUES (%s, %s, %s)",
+                (user_id, status, fine_amount)
+            )
+            rows.append({
+                'violation_id': self.db.get_last_insert_id(),
+                'user_id': user_id,
+                'status': status,
+                'fine_amount': fine_amount
+            })
+        self.assertTrue(self.manager.record_violations(rows))
+        return rows
+    
+    def change_status(self, rows, new_status):
+        """Update rows' status and record the change from their previous status"""
+        for row in rows:
+            self.db.execute_query("UPDATE violations SET status = %s WHERE violation_id = %s",
+                                  (new_status, row['violation_id']))
+        self.assertTrue(self.manager.record_status_changes(rows, new_status))
+        for row in rows:
+            row['status'] = new_status
+    
+    def test_delta_columns(self):
+        self.assertEqual(BalanceManager._delta('paid', 100.0),
+                         (1, 100.0, 1, 100.0, 0, 0, 0, 0))
+        self.assertEqual(BalanceManager._delta('disputed', 50.0, -1),
+                         (-1, -50.0, 0, 0, 0, 0, -1, -50.0))
+        self.assertEqual(BalanceManager._delta('unpaid', 25.0, overall=False),
+                         (0, 0, 0, 0, 1, 25.0, 0, 0))
+    
+    def test_new_violations_update_balances(self):
+        self.create((1, 'unpaid', 500.0), (1, 'paid', 1250.5), (2, 'disputed', 99.99))
+        self.assertEqual(self.manager.get_balance(1), {
+            'violation_count': 2, 'total_amount': 1750.5,
+            'paid_count': 1, 'paid_amount': 1250.5,
+            'unpaid_count': 1, 'unpaid_amount': 500.0,
+            'disputed_count': 0, 'disputed_amount': 0.0
+        })
+        self.assertEqual(self.manager.get_balance(2)['disputed_amount'], 99.99)
+        self.assertEqual(self.manager.verify(), [])
+    
+    def test_unassigned_violations_are_skipped(self):
+        self.create((None, 'unpaid', 500.0))
+        self.assertEqual(self.db.fetch_all("SELECT * FROM user_balances"), [])
+    
+    def test_status_changes_move_amounts(self):
+        rows = self.create((1, 'unpaid', 500.0), (1, 'unpaid', 300.0))
+        self.change_status(rows[:1], 'paid')
+        balance = self.manager.get_balance(1)
+        self.assertEqual((balance['violation_count'], balance['total_amount']), (2, 800.0))
+        self.assertEqual((balance['paid_count'], balance['paid_amount']), (1, 500.0))
+        self.assertEqual((balance['unpaid_count'], balance['unpaid_amount']), (1, 300.0))
+        
+        # Unchanged status is a no-op
+        self.assertTrue(self.manager.record_status_changes(rows[:1], 'paid'))
+        self.assertEqual(self.manager.get_balance(1), balance)
+        self.assertEqual(self.manager.verify(), [])
+    
+    def test_unknown_user_has_zero_balance(self):
+        self.assertEqual(self.manager.get_balance(42), BalanceManager._normalize(None))
+    
+    def test_random_writes_match_rebuild(self):
+        generator = random.Random(7)
+        rows = []
+        for _ in range(60):
+            if rows and generator.random() < 0.4:
+                batch = generator.sample(rows, generator.randint(1, min(5, len(rows))))
+                new_status = generator.choice(BalanceManager.STATUSES)
+                # record_status_changes takes each violation's status before the change
+                self.change_status([row for row in batch if row['status'] != new_status], new_status)
+            else:
+                rows.extend(self.create(*[
+                    (generator.choice([1, 2, 3, None]),
+                     generator.choice(BalanceManager.STATUSES),
+                     round(generator.uniform(50, 5000), 2))
+                    for _ in range(generator.randint(1, 4))
+                ]))
+        
+        self.assertEqual(self.manager.verify(), [])
+        maintained = {user_id: self.manager.get_balance(user_id) for user_id in (1, 2, 3)}
+        self.assertTrue(self.manager.rebuild())
+        self.assertEqual({user_id: self.manager.get_balance(user_id) for user_id in (1, 2, 3)},
+                         maintained)
+        
+        self.assertIsNone(self.manager.verify_totals())
+        totals = self.manager.get_totals()
+        self.assertTrue(self.manager.rebuild_totals())
+        self.assertEqual(self.manager.get_totals(), totals)
+    
+    def test_verify_reports_drift_and_rebuild_repairs_it(self):
+        self.create((1, 'unpaid', 500.0), (2, 'paid', 200.0))
+        self.db.execute_query("UPDATE user_balances SET unpaid_amount = 1 WHERE user_id = 1")
+        self.db.execute_query("DELETE FROM user_balances WHERE user_id = 2")
+        
+        drift = self.manager.verify()
+        self.assertEqual([entry['user_id'] for entry in drift], [1, 2])
+        self.assertEqual(drift[0]['stored']['unpaid_amount'], 1.0)
+        self.assertEqual(drift[0]['actual']['unpaid_amount'], 500.0)
+        
+        self.assertTrue(self.manager.rebuild(user_ids=[1]))
+        self.assertEqual([entry['user_id'] for entry in self.manager.verify()], [2])
+        self.assertTrue(self.manager.rebuild())
+        self.assertEqual(self.manager.verify(), [])
+    
+    def test_delete_balance(self):
+        self.create((1, 'unpaid', 500.0))
+        self.assertTrue(self.manager.delete_balance(1))
+        self.assertEqual(self.manager.get_balance(1)['violation_count'], 0)
+    
+    def test_totals_include_unassigned_violations(self):
+        rows = self.create((1, 'unpaid', 500.0), (None, 'disputed', 250.25))
+        self.change_status(rows[1:], 'paid')
+        self.assertEqual(self.manager.get_totals(), {
+            'violation_count': 2, 'total_amount': 750.25,
+            'paid_count': 1, 'paid_amount': 250.25,
+            'unpaid_count': 1, 'unpaid_amount': 500.0,
+            'disputed_count': 0, 'disputed_amount': 0.0
+        })
+        self.assertIsNone(self.manager.verify_totals())
+    
+    def test_verify_totals_reports_drift_and_rebuild_repairs_it(self):
+        self.create((1, 'unpaid', 500.0))
+        self.db.execute_query("UPDATE violation_totals SET violation_count = 5")
+        
+        drift = self.manager.verify_totals()
+        self.assertEqual(drift['stored']['violation_count'], 5)
+        self.assertEqual(drift['actual']['violation_count'], 1)
+        
+        self.assertTrue(self.manager.rebuild_totals())
+        self.assertIsNone(self.manager.verify_totals())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+"""
+Tests for backend/utils/cache.py
+"""
+
+import threading
+import time
+import unittest
+
+from utils.cache import TTLCache
+
+
+class Loader:
+    """Counts calls and returns a new value each time"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        return f"value-{self.calls}"
+
+
+class TTLCacheTest(unittest.TestCase):
+
+    def test_loads_once_while_fresh(self):
+        cache = TTLCache(ttl=60)
+        loader = Loader()
+        self.assertEqual(cache.get('k', loader), 'value-1')
+        self.assertEqual(cache.get('k', loader), 'value-1')
+        self.assertEqual(loader.calls, 1)
+    
+    def test_reloads_after_expiry(self):
+        cache = TTLCache(ttl=0.05)
+        loader = Loader()
+        cache.get('k', loader)
+        time.sleep(0.1)
+        self.assertEqual(cache.get('k', loader), 'value-2')
+    
+    def test_invalidate_one_key(self):
+        cache = TTLCache(ttl=60)
+        first, second = Loader(), Loader()
+        cache.get('a', first)
+        cache.get('b', second)
+        cache.invalidate('a')
+        cache.get('a', first)
+        cache.get('b', second)
+        self.assertEqual((first.calls, second.calls), (2, 1))
+    
+    def test_invalidate_everything(self):
+        cache = TTLCache(ttl=60)
+        loader = Loader()
+        cache.get('a', loader)
+        cache.get('b', loader)
+        cache.invalidate()
+        cache.get('a', loader)
+        cache.get('b', loader)
+        self.assertEqual(loader.calls, 4)
+    
+    def test_loader_errors_are_not_cached(self):
+        cache = TTLCache(ttl=60)
+        
+        def broken():
+            raise RuntimeError("database down")
+        
+        with self.assertRaises(RuntimeError):
+            cache.get('k', broken)
+        self.assertEqual(cache.get('k', Loader()), 'value-1')
+    
+    def test_concurrent_misses_share_one_load(self):
+        cache = TTLCache(ttl=60)
+        release = threading.Event()
+        calls = []
+        
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return 'loaded'
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('k', slow)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        # Wait until every follower is parked on the leader's load
+        deadline = time.monotonic() + 5
+        while cache.stats()['coalesced'] < 7 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['loaded'] * 8)
+        stats = cache.stats()
+        self.assertEqual((stats['misses'], stats['coalesced']), (1, 7))
+    
+    def test_waiters_see_the_leaders_error(self):
+        cache = TTLCache(ttl=60)
+        started, release = threading.Event(), threading.Event()
+        
+        def broken():
+            started.set()
+            release.wait(5)
+            raise RuntimeError("database down")
+        
+        errors = []
+        
+        def call():
+            try:
+                cache.get('k', broken)
+            except RuntimeError as e:
+                errors.append(e)
+        
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=call)
+        follower.start()
+        deadline = time.monotonic() + 5
+        while cache.stats()['coalesced'] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        leader.join()
+        follower.join()
+        self.assertEqual(len(errors), 2)
+    
+    def test_value_loaded_across_an_invalidation_is_not_stored(self):
+        cache = TTLCache(ttl=60)
+        
+        def stale():
+            cache.invalidate('k')
+            return 'stale'
+        
+        self.assertEqual(cache.get('k', stale), 'stale')
+        self.assertEqual(cache.get('k', lambda: 'fresh'), 'fresh')
+    
+    def test_max_size_evicts_least_recently_used(self):
+        cache = TTLCache(ttl=60, max_size=2)
+        loader = Loader()
+        cache.get('a', loader)
+        cache.get('b', loader)
+        cache.get('a', loader)
+        cache.get('c', loader)
+        self.assertEqual(cache.stats()['size'], 2)
+        cache.get('a', loader)
+        self.assertEqual(loader.calls, 3)
+        cache.get('b', loader)
+        self.assertEqual(loader.calls, 4)
+    
+    def test_stats_hit_rate(self):
+        cache = TTLCache(ttl=60)
+        loader = Loader()
+        for _ in range(4):
+            cache.get('k', loader)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (3, 1, 0.75))
+
+
+if __name__ == '__main__':
+    unittest.main()
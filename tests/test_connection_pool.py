@@ -0,0 +1,139 @@
+"""
+Tests for database/connection_pool.py
+"""
+
+import threading
+import time
+import unittest
+
+from database.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """Stand-in for a DB-API connection"""
+    
+    def __init__(self):
+        self.closed = False
+        self.in_transaction = False
+        self.rollbacks = 0
+    
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+    
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.opened = []
+    
+    def factory(self):
+        connection = FakeConnection()
+        self.opened.append(connection)
+        return connection
+    
+    def test_rejects_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            ConnectionPool(self.factory, min_size=2, max_size=1)
+        with self.assertRaises(ValueError):
+            ConnectionPool(self.factory, min_size=0, max_size=0)
+    
+    def test_fill_opens_min_size_connections(self):
+        pool = ConnectionPool(self.factory, min_size=3, max_size=5)
+        pool.fill()
+        self.assertEqual(pool.size, 3)
+        self.assertEqual(pool.idle_count, 3)
+    
+    def test_reuses_released_connection(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual(len(self.opened), 1)
+    
+    def test_never_exceeds_max_size(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=2, timeout=0.05)
+        pool.acquire()
+        pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(len(self.opened), 2)
+    
+    def test_timeout_waits_roughly_the_configured_time(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=1, timeout=0.2)
+        pool.acquire()
+        started = time.monotonic()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+    
+    def test_waiter_gets_connection_released_by_another_thread(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=1, timeout=5)
+        held = pool.acquire()
+        timer = threading.Timer(0.05, pool.release, args=(held,))
+        timer.start()
+        try:
+            self.assertIs(pool.acquire(), held)
+        finally:
+            timer.join()
+    
+    def test_release_rolls_back_open_transaction(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=1)
+        connection = pool.acquire()
+        connection.in_transaction = True
+        pool.release(connection)
+        self.assertEqual(connection.rollbacks, 1)
+        self.assertFalse(connection.in_transaction)
+    
+    def test_unhealthy_connection_is_replaced(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=1,
+                              health_check=lambda connection: not connection.closed)
+        stale = pool.acquire()
+        pool.release(stale)
+        stale.closed = True
+        fresh = pool.acquire()
+        self.assertIsNot(fresh, stale)
+        self.assertEqual(pool.size, 1)
+    
+    def test_discard_frees_a_slot(self):
+        pool = ConnectionPool(self.factory, min_size=0, max_size=1, timeout=0.05)
+        connection = pool.acquire()
+        pool.discard(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.size, 0)
+        pool.acquire()
+    
+    def test_failed_open_frees_a_slot(self):
+        def broken():
+            raise OSError("database unreachable")
+        
+        pool = ConnectionPool(broken, min_size=0, max_size=1)
+        with self.assertRaises(OSError):
+            pool.acquire()
+        self.assertEqual(pool.size, 0)
+    
+    def test_idle_connections_above_min_size_are_evicted(self):
+        pool = ConnectionPool(self.factory, min_size=1, max_size=3, idle_timeout=0.05)
+        connections = [pool.acquire() for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+        time.sleep(0.1)
+        pool.release(pool.acquire())
+        self.assertEqual(pool.size, 1)
+        self.assertEqual(sum(connection.closed for connection in connections), 2)
+    
+    def test_close_all_refuses_checkouts(self):
+        pool = ConnectionPool(self.factory, min_size=2, max_size=2)
+        pool.fill()
+        pool.close_all()
+        self.assertTrue(all(connection.closed for connection in self.opened))
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+
+
+if __name__ == '__main__':
+    unittest.main()
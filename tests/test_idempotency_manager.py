@@ -0,0 +1,128 @@
+"""
+Tests for backend/managers/idempotency_manager.py
+"""
+
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from config import IDEMPOTENCY_CONFIG
+from managers.idempotency_manager import IdempotencyManager
+from tests.sqlite_case import SQLiteTestCase
+
+
+class IdempotencyManagerTest(SQLiteTestCase):
+
+    SCHEMA = """
+        CREATE TABLE idempotency_keys (
+            scope TEXT NOT NULL,
+            idempotency_key TEXT NOT NULL,
+            request_hash TEXT NOT NULL,
+            response_status INTEGER,
+            response_body TEXT,
+            created_at TEXT NOT NULL,
+            expires_at TEXT NOT NULL,
+            claimed_at TEXT,
+            claim_token TEXT,
+            PRIMARY KEY (scope, idempotency_key)
+        );
+    """
+    
+    SCOPE = '7:/api/payments'
+    
+    def setUp(self):
+        super().setUp()
+        config = mock.patch.dict(IDEMPOTENCY_CONFIG, {'ttl': 3600, 'lease': 60, 'purge_interval': 3600})
+        config.start()
+        self.addCleanup(config.stop)
+        self.manager = IdempotencyManager()
+    
+    def age(self, column, seconds):
+        """Move a timestamp column of the test key into the past"""
+        past = (datetime.now() - timedelta(seconds=seconds)).strftime('%Y-%m-%d %H:%M:%S')
+        self.db.execute_update(f"UPDATE idempotency_keys SET {column} = %s WHERE idempotency_key = %s",
+                               (past, 'key-1'))
+    
+    def test_first_request_claims_the_key(self):
+        result = self.manager.begin(self.SCOPE, 'key-1', 'hash-a')
+        self.assertEqual(result['state'], 'new')
+        self.assertEqual(len(result['claim']), 32)
+    
+    def test_retry_while_running_is_in_progress(self):
+        self.manager.begin(self.SCOPE, 'key-1', 'hash-a')
+        self.assertEqual(self.manager.begin(self.SCOPE, 'key-1', 'hash-a'), {'state': 'in_progress'})
+    
+    def test_completed_request_is_replayed(self):
+        claim = self.manager.begin(self.SCOPE, 'key-1', 'hash-a')['claim']
+        self.assertTrue(self.manager.complete(self.SCOPE, 'key-1', claim, 201, '{"success": true}'))
+        self.assertEqual(self.manager.begin(self.SCOPE, 'key-1', 'hash-a'), {
+            'state': 'replay',
+            'response_status': 201,
+            'response_body': '{"success": true}'
+        })
+    
+    def test_key_reused_for_another_request_is_a_mismatch(self):
+        self.manager.begin(self.SCOPE, 'key-1', 'hash-a')
+        self.assertEqual(self.manager.begin(self.SCOPE, 'key-1', 'hash-b'), {'state': 'mismatch'})
+    
+    def test_scopes_are_independent(self):
+        self.manager.begin(self.SCOPE, 'key-1', 'hash-a')
+        self.assertEqual(self.manager.begin('8:/api/payments', 'key-1', 'hash-a')['state'], 'new')
+    
+    def test_abandoned_key_can_be_claimed_again(self):
+        claim = self.manager.begin(self.SCOPE, 'key-1', 'hash-a')['claim']
+        self.assertTrue(self.manager.abandon(self.SCOPE, 'key-1', claim))
+        self.assertEqual(self.manager.begin(self.SCOPE, 'key-1', 'hash-a')['state'], 'new')
+    
+    def test_only_the_claim_holder_completes_or_abandons(self):
+        claim = self.manager.begin(self.SCOPE, 'key-1', 'hash-a')['claim']
+        self.assertFalse(self.manager.complete(self.SCOPE, 'key-1', 'f' * 32, 200, 'other'))
+        self.assertFalse(self.manager.abandon(self.SCOPE, 'key-1', 'f' * 32))
+        self.assertTrue(self.manager.complete(self.SCOPE, 'key-1', claim, 200, 'mine'))
+        # A stored response is final
+        self.assertFalse(self.manager.complete(self.SCOPE, 'key-1', claim, 500, 'again'))
+        self.assertFalse(self.manager.abandon(self.SCOPE, 'key-1', claim))
+    
+    def test_expired_lease_is_taken_over(self):
+        stale = self.manager.begin(self.SCOPE, 'key-1', 'hash-a')['claim']
+        self.age('claimed_at', 120)
+        
+        result = self.manager.begin(self.SCOPE, 'key-1', 'hash-a')
+        self.assertEqual(result['state'], 'new')
+        self.assertNotEqual(result['claim'], stale)
+        self.assertEqual(self.manager.begin(self.SCOPE, 'key-1', 'hash-a'), {'state': 'in_progress'})
+        
+        # The worker that lost its lease can no longer store a response
+        self.assertFalse(self.manager.complete(self.SCOPE, 'key-1', stale, 200, 'late'))
+        self.assertTrue(self.manager.complete(self.SCOPE, 'key-1', result['claim'], 200, 'ok'))
+    
+    def test_expired_key_is_claimed_again(self):
+        claim = self.manager.begin(self.SCOPE, 'key-1', 'hash-a')['claim']
+        self.manager.complete(self.SCOPE, 'key-1', claim, 200, 'old')
+        self.age('expires_at', 1)
+        self.assertEqual(self.manager.begin(self.SCOPE, 'key-1', 'hash-b')['state'], 'new')
+    
+    def test_purge_expired(self):
+        self.manager.begin(self.SCOPE, 'key-1', 'hash-a')
+        self.manager.begin(self.SCOPE, 'key-2', 'hash-a')
+        self.age('expires_at', 1)
+        self.assertEqual(self.manager.purge_expired(), 1)
+    
+    def test_concurrent_requests_claim_once(self):
+        results = []
+        
+        def claim():
+            results.append(IdempotencyManager().begin(self.SCOPE, 'key-1', 'hash-a')['state'])
+        
+        threads = [threading.Thread(target=claim) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(sorted(results), ['in_progress'] * 5 + ['new'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests for backend/utils/pagination.py
+"""
+
+import unittest
+from datetime import datetime
+
+from utils.pagination import clamp_page_size, decode_cursor, encode_cursor, next_cursor
+from utils.validators import ValidationError
+
+
+class CursorTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        cursor = encode_cursor('2025-03-01 08:30:00', 42)
+        self.assertEqual(decode_cursor(cursor), ('2025-03-01 08:30:00', 42))
+    
+    def test_datetime_is_encoded_as_sql_text(self):
+        cursor = encode_cursor(datetime(2025, 3, 1, 8, 30), 7)
+        self.assertEqual(decode_cursor(cursor), ('2025-03-01 08:30:00', 7))
+    
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor('ä?/+|', 1)
+        self.assertRegex(cursor, r'^[A-Za-z0-9_-]+$')
+        self.assertEqual(decode_cursor(cursor), ('ä?/+|', 1))
+    
+    def test_invalid_cursors_raise_validation_error(self):
+        for cursor in ('!!!', encode_cursor('no-id', 'x'), 'bm9waXBl', '/w'):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValidationError):
+                    decode_cursor(cursor)
+
+
+class PageSizeTest(unittest.TestCase):
+
+    def test_defaults_when_missing_or_not_positive(self):
+        self.assertEqual(clamp_page_size(None, 50, 200), 50)
+        self.assertEqual(clamp_page_size(0, 50, 200), 50)
+        self.assertEqual(clamp_page_size(-5, 50, 200), 50)
+    
+    def test_caps_at_maximum(self):
+        self.assertEqual(clamp_page_size(10, 50, 200), 10)
+        self.assertEqual(clamp_page_size(1000, 50, 200), 200)
+
+
+class NextCursorTest(unittest.TestCase):
+
+    def rows(self, count):
+        return [{'violation_date': f'2025-01-{31 - i:02d} 00:00:00', 'violation_id': 100 - i}
+                for i in range(count)]
+    
+    def test_short_page_is_the_last(self):
+        self.assertIsNone(next_cursor(self.rows(3), 5))
+    
+    def test_full_page_points_after_last_row(self):
+        rows = self.rows(5)
+        cursor = next_cursor(rows, 5)
+        self.assertEqual(decode_cursor(cursor), (rows[-1]['violation_date'], rows[-1]['violation_id']))
+    
+    def test_custom_columns(self):
+        rows = [{'payment_date': '2025-02-01 10:00:00', 'payment_id': 9}]
+        cursor = next_cursor(rows, 1, sort_key='payment_date', id_key='payment_id')
+        self.assertEqual(decode_cursor(cursor), ('2025-02-01 10:00:00', 9))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests for backend/utils/plates.py and the plate variants of PlateMatchManager
+"""
+
+import itertools
+import unittest
+
+from utils.plates import edit_distance, ocr_fold, plate_key
+from managers.plate_match_manager import plate_variants
+
+
+class PlateKeyTest(unittest.TestCase):
+
+    def test_separators_and_case_are_ignored(self):
+        for vehicle_number in ('ka-01-ab-1234', 'KA 01 AB 1234', ' ka01ab1234 ', 'KA.01/AB_1234'):
+            with self.subTest(vehicle_number=vehicle_number):
+                self.assertEqual(plate_key(vehicle_number), 'KA01AB1234')
+    
+    def test_empty_values(self):
+        self.assertEqual(plate_key(''), '')
+        self.assertEqual(plate_key(None), '')
+    
+    def test_ocr_fold_merges_confusable_characters(self):
+        self.assertEqual(ocr_fold('KAO1IB5Z'), ocr_fold('KA011852'))
+        self.assertNotEqual(ocr_fold('KA01AB1234'), ocr_fold('KA01AC1234'))
+
+
+class EditDistanceTest(unittest.TestCase):
+
+    def test_known_distances(self):
+        cases = [
+            ('', '', 0),
+            ('ABC', '', 3),
+            ('KA01AB1234', 'KA01AB1234', 0),
+            ('KA01AB1234', 'KA01AB1235', 1),
+            ('KA01AB1234', 'KA01AB123', 1),
+            ('KA01AB1234', 'KA011AB1234', 1),
+            ('KITTEN', 'SITTING', 3)
+        ]
+        for a, b, expected in cases:
+            with self.subTest(a=a, b=b):
+                self.assertEqual(edit_distance(a, b), expected)
+                self.assertEqual(edit_distance(b, a), expected)
+
+
+class PlateVariantsTest(unittest.TestCase):
+
+    KEY = 'KA01AB1234'
+    ALPHABET = 'ABCKX0123456789'
+    
+    def neighbours(self, key):
+        """Every key one insertion, deletion or substitution away"""
+        for i in range(len(key) + 1):
+            for char in self.ALPHABET:
+                yield key[:i] + char + key[i:]
+        for i in range(len(key)):
+            yield key[:i] + key[i + 1:]
+            for char in self.ALPHABET:
+                yield key[:i] + char + key[i + 1:]
+    
+    def test_contains_folded_key_and_deletions(self):
+        variants = plate_variants('AB1')
+        self.assertEqual(variants, {'A81', '81', 'A1', 'A8'})
+    
+    def test_keys_one_edit_apart_share_a_variant(self):
+        variants = plate_variants(self.KEY)
+        for neighbour in self.neighbours(self.KEY):
+            with self.subTest(neighbour=neighbour):
+                self.assertTrue(variants & plate_variants(neighbour))
+    
+    def test_ocr_confusions_share_the_folded_key(self):
+        self.assertIn(ocr_fold(self.KEY), plate_variants('KAO1A81234'))
+    
+    def test_distant_keys_share_no_variant(self):
+        for other in ('MH12CD5678', 'KA01AB9999', 'KA01'):
+            with self.subTest(other=other):
+                self.assertFalse(plate_variants(self.KEY) & plate_variants(other))
+    
+    def test_shared_variant_never_exceeds_two_edits(self):
+        keys = ['KA01AB1234', 'KA01AB1235', 'KA01AB124', 'KA1AB1234', 'KA01AC1334', 'K01AB124']
+        for a, b in itertools.combinations(keys, 2):
+            if plate_variants(a) & plate_variants(b):
+                with self.subTest(a=a, b=b):
+                    self.assertLessEqual(edit_distance(ocr_fold(a), ocr_fold(b)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
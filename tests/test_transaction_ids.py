@@ -0,0 +1,67 @@
+"""
+Tests for backend/utils/transaction_ids.py
+"""
+
+import os
+import threading
+import unittest
+from unittest import mock
+
+from utils.transaction_ids import TransactionIdGenerator, new_transaction_id
+
+
+class TransactionIdGeneratorTest(unittest.TestCase):
+
+    def test_format(self):
+        transaction_id = TransactionIdGenerator(node_id=42).next()
+        self.assertRegex(transaction_id, r'^TXN\d{13}00042\d{6}$')
+    
+    def test_unique_and_ordered_within_a_process(self):
+        generator = TransactionIdGenerator(node_id=1)
+        ids = [generator.next() for _ in range(20000)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+    
+    def test_unique_across_threads(self):
+        generator = TransactionIdGenerator(node_id=1)
+        batches = [[] for _ in range(8)]
+        
+        def issue(batch):
+            for _ in range(5000):
+                batch.append(generator.next())
+        
+        threads = [threading.Thread(target=issue, args=(batch,)) for batch in batches]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        ids = [transaction_id for batch in batches for transaction_id in batch]
+        self.assertEqual(len(set(ids)), 8 * 5000)
+    
+    def test_nodes_never_collide(self):
+        first = TransactionIdGenerator(node_id=1)
+        second = TransactionIdGenerator(node_id=2)
+        ids = [first.next() for _ in range(1000)] + [second.next() for _ in range(1000)]
+        self.assertEqual(len(set(ids)), 2000)
+    
+    def test_node_id_from_environment(self):
+        with mock.patch.dict(os.environ, {'TRANSACTION_NODE_ID': '123456'}):
+            generator = TransactionIdGenerator()
+        # Wrapped into NODE_DIGITS
+        self.assertEqual(generator.node_id, 23456)
+    
+    def test_clock_stepping_back_keeps_order(self):
+        generator = TransactionIdGenerator(node_id=1)
+        first = generator.next()
+        with mock.patch('utils.transaction_ids.time.time_ns', return_value=0):
+            second = generator.next()
+        self.assertLess(first, second)
+    
+    def test_module_level_helper(self):
+        ids = {new_transaction_id() for _ in range(1000)}
+        self.assertEqual(len(ids), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()